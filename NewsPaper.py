@@ -10,14 +10,51 @@
 许可证: MIT License
 """
 
+import time
+_startup_begin = time.perf_counter()  # 启动计时起点（--startup-timing）
+
 import sys
 import os
+import re
+import json
+import math
+import sqlite3
+import struct
+import hashlib
 import datetime
-import requests
-import feedparser
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import email.utils
+import html
+import html.parser
+import xml.etree.ElementTree as ElementTree
+import argparse
+import importlib
+import queue
+import socket
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 import threading
 
+# requests、feedparser、asyncio 等较重的模块在首次使用时才导入（见 _lazy_import），
+# 这样启动后可以立即输出第一行，只运行 query 等子命令时也不需要导入它们
+_LAZY_MODULES = ('requests', 'feedparser')
+_import_timings = {}  # 按需导入的模块 -> 导入耗时（秒）
+_startup_marks = [('标准库导入', time.perf_counter())]
+
+def _lazy_import(name):
+    """按需导入模块，并记录首次导入的耗时"""
+    if name in sys.modules:
+        return importlib.import_module(name)
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_timings.setdefault(name, time.perf_counter() - start)
+    return module
+
+def __getattr__(name):
+    """模块属性 NewsPaper.requests / NewsPaper.feedparser 按需导入"""
+    if name in _LAZY_MODULES:
+        return _lazy_import(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # 版本信息
 VERSION = "1.0.0"
 APP_NAME = "热点新闻获取器"
@@ -37,7 +74,10 @@ else:
 # 国内新闻源RSS
 DOMESTIC_RSS_SOURCES = [
     {'name': '澎湃新闻', 'url': 'https://www.thepaper.cn/feed_channel_25951'},
-    {'name': '新浪新闻', 'url': 'https://news.sina.com.cn/roll'},
+    # 新浪滚动新闻页是由脚本渲染的HTML，直接使用它背后的分页JSON接口（每页50条）
+    {'name': '新浪新闻', 'url': 'https://feed.mix.sina.com.cn/api/roll/get?pageid=153&lid=2509&num=50&page={page}',
+     'adapter': 'json', 'pages': 4, 'max_items': 50, 'items': 'result.data',
+     'fields': {'title': 'title', 'link': 'url', 'guid': 'docid', 'date': 'ctime'}},
     {'name': '网易新闻', 'url': 'https://www.163.com/news/rss'},
     {'name': '腾讯新闻', 'url': 'https://news.qq.com/newsgn/rss_newsgn.xml'},
     {'name': '人民网', 'url': 'http://www.people.com.cn/rss/politics.xml'},
@@ -67,6 +107,9 @@ INTERNATIONAL_RSS_SOURCES = [
 # 合并所有RSS源
 ALL_RSS_SOURCES = DOMESTIC_RSS_SOURCES + INTERNATIONAL_RSS_SOURCES
 
+# 新闻源配置文件（TOML/JSON），存在时代替上面的内置列表，也可以用 --sources 指定
+SOURCES_FILES = ('sources.toml', 'sources.json')  # 在 ~/.newspaper 中按顺序查找
+
 # 新闻类别显示顺序
 CATEGORY_ORDER = ['AI', '科技', '金融', '教育', '政策', '娱乐', '国际', '社会', '体育', '其他']
 
@@ -90,6 +133,124 @@ RSS_TIMEOUT = 8  # RSS请求超时时间（秒）
 MAX_ITEMS_PER_SOURCE = 15  # 每个源最多获取的新闻数量
 MAX_DISPLAY_COUNT = 15  # 控制台最多显示的新闻数量
 
+# 近似重复检测配置（MinHash + LSH）
+NEAR_DUP_THRESHOLD = 0.6  # 标题相似度（Jaccard）达到该值视为同一新闻，设为1则只去除完全相同的标题
+MINHASH_NUM_PERM = 64  # MinHash签名长度
+MINHASH_MIN_RECALL = 0.95  # 相似度恰好等于阈值时，LSH召回候选的最低概率
+MINHASH_SHINGLE_CACHE = 50000  # 缓存的特征哈希向量数量（中文二元组大量重复出现）
+
+# 热度排序：跨来源聚类报道同一事件的新闻，按来源数量和时效性排序
+CLUSTER_THRESHOLD = 0.5  # 标题TF-IDF向量的余弦相似度达到该值视为同一事件
+CLUSTER_NGRAM_RANGE = (2, 3)  # 字符n-gram的长度范围
+CLUSTER_BLOCK_KEYS = 8  # 每条新闻用权重最高的几个n-gram作为分块键（只和共享分块键的新闻比较）
+CLUSTER_MIN_SHARED_KEYS = 2  # 至少共享几个分块键才计算相似度
+CLUSTER_MAX_BLOCK = 500  # 一个分块键最多对应的事件数量（太常见的n-gram区分度低）
+HOTNESS_HALF_LIFE = 6  # 时效性的半衰期（小时）
+HOTNESS_RECENCY_WEIGHT = 1.0  # 时效性（0~1）在热度中的权重，热度 = 来源数量 + 权重 × 时效性
+
+# 文章摘要（--summarize）
+SUMMARY_PER_CATEGORY = 3  # 每个类别为排在最前面的几条新闻生成摘要
+SUMMARY_SENTENCES = 3  # 摘要最多的句子数
+SUMMARY_MAX_CHARS = 200  # 摘要最多的字符数（至少保留一句）
+SUMMARY_MIN_SENTENCE = 8  # 短于该长度的句子（图片说明、署名等）不参与摘要
+SUMMARY_MAX_SENTENCE = 300  # 长于该长度的“句子”通常是没有标点的列表，不参与摘要
+SUMMARY_MAX_CANDIDATES = 60  # 每篇文章最多取前多少个句子参与排序
+SUMMARY_HASH_BITS = 12  # 句子向量的哈希空间为 2^12 个桶
+TEXTRANK_DAMPING = 0.85  # TextRank的阻尼系数
+TEXTRANK_ITERATIONS = 50  # 幂迭代的最大次数
+ARTICLE_MAX_WORKERS = 4  # 同时下载的文章数量
+ARTICLE_MAX_PER_HOST = 1  # 每个主机同时下载的文章数量
+ARTICLE_HOST_RATE = 1.0  # 每个主机平均每秒下载的文章数量
+ARTICLE_HOST_BURST = 2  # 每个主机允许的突发请求数
+ARTICLE_TIMEOUT = 8  # 文章请求超时时间（秒）
+ARTICLE_MAX_BYTES = 2 * 1024 * 1024  # 文章页面最多读取的字节数
+ARTICLE_MIN_PARAGRAPH = 10  # 短于该长度的段落不作为正文
+ARTICLE_CACHE_DIR_NAME = 'articles'  # 文章正文缓存目录（~/.newspaper/articles）
+ARTICLE_CACHE_MAX_ENTRIES = 2000  # 缓存最多保存的文章数量（超出时淘汰最久未使用的）
+
+# 异步获取配置（--async 模式）
+ASYNC_MAX_CONNECTIONS = 64  # 全局最大并发连接数
+ASYNC_MAX_PER_HOST = 4  # 每个主机最大并发连接数
+ASYNC_KEEPALIVE_TIMEOUT = 30  # 空闲连接保活时间（秒）
+
+# 按主机的礼貌访问控制（同一主机的多个源不会同时涌入）
+HOST_MAX_CONCURRENCY = 2  # 每个主机同时进行的请求数上限
+HOST_RATE = 2.0  # 每个主机平均每秒的请求数（令牌桶的补充速度）
+HOST_BURST = 3  # 令牌桶容量：每个主机允许的突发请求数
+HOST_LIMIT_OVERRIDES = {}  # 主机名 -> (并发上限, 每秒请求数, 突发数)，单独设置个别主机
+THROTTLE_STATUS_CODES = (429, 503)  # 表示被限流的HTTP状态码
+HOST_THROTTLE_BACKOFF = 5  # 限流响应没有 Retry-After 时暂停该主机的秒数
+HOST_RETRY_AFTER_MAX = 10  # Retry-After 不超过该秒数时等待后重试一次，否则本次放弃该源
+HOST_POLL_INTERVAL = 0.05  # 协程等待同一主机其他请求结束时的检查间隔（秒）
+
+# 流式XML解析配置
+FEED_CHUNK_SIZE = 16 * 1024  # 每次读取并送入解析器的字节数
+PARSE_WORKERS = 0  # 解析进程数，0表示在下载线程中边下载边解析
+PARSE_BATCH_SIZE = 8  # 每批发送给解析进程的feed数量（减少进程间传输的开销）
+
+# HTTP请求头
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# 本地数据目录（缓存等持久化文件）
+DATA_DIR_NAME = '.newspaper'
+FEED_CACHE_FILE = 'feed_cache.json'  # 条件GET缓存文件
+FEED_CACHE_MAX_SOURCES = 1000  # 缓存最多保存的RSS源数量（超出时淘汰最久未使用的）
+FEED_CACHE_VERSION = 2  # 缓存记录的格式版本（旧版本只保存了通过日期筛选的条目，加载时丢弃）
+ARCHIVE_DIR_NAME = 'archive'  # 按发布日期分桶的新闻存档目录
+
+# 已处理条目索引（同一天多次运行时复用日期和分类结果）
+SEEN_INDEX_FILE = 'seen_index.bin'
+SEEN_ROTATION_HOURS = 24  # 每隔多少小时轮换一代
+SEEN_GENERATIONS = 2  # 最多保留的代数（条目最后一次出现后保留24~48小时）
+
+# 新闻源健康状况跟踪（自适应超时 + 熔断）
+SOURCE_HEALTH_FILE = 'source_health.json'
+HEALTH_LATENCY_SAMPLES = 50  # 每个源保留的最近响应耗时样本数
+HEALTH_MIN_SAMPLES = 3  # 样本数达到该值后才根据p95计算超时
+HEALTH_TIMEOUT_FACTOR = 1.5  # 超时时间 = p95耗时 × 该系数
+HEALTH_MIN_TIMEOUT = 2  # 自适应超时的下限（秒）
+CIRCUIT_FAILURE_THRESHOLD = 3  # 连续失败该次数后熔断
+CIRCUIT_RETRY_INTERVAL = 3600  # 熔断后每隔多久（秒）放行一次探测请求
+CIRCUIT_PROBE_TIMEOUT = 3  # 探测请求的超时时间（秒）
+
+# 整次运行的时间预算：到期后不再等待剩余的源，用已返回的结果生成日报
+# 默认不限制，避免慢源在不知情的情况下被丢弃；需要时用 --deadline 开启
+RUN_DEADLINE = 0  # 秒，0表示不限制
+HEDGE_PERCENTILE = 90  # 请求耗时超过该源历史耗时的这个百分位数时，再并行发送一次（对冲请求）
+HEDGE_MIN_DELAY = 0.5  # 发送对冲请求前至少等待的秒数
+
+# 本地新闻数据库（SQLite，支持历史检索）
+NEWS_DB_FILE = 'news.db'
+FTS_MIN_KEYWORD_LENGTH = 3  # trigram全文索引只能匹配不少于3个字符的关键词，更短的关键词使用LIKE
+QUERY_DEFAULT_LIMIT = 50  # query 默认显示的结果数量
+
+# 守护进程模式（serve）
+SERVE_HOST = '127.0.0.1'  # 默认只监听本机
+SERVE_PORT = 8000
+SERVE_REFRESH_INTERVAL = 900  # 每个源默认的刷新间隔（秒），源可以用 'interval' 字段单独设置
+SERVE_SAVE_INTERVAL = 300  # 缓存、健康记录和数据库的保存间隔（秒）
+
+# 统计分类器（--classifier bayes，需要numpy；先运行 train-classifier 训练）
+CLASSIFIER = 'keyword'  # 默认分类方式：keyword（NEWS_CATEGORIES关键词）或 bayes（朴素贝叶斯）
+CLASSIFIER_MODEL_FILE = 'classifier.npz'
+NB_HASH_BITS = 18  # 特征哈希空间为 2^18 个桶
+NB_NGRAM_RANGE = (1, 3)  # 字符n-gram的长度范围
+NB_ALPHA = 0.1  # 拉普拉斯平滑系数
+NB_HOLDOUT = 0.1  # 训练时留出用于评估的比例
+NB_HASH_PRIME = 1099511628211  # 滚动哈希的乘数（FNV质数）
+NB_HASH_MIX = 0x9E3779B97F4A7C15  # 取高位前的乘法混合常数
+
+# 分片获取（--shard i/N）
+SHARD_DIR_NAME = 'shards'  # 分片结果文件的默认保存目录（~/.newspaper/shards）
+SHARD_FORMAT_VERSION = 2
+SHARD_BY_HOST = False  # 是否按主机名（而不是按源）划分分片
+
+# 日报输出格式（md / html / json / rss / atom）
+OUTPUT_FORMATS = ('md',)  # 默认只生成Markdown
+FEED_LINK = f'http://{SERVE_HOST}:{SERVE_PORT}/'  # RSS/Atom 中的频道链接（指向 serve 模式的默认地址）
+
 # 线程锁用于打印
 print_lock = threading.Lock()
 
@@ -98,373 +259,4116 @@ def safe_print(*args, **kwargs):
     with print_lock:
         print(*args, **kwargs)
 
-def categorize_news(title):
-    """根据标题判断新闻类别"""
-    title_lower = title.lower()
-    # 在标题前后添加空格，避免部分匹配
-    title_with_spaces = ' ' + title_lower + ' '
+class _NullSpan:
+    """未开启性能分析时使用的空计时区间"""
     
-    # 按优先级检查类别（更具体的类别优先，排除"其他"）
-    category_priority = [c for c in CATEGORY_ORDER if c != '其他']
+    def __enter__(self):
+        return self
     
-    for category in category_priority:
-        keywords = NEWS_CATEGORIES[category]
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            # 对于英文关键词，检查单词边界；对于中文，直接检查
-            if keyword_lower.isascii():
-                # 英文关键词：检查单词边界
-                if f' {keyword_lower} ' in title_with_spaces or title_lower.startswith(keyword_lower + ' ') or title_lower.endswith(' ' + keyword_lower):
-                    return category
-            else:
-                # 中文关键词：直接检查
-                if keyword in title:
-                    return category
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class NullProfiler:
+    """未开启 --profile 时的空实现，所有调用都是几乎无开销的空操作"""
+    enabled = False
     
-    # 如果没有匹配，返回"其他"
-    return '其他'
+    def span(self, name, **attrs):
+        return _NULL_SPAN
+    
+    def add(self, name, start, duration, **attrs):
+        pass
 
-def get_news_from_rss(rss_url, source_name, target_date=None, timeout=RSS_TIMEOUT, max_items=MAX_ITEMS_PER_SOURCE):
-    """从RSS feed获取新闻（带超时控制）
+class _Span:
+    """Profiler 的计时区间（上下文管理器）"""
     
-    Args:
-        rss_url: RSS源URL
-        source_name: 新闻源名称
-        target_date: 目标日期（date对象），如果为None则使用昨天
-        timeout: 超时时间
-        max_items: 最大获取数量
+    def __init__(self, profiler, name, attrs):
+        self.profiler = profiler
+        self.name = name
+        self.attrs = attrs
+    
+    def __enter__(self):
+        self.profiler._push(self.attrs)
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        self.profiler._pop()
+        self.profiler.add(self.name, self.start, duration, **self.attrs)
+        return False
+
+class Profiler:
+    """轻量级阶段计时（--profile）
+    
+    记录每个阶段的计时区间，同一线程内嵌套的区间会继承外层的 source
+    属性。结束后可以输出汇总表和 JSON trace（Chrome Trace Event 格式，
+    可以在 chrome://tracing 或 Perfetto 中查看）。
     """
-    news_list = []
-    try:
-        # 使用requests获取RSS，设置超时
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(rss_url, headers=headers, timeout=timeout)
-        response.raise_for_status()  # 检查HTTP状态码
-        feed = feedparser.parse(response.content)
-        
-        # 如果没有指定目标日期，使用昨天
-        if target_date is None:
-            target_date = datetime.datetime.now().date() - datetime.timedelta(days=1)
-        
-        # 检查是否有条目
-        if not hasattr(feed, 'entries') or not feed.entries:
-            return []
-        
-        for entry in feed.entries[:max_items]:
-            try:
-                # 解析发布日期
-                pub_date = None
-                try:
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        pub_date = datetime.datetime(*entry.published_parsed[:6]).date()
-                    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        pub_date = datetime.datetime(*entry.updated_parsed[:6]).date()
-                except (ValueError, TypeError, IndexError):
-                    pub_date = None
-                
-                # 只接受目标日期的新闻（如果没有日期信息，也接受，但标记为目标日期）
-                if pub_date is None or pub_date == target_date:
-                    title = entry.get('title', '').strip()
-                    link = entry.get('link', '')
-                    
-                    if title and len(title) > 5:
-                        news_list.append({
-                            'title': title,
-                            'url': link,
-                            'source': source_name,
-                            'date': pub_date or target_date
-                        })
-            except (KeyError, AttributeError, ValueError, TypeError):
-                continue
+    enabled = True
+    
+    def __init__(self):
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def _push(self, attrs):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(attrs)
+    
+    def _pop(self):
+        self._local.stack.pop()
+    
+    def span(self, name, **attrs):
+        """创建一个计时区间：with profiler.span('阶段名', source=...):"""
+        return _Span(self, name, attrs)
+    
+    def add(self, name, start, duration, **attrs):
+        """直接记录一个计时区间（start 为 time.perf_counter() 时间）"""
+        if 'source' not in attrs:
+            for outer in reversed(getattr(self._local, 'stack', None) or []):
+                if 'source' in outer:
+                    attrs['source'] = outer['source']
+                    break
+        with self._lock:
+            self.spans.append((name, start - self._origin, duration, threading.get_ident(), attrs))
+    
+    def stage_summary(self):
+        """按阶段汇总：[(阶段名, 次数, 总耗时, 平均耗时, p95耗时, 最大耗时)]"""
+        by_name = {}
+        with self._lock:
+            for name, _, duration, _, _ in self.spans:
+                by_name.setdefault(name, []).append(duration)
+        rows = []
+        for name, durations in by_name.items():
+            durations.sort()
+            rows.append((name, len(durations), sum(durations), sum(durations) / len(durations),
+                         _percentile(durations, 95), durations[-1]))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+    
+    def source_summary(self):
+        """按新闻源汇总各阶段耗时：{新闻源: {阶段名: 总耗时}}"""
+        by_source = {}
+        with self._lock:
+            for name, _, duration, _, attrs in self.spans:
+                source = attrs.get('source')
+                if source is not None:
+                    stages = by_source.setdefault(source, {})
+                    stages[name] = stages.get(name, 0) + duration
+        return by_source
+    
+    def print_summary(self, max_sources=MAX_DISPLAY_COUNT):
+        """打印阶段汇总表和最慢的新闻源"""
+        print()
+        print("=" * 70)
+        print("性能分析")
+        print("=" * 70)
+        print(f"{'阶段':<20} {'次数':>6} {'总耗时':>10} {'平均':>10} {'p95':>10} {'最大':>10}")
+        for name, count, total, mean, p95, longest in self.stage_summary():
+            print(f"{name:<20} {count:>6} {total:>9.3f}s {mean * 1000:>8.1f}ms "
+                  f"{p95 * 1000:>8.1f}ms {longest * 1000:>8.1f}ms")
         
-    except requests.Timeout:
-        safe_print(f"    [-] {source_name}: 超时")
-        return []
-    except requests.RequestException as e:
-        safe_print(f"    [-] {source_name}: 网络错误 ({str(e)[:30]})")
-        return []
-    except Exception as e:
-        safe_print(f"    [-] {source_name}: 失败 ({str(e)[:30]})")
-        return []
+        by_source = self.source_summary()
+        if by_source:
+            columns = ['dns', 'connect', 'connect+ttfb', 'ttfb', 'download', 'parse', 'feedparser.parse']
+            columns = [c for c in columns if any(c in stages for stages in by_source.values())]
+            print()
+            print(f"最慢的 {min(max_sources, len(by_source))} 个新闻源（毫秒）:")
+            print(f"{'新闻源':<16} {'fetch':>8} " + ' '.join(f"{c:>12}" for c in columns))
+            slowest = sorted(by_source.items(), key=lambda item: item[1].get('fetch', 0), reverse=True)
+            for source, stages in slowest[:max_sources]:
+                cells = ' '.join(f"{stages[c] * 1000:>12.1f}" if c in stages else f"{'-':>12}" for c in columns)
+                print(f"{source:<16} {stages.get('fetch', 0) * 1000:>8.1f} {cells}")
     
-    return news_list
+    def write_trace(self, path):
+        """写出 JSON trace（Chrome Trace Event 格式）"""
+        with self._lock:
+            events = [
+                {'name': name, 'ph': 'X', 'ts': round(start * 1e6), 'dur': round(duration * 1e6),
+                 'pid': os.getpid(), 'tid': tid, 'args': attrs}
+                for name, start, duration, tid, attrs in self.spans
+            ]
+        write_json_atomic(path, {'traceEvents': events, 'displayTimeUnit': 'ms'})
 
-def fetch_news_worker(source, target_date):
-    """工作线程函数"""
-    news_list = get_news_from_rss(source['url'], source['name'], target_date)
-    if news_list:
-        safe_print(f"    [+] {source['name']}: 找到 {len(news_list)} 条")
-    return source['name'], news_list
+# 当前的性能分析器（默认关闭）
+_profiler = NullProfiler()
 
-def get_desktop_path():
-    """获取桌面路径（跨平台支持）
+def get_profiler():
+    """获取当前的性能分析器"""
+    return _profiler
+
+def set_profiler(profiler):
+    """设置当前的性能分析器（None表示关闭）"""
+    global _profiler
+    _profiler = profiler if profiler is not None else NullProfiler()
+
+# 英文关键词的单词边界字符（ASCII字母和数字）
+ASCII_WORD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+
+class KeywordClassifier:
+    """编译后的多模式关键词分类器（Aho-Corasick 自动机）
     
-    Returns:
-        str: 桌面路径
+    关键词表在构建时编译成一个自动机，每个标题只需扫描一遍，
+    耗时与标题长度成正比，与关键词数量无关。英文关键词要求
+    ASCII单词边界，中文关键词按子串匹配；多个类别命中时按
+    CATEGORY_ORDER 的优先级返回最靠前的类别。
     """
-    if sys.platform == 'win32':
-        # Windows: 优先使用注册表获取真实桌面路径
-        try:
-            import winreg
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                r'Software\Microsoft\Windows\CurrentVersion\Explorer\Shell Folders'
-            )
-            desktop = winreg.QueryValueEx(key, 'Desktop')[0]
-            winreg.CloseKey(key)
-            if os.path.exists(desktop):
-                return desktop
-        except (ImportError, OSError):
-            pass
+    
+    def __init__(self, categories=None, category_order=None, default_category='其他'):
+        if categories is None:
+            categories = NEWS_CATEGORIES
+        if category_order is None:
+            category_order = CATEGORY_ORDER
         
-        # 备用方案：尝试标准路径
-        home = os.path.expanduser('~')
-        possible_paths = [
-            os.path.join(home, 'Desktop'),
-            os.path.join(home, '桌面'),  # 中文系统
-        ]
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
+        # 按优先级排列的类别（更具体的类别优先，排除默认类别）
+        self.labels = [c for c in category_order if c != default_category and c in categories]
+        self.default_category = default_category
+        self._no_match = len(self.labels)
+        # 分类器标识（关键词表变化时改变），已处理条目索引据此判断记录的类别是否仍然有效
+        self.identity = hashlib.blake2b(
+            repr([(c, list(categories[c])) for c in self.labels] + [default_category]).encode('utf-8'),
+            digest_size=8, person=b'keyword').digest()
         
-        # 如果都不存在，使用标准路径（即使不存在也会创建）
-        return os.path.join(home, 'Desktop')
+        # 状态转移表、失败指针、每个状态的输出 (优先级, 长度, 是否英文)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
         
-    elif sys.platform == 'darwin':  # macOS
-        home = os.path.expanduser('~')
-        desktop = os.path.join(home, 'Desktop')
-        return desktop
+        for priority, category in enumerate(self.labels):
+            for keyword in categories[category]:
+                keyword = keyword.strip().lower()
+                if keyword:
+                    self._add_keyword(keyword, priority)
+        self._build_failure_links()
+    
+    def _add_keyword(self, keyword, priority):
+        state = 0
+        for ch in keyword:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append((priority, len(keyword), keyword.isascii()))
+    
+    def _build_failure_links(self):
+        """广度优先构建失败指针，并合并后缀状态的输出"""
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in goto[state].items():
+                queue.append(next_state)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[next_state] = target if target != next_state else 0
+                out[next_state] = out[next_state] + out[fail[next_state]]
+        # 每个状态的输出按优先级排序，匹配时可以提前结束
+        for state in range(len(out)):
+            out[state] = tuple(sorted(out[state]))
+    
+    def classify(self, title):
+        """根据标题判断新闻类别"""
+        text = title.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        word_chars = ASCII_WORD_CHARS
+        last = len(text) - 1
+        best = self._no_match
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for priority, length, is_ascii in out[state]:
+                if priority >= best:
+                    break
+                if is_ascii:
+                    # 英文关键词：检查单词边界
+                    start = i - length + 1
+                    if start > 0 and text[start - 1] in word_chars:
+                        continue
+                    if i < last and text[i + 1] in word_chars:
+                        continue
+                best = priority
+                if best == 0:
+                    return self.labels[0]
+                break
         
-    else:  # Linux 和其他 Unix 系统
-        home = os.path.expanduser('~')
-        desktop = os.path.join(home, 'Desktop')
-        return desktop
+        if best == self._no_match:
+            return self.default_category
+        return self.labels[best]
+    
+    def classify_many(self, titles):
+        """批量判断新闻类别"""
+        classify = self.classify
+        return [classify(title) for title in titles]
 
-def get_desktop_news_folder():
-    """获取桌面上的每日新闻文件夹路径，如果不存在则创建
+_keyword_classifier = None
+
+def get_keyword_classifier():
+    """获取按 NEWS_CATEGORIES 编译的分类器（首次使用时编译，之后复用）"""
+    global _keyword_classifier
+    if _keyword_classifier is None:
+        _keyword_classifier = KeywordClassifier()
+    return _keyword_classifier
+
+def hashed_ngrams(titles, hash_bits=NB_HASH_BITS, ngram_range=NB_NGRAM_RANGE):
+    """把一批标题转换为哈希后的字符n-gram特征（需要numpy）
+    
+    所有标题（小写）以\\0分隔拼接成一个码点数组，用滚动多项式哈希一次算出
+    每种长度的全部n-gram，再剔除跨越标题边界的n-gram，不逐个n-gram循环。
     
     Returns:
-        str: 每日新闻文件夹路径
+        tuple: (特征编号数组, 特征所属的标题下标数组)，按标题下标排序
     """
-    try:
-        desktop = get_desktop_path()
+    import numpy as np
+    
+    count = len(titles)
+    # 小写可能改变长度（例如 'İ'.lower() 是两个码点），长度按转换后的字符串计算
+    lowered = [title.lower().replace('\0', ' ') for title in titles]
+    text = '\0'.join(lowered)
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    lengths = np.fromiter((len(title) for title in lowered), dtype=np.intp, count=count)
+    owner = np.repeat(np.arange(count), lengths + 1)[:len(codes)]
+    # 分隔符个数的前缀和：区间 [i, i+n) 内没有分隔符的n-gram才有效
+    separators = np.concatenate(([0], np.cumsum(codes == 0)))
+    prime = np.uint64(NB_HASH_PRIME)
+    mix = np.uint64(NB_HASH_MIX)
+    shift = np.uint64(64 - hash_bits)
+    features = []
+    owners = []
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        size = len(codes) - n + 1
+        if size <= 0:
+            break
+        hashes = np.full(size, n, dtype=np.uint64)
+        for k in range(n):
+            hashes = hashes * prime + codes[k:k + size]
+        valid = separators[n:n + size] == separators[:size]
+        features.append(((hashes * mix) >> shift)[valid].astype(np.intp))
+        owners.append(owner[:size][valid])
+    if not features:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    features = np.concatenate(features)
+    owners = np.concatenate(owners)
+    order = np.argsort(owners, kind='stable')
+    return features[order], owners[order]
+
+class NaiveBayesClassifier:
+    """哈希字符n-gram + 多项式朴素贝叶斯分类器（--classifier bayes，需要numpy）
+    
+    特征是标题中长度1~3的字符n-gram，哈希到 2^NB_HASH_BITS 个桶中，
+    不需要分词和词表，中英文一样处理。一批标题一次打分：取出全部特征的
+    对数似然行，按标题分段求和（np.add.reduceat）后加上类别先验取最大值。
+    模型由 train 从已标注的新闻离线训练，保存为npz文件。
+    """
+    
+    def __init__(self, labels, log_prior, log_likelihood, hash_bits=NB_HASH_BITS):
+        self.labels = list(labels)
+        self.log_prior = log_prior
+        self.log_likelihood = log_likelihood  # 形状 (2^hash_bits, 类别数)
+        self.hash_bits = hash_bits
+        # 分类器标识（重新训练后改变），已处理条目索引据此判断记录的类别是否仍然有效
+        digest = hashlib.blake2b(digest_size=8, person=b'bayes')
+        digest.update(repr(self.labels).encode('utf-8'))
+        digest.update(log_prior.tobytes())
+        digest.update(log_likelihood.tobytes())
+        self.identity = digest.digest()
+    
+    @classmethod
+    def train(cls, titles, labels, hash_bits=NB_HASH_BITS, alpha=NB_ALPHA):
+        """从标注数据训练模型
         
-        # 如果桌面路径不存在，尝试创建
-        if not os.path.exists(desktop):
-            try:
-                os.makedirs(desktop, exist_ok=True)
-            except Exception as e:
-                # 如果无法创建桌面，使用用户主目录
-                desktop = os.path.expanduser('~')
-                print(f"[!] 警告: 无法访问桌面，将使用用户目录: {desktop}")
+        Args:
+            titles: 标题列表
+            labels: 与标题一一对应的类别列表
+            hash_bits: 特征哈希空间的位数
+            alpha: 拉普拉斯平滑系数
+        """
+        import numpy as np
         
-        # 创建每日新闻文件夹
-        news_folder = os.path.join(desktop, '每日新闻')
-        if not os.path.exists(news_folder):
-            try:
-                os.makedirs(news_folder, exist_ok=True)
-                print(f"[*] 已创建文件夹: {news_folder}")
-            except Exception as e:
-                raise Exception(f"无法创建新闻文件夹 {news_folder}: {str(e)}")
+        present = set(labels)
+        names = [category for category in CATEGORY_ORDER if category in present]
+        index = {category: i for i, category in enumerate(names)}
+        y = np.fromiter((index[label] for label in labels), dtype=np.intp, count=len(labels))
+        features, owners = hashed_ngrams(titles, hash_bits)
+        size = 1 << hash_bits
+        # 每个 (特征, 类别) 的出现次数
+        counts = np.bincount(features * len(names) + y[owners], minlength=size * len(names))
+        counts = counts.reshape(size, len(names)).astype(np.float64)
+        class_counts = np.bincount(y, minlength=len(names))
+        log_prior = np.log(class_counts / class_counts.sum())
+        log_likelihood = np.log((counts + alpha) / (counts.sum(axis=0) + alpha * size))
+        return cls(names, log_prior.astype(np.float32), log_likelihood.astype(np.float32), hash_bits)
+    
+    def classify_many(self, titles):
+        """批量判断新闻类别"""
+        import numpy as np
         
-        return news_folder
+        if not titles:
+            return []
+        features, owners = hashed_ngrams(titles, self.hash_bits)
+        scores = np.tile(self.log_prior, (len(titles), 1))
+        if len(features):
+            counts = np.bincount(owners, minlength=len(titles))
+            present = counts > 0
+            starts = (np.cumsum(counts) - counts)[present]
+            scores[present] += np.add.reduceat(self.log_likelihood[features], starts, axis=0)
+        labels = self.labels
+        return [labels[i] for i in scores.argmax(axis=1)]
+    
+    def classify(self, title):
+        """根据标题判断新闻类别"""
+        return self.classify_many([title])[0]
+    
+    def save(self, path):
+        """保存模型（npz格式，先写临时文件再替换）"""
+        import numpy as np
         
-    except Exception as e:
-        # 如果所有方法都失败，使用用户主目录
-        fallback_path = os.path.join(os.path.expanduser('~'), '每日新闻')
-        try:
-            os.makedirs(fallback_path, exist_ok=True)
-            print(f"[!] 警告: 使用备用路径: {fallback_path}")
-            return fallback_path
-        except:
-            raise Exception(f"无法创建新闻文件夹，请检查文件权限: {str(e)}")
-
-def open_file_with_default_app(file_path):
-    """使用系统默认程序打开文件（跨平台）
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, labels=np.array(self.labels), log_prior=self.log_prior,
+                                log_likelihood=self.log_likelihood, hash_bits=self.hash_bits)
+        os.replace(tmp_path, path)
     
-    Args:
-        file_path: 文件路径
-    """
-    try:
-        if sys.platform == 'win32':
-            os.startfile(file_path)
-        elif sys.platform == 'darwin':  # macOS
-            os.system(f'open "{file_path}"')
-        else:  # Linux
-            os.system(f'xdg-open "{file_path}"')
-    except Exception as e:
-        print(f"[!] 无法自动打开文件: {str(e)}")
-        print(f"    请手动打开: {file_path}")
+    @classmethod
+    def load(cls, path):
+        """加载 save 保存的模型"""
+        import numpy as np
+        
+        with np.load(path, allow_pickle=False) as data:
+            return cls([str(label) for label in data['labels']], data['log_prior'],
+                       data['log_likelihood'], int(data['hash_bits']))
 
-def save_to_markdown(news_by_category, unique_news, date_str):
-    """将新闻保存为Markdown文件（按类别分类）
+_classifier = None  # 当前使用的分类器，None表示关键词分类器
+
+def get_classifier():
+    """当前使用的分类器（默认为关键词分类器）"""
+    return _classifier if _classifier is not None else get_keyword_classifier()
+
+def set_classifier(classifier):
+    """切换分类器（None表示恢复关键词分类器）"""
+    global _classifier
+    _classifier = classifier
+
+def categorize_news(title):
+    """根据标题判断新闻类别"""
+    return get_classifier().classify(title)
+
+def categorize_many(titles):
+    """批量判断新闻类别
     
     Args:
-        news_by_category: 按类别分类的新闻字典
-        unique_news: 去重后的新闻列表
-        date_str: 日期字符串（格式：YYYY-MM-DD）
+        titles: 标题列表
     
     Returns:
-        str: 保存的文件路径
+        list: 与标题一一对应的类别列表
     """
-    # 获取保存文件夹（使用桌面路径）
-    news_folder = get_desktop_news_folder()
-    filename = os.path.join(news_folder, f"{date_str}.md")
+    return get_classifier().classify_many(titles)
+
+def categorize_items(news_list):
+    """批量分类 NewsItem（跳过已有类别的），把类别编号记录在每条新闻上
     
-    try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            # 写入标题
-            f.write(f"# 热点新闻日报 {date_str}\n\n")
-            f.write(f"*自动生成于 {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n")
-            f.write(f"**共 {len(unique_news)} 条热点新闻**\n\n")
-            f.write("---\n\n")
-            
-            # 按类别写入新闻
-            for category in CATEGORY_ORDER:
-                if category in news_by_category and news_by_category[category]:
-                    news_list = news_by_category[category]
-                    f.write(f"## {category} ({len(news_list)} 条)\n\n")
-                    
-                    for i, news in enumerate(news_list, 1):
-                        # 转义Markdown特殊字符
-                        title = (news['title']
-                                .replace('\\', '\\\\')
-                                .replace('|', '\\|')
-                                .replace('*', '\\*')
-                                .replace('_', '\\_')
-                                .replace('[', '\\[')
-                                .replace(']', '\\]'))
-                        # 来源作为标注
-                        f.write(f"{i}. [{title}]({news['url']}) *({news['source']})*\n")
-                    
-                    f.write("\n")
-            
-            # 写入页脚
-            f.write("---\n\n")
-            f.write(f"*此日报由 {APP_NAME} v{VERSION} 自动生成*\n")
-            f.write(f"*生成时间: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n")
-            f.write(f"*许可证: MIT License*\n")
-        
-        return filename
-    except IOError as e:
-        raise Exception(f"无法写入文件 {filename}: {str(e)}")
-    except Exception as e:
-        raise Exception(f"保存文件时出错: {str(e)}")
+    Returns:
+        list: 传入的 news_list
+    """
+    # 已有类别的新闻（例如从已处理条目索引中复用的）不再重新分类
+    pending = [news for news in news_list if news.category_id is None]
+    categories = categorize_many([news.title for news in pending])
+    for news, category in zip(pending, categories):
+        news.category_id = CATEGORY_IDS[category]
+    return news_list
 
-def get_yesterday_hot_news():
-    """获取前一天的热点新闻（使用并发加速）"""
-    print("=" * 70)
-    print(f"{APP_NAME} v{VERSION}")
-    print("=" * 70)
-    yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
-    yesterday_date = yesterday.date()
-    yesterday_str = yesterday.strftime('%Y-%m-%d')
-    print(f"正在获取 {yesterday_str} 的热点新闻...")
-    print(f"共 {len(ALL_RSS_SOURCES)} 个新闻源（国内: {len(DOMESTIC_RSS_SOURCES)}, 国外: {len(INTERNATIONAL_RSS_SOURCES)}）")
-    print("=" * 70)
-    print()
+# 类别名称 -> 编号（CATEGORY_ORDER 中的下标）
+CATEGORY_IDS = {category: i for i, category in enumerate(CATEGORY_ORDER)}
+
+# 来源名称驻留表：NewsItem 只保存来源编号，同一来源的名称只保存一份
+_source_names = []
+_source_ids = {}
+_source_lock = threading.Lock()
+
+# 相同日期共用一个 date 对象（同时以ISO格式字符串为键缓存解析结果）
+_dates = {}
+
+# Unix时间戳的起点（UTC）
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+def intern_source(name):
+    """来源名称 -> 来源编号"""
+    source_id = _source_ids.get(name)
+    if source_id is None:
+        with _source_lock:
+            source_id = _source_ids.get(name)
+            if source_id is None:
+                source_id = len(_source_names)
+                _source_names.append(name)
+                _source_ids[name] = source_id
+    return source_id
+
+class NewsItem:
+    """一条新闻
     
-    all_news = []
+    使用 __slots__ 而不是字典以减少内存占用：来源名称驻留为整数编号，
+    类别保存为 CATEGORY_ORDER 中的下标，相同的日期共用一个 date 对象。
+    """
+    __slots__ = ('title', 'url', 'source_id', 'date', 'published', 'category_id', 'merged_source_ids', 'summary')
     
-    # 使用线程池并发获取新闻
-    print(f"[*] 正在并发获取新闻（最多{MAX_WORKERS}个线程）...")
-    print()
+    def __init__(self, title, url, source, date, category=None, published=None):
+        self.title = title
+        self.url = url
+        self.source_id = intern_source(source)
+        self.date = _dates.setdefault(date, date)
+        self.published = published  # 发布时间（UTC Unix时间戳，秒），没有时间信息时为None
+        self.category_id = None if category is None else CATEGORY_IDS[category]
+        self.merged_source_ids = None  # 合并进来的重复新闻的来源编号（元组）
+        self.summary = None  # 文章摘要（见 summarize_news），没有生成时为None
     
-    success_count = 0
-    fail_count = 0
+    @property
+    def source(self):
+        """来源名称"""
+        return _source_names[self.source_id]
     
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # 提交所有任务，传递目标日期
-        future_to_source = {
-            executor.submit(fetch_news_worker, source, yesterday_date): source 
-            for source in ALL_RSS_SOURCES
-        }
-        
-        # 收集结果
-        for future in as_completed(future_to_source):
-            try:
-                source_name, news_list = future.result(timeout=10)
-                all_news.extend(news_list)
-                if news_list:
-                    success_count += 1
-            except Exception:
-                source = future_to_source[future]
-                fail_count += 1
-                safe_print(f"    [-] {source['name']}: 处理失败")
+    @property
+    def category(self):
+        """类别名称，未分类时为None"""
+        return None if self.category_id is None else CATEGORY_ORDER[self.category_id]
     
-    print()
-    print(f"[*] 完成：成功 {success_count} 个源，失败 {fail_count} 个源")
-    print()
+    @property
+    def sources(self):
+        """全部来源名称（包括合并进来的重复新闻的来源）"""
+        if self.merged_source_ids is None:
+            return [self.source]
+        return [_source_names[source_id] for source_id in (self.source_id,) + self.merged_source_ids]
     
-    # 去重
-    unique_news = []
-    seen_titles = set()
-    for news in all_news:
-        title_lower = news['title'].lower().strip()
-        # 更智能的去重：检查标题相似度
-        if title_lower and len(news['title']) > 5:
-            # 简单去重：完全相同的标题
-            if title_lower not in seen_titles:
-                unique_news.append(news)
-                seen_titles.add(title_lower)
-    
-    # 按类别分类
-    news_by_category = {}
-    for news in unique_news:
-        category = categorize_news(news['title'])
-        if category not in news_by_category:
-            news_by_category[category] = []
-        news_by_category[category].append(news)
+    def merge_sources(self, other):
+        """把另一条重复新闻的来源记录到这条新闻上"""
+        source_ids = (self.source_id,) + (self.merged_source_ids or ())
+        for source_id in (other.source_id,) + (other.merged_source_ids or ()):
+            if source_id not in source_ids:
+                source_ids += (source_id,)
+        self.merged_source_ids = source_ids[1:] or None
     
-    # 显示结果
-    print("=" * 70)
-    print(f"{yesterday_str} 热点新闻 (共 {len(unique_news)} 条)")
-    print("=" * 70)
-    print()
+    def to_dict(self):
+        """转换为可以写入JSON的字典"""
+        data = {'title': self.title, 'url': self.url, 'source': self.source, 'date': self.date.isoformat()}
+        if self.published is not None:
+            data['published'] = self.published
+        return data
     
-    if not unique_news:
-        print(f"{yesterday_str} 暂时没有找到热点新闻，请稍后再试。")
-        print("提示：可能是网络问题或新闻源暂时不可用。")
-        return
+    @classmethod
+    def from_dict(cls, data):
+        """从 to_dict 的结果恢复"""
+        date = _dates.get(data['date'])
+        if date is None:
+            date = _dates[data['date']] = datetime.date.fromisoformat(data['date'])
+        return cls(data['title'], data['url'], data['source'], date, published=data.get('published'))
     
-    # 显示类别统计
-    print("\n类别统计：")
-    for category in CATEGORY_ORDER:
-        if category in news_by_category and news_by_category[category]:
-            count = len(news_by_category[category])
-            print(f"  {category}: {count} 条")
-    print()
+    def __reduce__(self):
+        # 来源编号只在当前进程内有效，跨进程传递（解析进程池）时使用名称
+        merged = None if self.merged_source_ids is None else self.sources[1:]
+        return _restore_news_item, (self.title, self.url, self.source, self.date, self.category, merged,
+                                    self.published)
     
-    # 按类别显示新闻
-    for category in CATEGORY_ORDER:
-        if category in news_by_category and news_by_category[category]:
-            news_list = news_by_category[category]
-            print("\n" + "=" * 70)
-            print(f"【{category}】({len(news_list)} 条)")
-            print("=" * 70)
-            
-            # 限制显示数量，避免输出过多
-            display_count = min(len(news_list), MAX_DISPLAY_COUNT)
-            for i, news in enumerate(news_list[:display_count], 1):
-                print(f"{i}. {news['title']}")
-                print(f"   来源: {news['source']} | 链接: {news['url']}")
-            if len(news_list) > display_count:
-                print(f"   ... 还有 {len(news_list) - display_count} 条新闻（已保存到文件）")
+    def __repr__(self):
+        return f"NewsItem({self.title!r}, {self.url!r}, {self.source!r}, {self.date!r})"
+
+def _restore_news_item(title, url, source, date, category, merged_sources, published=None):
+    """NewsItem 的反序列化（见 NewsItem.__reduce__）"""
+    news = NewsItem(title, url, source, date, category, published)
+    if merged_sources:
+        news.merged_source_ids = tuple(intern_source(name) for name in merged_sources)
+    return news
+
+def get_data_dir():
+    """获取本地数据目录，如果不存在则创建
+    
+    Returns:
+        str: 数据目录路径
+    """
+    data_dir = os.path.join(os.path.expanduser('~'), DATA_DIR_NAME)
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+class SourceConfigError(ValueError):
+    """新闻源配置文件格式错误"""
+
+_sources_origin = None  # 当前新闻源列表来自的配置文件，None表示内置列表
+
+def load_sources(path):
+    """从配置文件读取新闻源列表
+    
+    TOML 文件使用 [[sources]] 表数组，JSON 文件可以是列表或 {"sources": [...]}。
+    每个源需要 name 和 url 字段，可选 interval（serve 模式的刷新间隔，秒）、
+    max_items（最多获取的新闻数量）和 adapter（rss/atom/json/html，见 SOURCE_ADAPTERS）。
+    
+    Args:
+        path: 配置文件路径（.toml 或 .json）
+    
+    Returns:
+        list: 新闻源字典列表
+    
+    Raises:
+        SourceConfigError: 文件格式错误
+        OSError: 无法读取文件
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    if path.lower().endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:  # Python 3.11 之前
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise SourceConfigError("读取TOML配置需要 Python 3.11+ 或 tomli（pip install tomli），也可以改用JSON格式")
+        try:
+            data = tomllib.loads(content.decode('utf-8'))
+        except (UnicodeDecodeError, tomllib.TOMLDecodeError) as e:
+            raise SourceConfigError(f"{path}: {str(e)}")
+    else:
+        try:
+            data = json.loads(content)
+        except ValueError as e:
+            raise SourceConfigError(f"{path}: {str(e)}")
+    entries = data.get('sources') if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise SourceConfigError(f"{path}: 缺少新闻源列表（sources）")
+    
+    sources = []
+    names = set()
+    for i, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or not isinstance(entry.get('name'), str) or not isinstance(entry.get('url'), str):
+            raise SourceConfigError(f"{path}: 第 {i} 个新闻源缺少 name 或 url")
+        if entry['name'] in names:
+            raise SourceConfigError(f"{path}: 新闻源名称重复: {entry['name']}")
+        for key in ('interval', 'max_items', 'pages'):
+            value = entry.get(key)
+            if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0):
+                raise SourceConfigError(f"{path}: {entry['name']} 的 {key} 必须是正数")
+        if entry.get('adapter', 'rss') not in SOURCE_ADAPTERS:
+            raise SourceConfigError(f"{path}: {entry['name']} 的 adapter 无效（可选: {', '.join(SOURCE_ADAPTERS)}）")
+        names.add(entry['name'])
+        sources.append(dict(entry))  # 其余字段是适配器的配置（见 SourceAdapter 的子类）
+    return sources
+
+def find_sources_file():
+    """数据目录中的新闻源配置文件（SOURCES_FILES），没有时返回None"""
+    for filename in SOURCES_FILES:
+        path = os.path.join(get_data_dir(), filename)
+        if os.path.exists(path):
+            return path
+    return None
+
+def set_sources(sources, origin=None):
+    """替换新闻源列表（ALL_RSS_SOURCES）
+    
+    Args:
+        sources: 新闻源字典列表
+        origin: 来源的配置文件路径（用于显示）
+    """
+    global ALL_RSS_SOURCES, _sources_origin
+    ALL_RSS_SOURCES = sources
+    _sources_origin = origin
+
+def write_text_atomic(path, text):
+    """原子地写入文本文件（先写临时文件再替换，避免中途中断导致文件损坏）"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def write_json_atomic(path, data):
+    """原子地写入JSON文件"""
+    write_text_atomic(path, json.dumps(data, ensure_ascii=False))
+
+class FeedCache:
+    """RSS源的条件GET缓存（ETag / Last-Modified）
+    
+    以URL为键保存 ETag、Last-Modified 和解析后的条目。下次请求时发送
+    If-None-Match / If-Modified-Since，服务器返回304时直接复用缓存的条目，
+    无需重新下载和调用 feedparser.parse。
+    """
+    
+    def __init__(self, path, max_sources=FEED_CACHE_MAX_SOURCES):
+        self.path = path
+        self.max_sources = max_sources
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+    
+    @classmethod
+    def load(cls, path=None, max_sources=FEED_CACHE_MAX_SOURCES):
+        """从磁盘加载缓存（文件不存在或损坏时返回空缓存）"""
+        if path is None:
+            path = os.path.join(get_data_dir(), FEED_CACHE_FILE)
+        cache = cls(path, max_sources)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                cache._entries = {url: record for url, record in data.items()
+                                  if isinstance(record, dict) and record.get('version') == FEED_CACHE_VERSION}
+        except (OSError, ValueError):
+            pass
+        return cache
+    
+    def conditional_headers(self, url, require_complete=False, window=None, max_items=None):
+        """返回条件GET请求头（没有缓存时返回空字典）
+        
+        缓存的是feed中的全部条目（不按日期筛选）；提前停止解析时只有前面
+        （较新）的一部分，只有它覆盖了请求的日期范围，或者其中已有 max_items
+        条该范围内的条目时才发送条件请求。
+        
+        Args:
+            url: RSS源URL
+            require_complete: 是否要求缓存的是完整条目（提前停止解析得到的部分条目不算）
+            window: 请求的日期范围（DateWindow），None表示不限制
+            max_items: 请求最多需要的该范围内的条目数量
+        """
+        with self._lock:
+            record = self._entries.get(url)
+        headers = {}
+        if record and self._covers(record, require_complete, window, max_items):
+            if record.get('etag'):
+                headers['If-None-Match'] = record['etag']
+            if record.get('last_modified'):
+                headers['If-Modified-Since'] = record['last_modified']
+        return headers
+    
+    @staticmethod
+    def _covers(record, require_complete, window, max_items):
+        """缓存的条目是否满足请求的要求"""
+        if record.get('complete', True):
+            return True
+        if require_complete:
+            return False
+        if window is None:
+            return True
+        oldest = record.get('oldest')
+        if oldest is not None and oldest <= window.start:
+            return True
+        return max_items is not None and sum(map(window, record['entries'])) >= max_items
+    
+    def get_entries(self, url):
+        """返回缓存的条目（并更新最近使用时间），不存在时返回None"""
+        with self._lock:
+            record = self._entries.get(url)
+            if record is None:
+                return None
+            record['last_used'] = datetime.datetime.now().timestamp()
+            self._dirty = True
+            return record['entries']
+    
+    def store(self, url, etag, last_modified, entries, complete=True):
+        """保存响应的验证器和解析后的条目
+        
+        Args:
+            url: RSS源URL
+            etag: ETag响应头
+            last_modified: Last-Modified响应头
+            entries: 精简后的条目列表（未按日期筛选）
+            complete: 条目是否完整（提前停止解析时为False）
+        """
+        if not etag and not last_modified:
+            # 服务器不支持条件GET，缓存没有意义
+            return
+        oldest = None
+        if not complete:
+            timestamps = [timestamp for timestamp in map(entry_timestamp, entries) if timestamp is not None]
+            oldest = min(timestamps, default=None)
+        with self._lock:
+            self._entries[url] = {
+                'version': FEED_CACHE_VERSION,
+                'etag': etag,
+                'last_modified': last_modified,
+                'entries': entries,
+                'complete': complete,
+                'oldest': oldest,
+                'last_used': datetime.datetime.now().timestamp(),
+            }
+            self._dirty = True
+            self._evict()
+    
+    def _evict(self):
+        """超出容量时淘汰最久未使用的源（调用方需持有锁）"""
+        overflow = len(self._entries) - self.max_sources
+        if overflow > 0:
+            oldest = sorted(self._entries, key=lambda u: self._entries[u].get('last_used', 0))
+            for url in oldest[:overflow]:
+                del self._entries[url]
+    
+    def save(self):
+        """如有变更则写回磁盘"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                write_json_atomic(self.path, self._entries)
+                self._dirty = False
+            except OSError as e:
+                safe_print(f"[!] 无法保存RSS缓存: {str(e)}")
+
+class NewsArchive:
+    """按发布日期分桶的本地新闻存档
+    
+    每天一个JSON文件（YYYY-MM-DD.json），以链接（没有链接时用标题）
+    作为去重键，重复运行时只追加之前没见过的条目。
+    """
+    
+    def __init__(self, archive_dir=None):
+        if archive_dir is None:
+            archive_dir = os.path.join(get_data_dir(), ARCHIVE_DIR_NAME)
+        os.makedirs(archive_dir, exist_ok=True)
+        self.archive_dir = archive_dir
+        self._days = {}
+        self._keys = {}
+        self._dirty = set()
+    
+    @staticmethod
+    def news_key(news):
+        """新闻的去重键"""
+        return news.url or news.title.lower().strip()
+    
+    def _day_path(self, day):
+        return os.path.join(self.archive_dir, f"{day.isoformat()}.json")
+    
+    def load_day(self, day):
+        """读取某一天的存档新闻
+        
+        Args:
+            day: 日期（date对象）
+        
+        Returns:
+            list: NewsItem 列表
+        """
+        if day not in self._days:
+            news_list = []
+            try:
+                with open(self._day_path(day), 'r', encoding='utf-8') as f:
+                    news_list = json.load(f)
+                # 原地替换，转换过程中字典逐个释放
+                for i, item in enumerate(news_list):
+                    news_list[i] = NewsItem.from_dict(item)
+            except (OSError, ValueError, KeyError, TypeError):
+                news_list = []
+            self._days[day] = news_list
+            self._keys[day] = {self.news_key(news) for news in news_list}
+        return self._days[day]
+    
+    def add(self, news_list):
+        """将新闻按日期加入存档，已存在的条目会被跳过
+        
+        Args:
+            news_list: NewsItem 列表
+        
+        Returns:
+            int: 新增的条目数量
+        """
+        added = 0
+        for news in news_list:
+            day = news.date
+            self.load_day(day)
+            key = self.news_key(news)
+            if key in self._keys[day]:
+                continue
+            self._keys[day].add(key)
+            self._days[day].append(news)
+            self._dirty.add(day)
+            added += 1
+        return added
+    
+    def save(self):
+        """将有变更的日期写回磁盘"""
+        for day in sorted(self._dirty):
+            data = [news.to_dict() for news in self._days[day]]
+            write_json_atomic(self._day_path(day), data)
+        self._dirty.clear()
+
+class SeenIndex:
+    """已处理条目的索引：条目发布时间和分类结果的缓存（跨运行持久化）
+    
+    以"新闻源 + GUID/链接"的64位哈希为键，记录条目的发布时间和上次的分类结果。
+    同一天内多次运行时，再次出现的条目直接使用记录的时间和类别，跳过发布时间的
+    计算和分类。这些条目并不会被丢弃：日报需要目标日期的全部新闻，它们仍然生成
+    NewsItem、参与去重和排序。文件中记录产生这些类别的分类器标识，换用其他分类器
+    （或关键词表、模型有变化）时只复用发布时间。按时间分代：每隔 SEEN_ROTATION_HOURS 小时轮换一代，
+    最多保留 SEEN_GENERATIONS 代，命中旧一代的条目提升到当前代，长期不再
+    出现的条目随最老的一代一起淘汰。磁盘上每个条目只占16字节。
+    """
+    
+    _HEADER = struct.Struct('<8sd8sI')  # 标识、上次轮换的时间戳、分类器标识、代数
+    _MAGIC = b'NPSEEN3\0'
+    
+    def __init__(self, path):
+        self.path = path
+        self.rotated_at = time.time()
+        self.classifier = get_classifier().identity  # 记录的类别由哪个分类器产生
+        self._generations = [{}]  # 键 -> (发布时间戳 << 8) | (类别编号 + 1)，类别未知时低8位为0
+        self._pending = []  # 本次运行产出的 (键, NewsItem)，保存时记录它们最终的类别
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def load(cls, path=None):
+        """从磁盘加载索引（文件不存在或损坏时返回空索引）"""
+        if path is None:
+            path = os.path.join(get_data_dir(), SEEN_INDEX_FILE)
+        index = cls(path)
+        try:
+            with open(path, 'rb') as f:
+                index._decode(f.read())
+        except (OSError, ValueError, struct.error):
+            index = cls(path)
+        index._rotate()
+        return index
+    
+    def _decode(self, data):
+        import array
+        
+        magic, rotated_at, classifier, count = self._HEADER.unpack_from(data, 0)
+        if magic != self._MAGIC:
+            raise ValueError('不是已处理条目索引文件')
+        offset = self._HEADER.size
+        generations = []
+        for _ in range(count):
+            (size,) = struct.unpack_from('<I', data, offset)
+            offset += 4
+            keys = array.array('Q', data[offset:offset + size * 8])
+            offset += size * 8
+            values = array.array('q', data[offset:offset + size * 8])
+            offset += size * 8
+            if len(keys) != size or len(values) != size:
+                raise ValueError('索引文件不完整')
+            generations.append(dict(zip(keys, values)))
+        self.rotated_at = rotated_at
+        self.classifier = classifier
+        self._generations = generations or [{}]
+    
+    def _rotate(self):
+        """按经过的时间轮换代"""
+        period = SEEN_ROTATION_HOURS * 3600
+        elapsed = int((time.time() - self.rotated_at) // period)
+        if elapsed <= 0:
+            return
+        for _ in range(min(elapsed, SEEN_GENERATIONS)):
+            self._generations.insert(0, {})
+        del self._generations[SEEN_GENERATIONS:]
+        self.rotated_at += elapsed * period
+    
+    def __len__(self):
+        return sum(len(generation) for generation in self._generations)
+    
+    @staticmethod
+    def entry_key(source_name, entry):
+        """条目的键：新闻源 + GUID（没有时用链接，再没有时用标题）的64位哈希"""
+        ident = entry.get('guid') or entry.get('link') or entry.get('title', '')
+        digest = hashlib.blake2b(f"{source_name}\0{ident}".encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little')
+    
+    def lookup(self, key):
+        """查找条目
+        
+        Returns:
+            tuple: (发布日期, 发布时间戳, 类别编号)，类别未知（或由其他分类器产生）时类别编号为None；
+                   没见过的条目返回None
+        """
+        with self._lock:
+            value = self._generations[0].get(key)
+            if value is None:
+                for generation in self._generations[1:]:
+                    value = generation.get(key)
+                    if value is not None:
+                        self._generations[0][key] = value  # 提升到当前代
+                        break
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        category = value & 0xFF if self.classifier == get_classifier().identity else 0
+        published = value >> 8
+        return local_date(published), published, category - 1 if category else None
+    
+    def remember(self, key, news):
+        """记录本次运行产出的条目（类别在 save 时读取，此时管道已完成分类）"""
+        with self._lock:
+            self._pending.append((key, news))
+    
+    def save(self):
+        """写入本次运行记录的条目并保存到磁盘"""
+        import array
+        
+        with self._lock:
+            classifier = get_classifier().identity
+            if classifier != self.classifier:
+                # 换了分类器：之前记录的类别全部作废，只保留发布时间
+                self._generations = [{key: value & ~0xFF for key, value in generation.items()}
+                                     for generation in self._generations]
+                self.classifier = classifier
+            current = self._generations[0]
+            for key, news in self._pending:
+                category = 0 if news.category_id is None else news.category_id + 1
+                current[key] = (news.published << 8) | category
+            self._pending.clear()
+            parts = [self._HEADER.pack(self._MAGIC, self.rotated_at, self.classifier, len(self._generations))]
+            for generation in self._generations:
+                parts.append(struct.pack('<I', len(generation)))
+                parts.append(array.array('Q', generation.keys()).tobytes())
+                parts.append(array.array('q', generation.values()).tobytes())
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(b''.join(parts))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            safe_print(f"[!] 无法保存已处理条目索引: {str(e)}")
+
+def _percentile(sorted_values, q):
+    """最近秩法百分位数（输入需已排序）"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+class SourceHealthStore:
+    """新闻源健康状况（持久化）
+    
+    记录每个源最近的响应耗时、成功/失败次数和最后一次成功时间，据此：
+    - 根据观测到的p95耗时为每个源计算超时时间；
+    - 连续失败的源进入熔断状态，跳过请求，每隔一段时间放行一次探测；
+    - 按耗时从慢到快排序，让慢的源先开始，避免拖长整体耗时。
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._stats = {}
+        self._probing = set()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def load(cls, path=None):
+        """从磁盘加载（文件不存在或损坏时返回空记录）"""
+        if path is None:
+            path = os.path.join(get_data_dir(), SOURCE_HEALTH_FILE)
+        store = cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                store._stats = data
+        except (OSError, ValueError):
+            pass
+        return store
+    
+    def save(self):
+        """写回磁盘"""
+        with self._lock:
+            try:
+                write_json_atomic(self.path, self._stats)
+            except OSError as e:
+                safe_print(f"[!] 无法保存新闻源健康记录: {str(e)}")
+    
+    def _record(self, url):
+        return self._stats.setdefault(url, {
+            'latencies': [],
+            'successes': 0,
+            'failures': 0,
+            'consecutive_failures': 0,
+            'last_success': None,
+            'circuit_opened_at': None,
+        })
+    
+    def latency_percentile(self, url, q):
+        """某个源响应耗时的百分位数（秒），没有样本时返回None"""
+        with self._lock:
+            latencies = sorted(self._stats.get(url, {}).get('latencies', []))
+        return _percentile(latencies, q)
+    
+    def error_rate(self, url):
+        """某个源的累计失败率，没有记录时返回None"""
+        with self._lock:
+            record = self._stats.get(url)
+            if not record or not record['successes'] + record['failures']:
+                return None
+            return record['failures'] / (record['successes'] + record['failures'])
+    
+    def last_success(self, url):
+        """某个源最后一次成功的时间戳，从未成功时返回None"""
+        with self._lock:
+            return self._stats.get(url, {}).get('last_success')
+    
+    def is_open(self, url):
+        """熔断是否打开"""
+        with self._lock:
+            record = self._stats.get(url)
+            return bool(record and record.get('circuit_opened_at'))
+    
+    def timeout_for(self, url, default=RSS_TIMEOUT):
+        """根据观测到的p95耗时计算该源的超时时间（秒）"""
+        with self._lock:
+            if url in self._probing:
+                return min(default, CIRCUIT_PROBE_TIMEOUT)
+            latencies = sorted(self._stats.get(url, {}).get('latencies', []))
+        if len(latencies) < HEALTH_MIN_SAMPLES:
+            return default
+        p95 = _percentile(latencies, 95)
+        return max(HEALTH_MIN_TIMEOUT, min(default, p95 * HEALTH_TIMEOUT_FACTOR))
+    
+    def hedge_delay(self, url):
+        """请求超过多少秒仍未完成时发送对冲请求，样本不足时返回None（不对冲）"""
+        with self._lock:
+            latencies = sorted(self._stats.get(url, {}).get('latencies', []))
+        if len(latencies) < HEALTH_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, _percentile(latencies, HEDGE_PERCENTILE))
+    
+    def record_success(self, url, latency):
+        """记录一次成功请求（同时关闭熔断）"""
+        with self._lock:
+            record = self._record(url)
+            record['latencies'] = (record['latencies'] + [round(latency, 3)])[-HEALTH_LATENCY_SAMPLES:]
+            record['successes'] += 1
+            record['consecutive_failures'] = 0
+            record['last_success'] = time.time()
+            record['circuit_opened_at'] = None
+            self._probing.discard(url)
+    
+    def record_failure(self, url, latency=None):
+        """记录一次失败请求，连续失败达到阈值（或探测失败）时打开熔断"""
+        with self._lock:
+            record = self._record(url)
+            if latency is not None:
+                record['latencies'] = (record['latencies'] + [round(latency, 3)])[-HEALTH_LATENCY_SAMPLES:]
+            record['failures'] += 1
+            record['consecutive_failures'] += 1
+            if record['consecutive_failures'] >= CIRCUIT_FAILURE_THRESHOLD or url in self._probing:
+                record['circuit_opened_at'] = time.time()
+            self._probing.discard(url)
+    
+    def plan(self, sources, now=None):
+        """安排本次运行的请求顺序
+        
+        Args:
+            sources: 新闻源列表
+            now: 当前时间戳（默认为 time.time()）
+        
+        Returns:
+            tuple: (按耗时从慢到快排列的待请求源列表, 因熔断跳过的源列表)；
+                   熔断后到期的探测请求排在最后，使用较短的超时
+        """
+        if now is None:
+            now = time.time()
+        active, probes, skipped = [], [], []
+        for source in sources:
+            url = source['url']
+            with self._lock:
+                opened_at = self._stats.get(url, {}).get('circuit_opened_at')
+                probe = bool(opened_at) and now - opened_at >= CIRCUIT_RETRY_INTERVAL
+                if probe:
+                    # 半开状态：放行一次探测请求
+                    self._probing.add(url)
+            if not opened_at:
+                active.append(source)
+            elif probe:
+                probes.append(source)
+            else:
+                skipped.append(source)
+        
+        # 没有样本的源按最大超时估计，排在前面
+        def expected_latency(source):
+            p95 = self.latency_percentile(source['url'], 95)
+            return RSS_TIMEOUT if p95 is None else p95
+        active.sort(key=expected_latency, reverse=True)
+        return active + probes, skipped
+
+def host_of(url):
+    """URL的主机名（小写，不含端口）"""
+    return (urllib.parse.urlsplit(url).hostname or '').lower()
+
+def interleave_by_host(sources):
+    """按主机轮流排列新闻源（各主机内部保持原有顺序）
+    
+    同一主机的源不会连续出现，线程池按顺序取任务时不同主机的请求自然交错，
+    不会有多个线程同时卡在同一个主机的限速上。
+    """
+    groups = {}
+    for source in sources:
+        groups.setdefault(host_of(source['url']), []).append(source)
+    groups = list(groups.values())
+    interleaved = []
+    for i in range(max(map(len, groups), default=0)):
+        interleaved.extend(group[i] for group in groups if i < len(group))
+    return interleaved
+
+def parse_retry_after(value):
+    """解析 Retry-After 响应头（秒数或HTTP日期），返回需要等待的秒数，无法解析时返回None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+def throttle_delay(error):
+    """请求被限流（429/503）时返回应暂停该主机的秒数，其他错误返回None
+    
+    同时支持 requests.HTTPError 和 aiohttp.ClientResponseError。
+    """
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status', None)
+    if status not in THROTTLE_STATUS_CODES:
+        return None
+    headers = getattr(response, 'headers', None) or getattr(error, 'headers', None) or {}
+    delay = parse_retry_after(headers.get('Retry-After'))
+    return HOST_THROTTLE_BACKOFF if delay is None else delay
+
+class _HostState:
+    """HostLimiter 中一个主机的状态"""
+    __slots__ = ('active', 'max_active', 'tokens', 'rate', 'burst', 'refilled', 'paused_until')
+    
+    def __init__(self, max_active, rate, burst, now):
+        self.active = 0  # 进行中的请求数
+        self.max_active = max_active
+        self.tokens = float(burst)
+        self.rate = rate
+        self.burst = burst
+        self.refilled = now  # 上次补充令牌的时间
+        self.paused_until = 0.0  # 被限流后暂停到的时间
+
+class HostLimiter:
+    """按主机的礼貌访问控制：并发上限 + 令牌桶限速 + 遵守 Retry-After
+    
+    同一主机最多同时进行 max_per_host 个请求，平均每秒 rate 个（允许突发 burst 个）；
+    主机返回429/503后，在 Retry-After 指定的时间之前不再向它发送请求。
+    HOST_LIMIT_OVERRIDES 可以为个别主机单独设置限制。线程使用 call，
+    协程使用 acquire_async / release。
+    """
+    
+    def __init__(self, max_per_host=HOST_MAX_CONCURRENCY, rate=HOST_RATE, burst=HOST_BURST, overrides=None):
+        self.max_per_host = max_per_host
+        self.rate = rate
+        self.burst = burst
+        self.overrides = HOST_LIMIT_OVERRIDES if overrides is None else overrides
+        self._hosts = {}
+        self._cond = threading.Condition()
+    
+    def _state(self, host, now):
+        state = self._hosts.get(host)
+        if state is None:
+            max_active, rate, burst = self.overrides.get(host, (self.max_per_host, self.rate, self.burst))
+            state = self._hosts[host] = _HostState(max_active, rate, burst, now)
+        return state
+    
+    def _try_acquire(self, host):
+        """尝试占用一个请求名额（调用方持有锁）
+        
+        Returns:
+            0表示成功；否则为需要等待的秒数，None表示要等其他请求结束
+        """
+        now = time.monotonic()
+        state = self._state(host, now)
+        if now < state.paused_until:
+            return state.paused_until - now
+        if state.active >= state.max_active:
+            return None
+        state.tokens = min(state.burst, state.tokens + (now - state.refilled) * state.rate)
+        state.refilled = now
+        if state.tokens < 1:
+            return (1 - state.tokens) / state.rate
+        state.tokens -= 1
+        state.active += 1
+        return 0
+    
+    def acquire(self, url):
+        """阻塞直到可以向该URL的主机发送请求"""
+        host = host_of(url)
+        with self._cond:
+            while True:
+                delay = self._try_acquire(host)
+                if delay == 0:
+                    return
+                self._cond.wait(delay)
+    
+    async def acquire_async(self, url):
+        """acquire 的协程版本（等待期间不阻塞事件循环）"""
+        import asyncio
+        
+        host = host_of(url)
+        while True:
+            with self._cond:
+                delay = self._try_acquire(host)
+            if delay == 0:
+                return
+            await asyncio.sleep(HOST_POLL_INTERVAL if delay is None else delay)
+    
+    def release(self, url):
+        """请求结束，归还名额"""
+        with self._cond:
+            self._hosts[host_of(url)].active -= 1
+            self._cond.notify_all()
+    
+    def pause(self, url, delay):
+        """主机限流：delay 秒内不再向它发送请求"""
+        host = host_of(url)
+        with self._cond:
+            state = self._state(host, time.monotonic())
+            state.paused_until = max(state.paused_until, time.monotonic() + delay)
+        safe_print(f"    [~] {host} 要求降低请求频率，暂停 {delay:.0f} 秒")
+    
+    def call(self, url, func):
+        """在主机限制下调用 func()
+        
+        被限流时暂停该主机；Retry-After 不超过 HOST_RETRY_AFTER_MAX 时等待后重试一次，
+        否则抛出原来的异常。
+        """
+        for attempt in range(2):
+            self.acquire(url)
+            try:
+                return func()
+            except Exception as e:
+                delay = throttle_delay(e)
+                if delay is None:
+                    raise
+                self.pause(url, delay)
+                if attempt or delay > HOST_RETRY_AFTER_MAX:
+                    raise
+            finally:
+                self.release(url)
+
+class NewsStore:
+    """本地新闻数据库（SQLite，WAL模式）
+    
+    每条新闻以（来源, 链接）为唯一键（没有链接时用标题），重复运行时
+    更新已有记录。标题建立FTS5 trigram全文索引，中英文关键词都可以检索；
+    SQLite不支持FTS5或trigram分词器时退回到LIKE查询。
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS news (
+            id INTEGER PRIMARY KEY,
+            source TEXT NOT NULL,
+            news_key TEXT NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            category TEXT NOT NULL,
+            date TEXT NOT NULL,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL,
+            UNIQUE (source, news_key)
+        );
+        CREATE INDEX IF NOT EXISTS news_date ON news (date);
+        CREATE INDEX IF NOT EXISTS news_source_date ON news (source, date);
+        CREATE INDEX IF NOT EXISTS news_category_date ON news (category, date);
+    """
+    
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+            title, content='news', content_rowid='id', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS news_fts_insert AFTER INSERT ON news BEGIN
+            INSERT INTO news_fts (rowid, title) VALUES (new.id, new.title);
+        END;
+        CREATE TRIGGER IF NOT EXISTS news_fts_delete AFTER DELETE ON news BEGIN
+            INSERT INTO news_fts (news_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        END;
+        CREATE TRIGGER IF NOT EXISTS news_fts_update AFTER UPDATE OF title ON news BEGIN
+            INSERT INTO news_fts (news_fts, rowid, title) VALUES ('delete', old.id, old.title);
+            INSERT INTO news_fts (rowid, title) VALUES (new.id, new.title);
+        END;
+    """
+    
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(get_data_dir(), NEWS_DB_FILE)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.conn:
+            self.conn.executescript(self.SCHEMA)
+        try:
+            with self.conn:
+                self.conn.executescript(self.FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite 3.34 之前没有trigram分词器（或编译时未启用FTS5）
+            self.has_fts = False
+    
+    def close(self):
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+    
+    def upsert_many(self, news_list):
+        """在一个事务中批量写入新闻
+        
+        Args:
+            news_list: 已分类的 NewsItem 列表
+        
+        Returns:
+            int: 写入的条数
+        """
+        now = time.time()
+        rows = [
+            (news.source, NewsArchive.news_key(news), news.title, news.url or '', news.category,
+             news.date.isoformat(), now, now)
+            for news in news_list
+        ]
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO news (source, news_key, title, url, category, date, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, news_key) DO UPDATE SET
+                    title = excluded.title, url = excluded.url, category = excluded.category,
+                    date = excluded.date, last_seen = excluded.last_seen
+            """, rows)
+        return len(rows)
+    
+    def search(self, keywords=(), start_date=None, end_date=None, category=None, source=None,
+               limit=QUERY_DEFAULT_LIMIT):
+        """按关键词、日期范围、类别和来源检索新闻（按日期倒序）
+        
+        Args:
+            keywords: 关键词列表（全部匹配），不少于3个字符的关键词使用全文索引
+            start_date: 起始日期（date对象，包含）
+            end_date: 结束日期（date对象，包含）
+            category: 类别
+            source: 新闻源名称
+            limit: 最多返回的条数
+        
+        Returns:
+            list: (日期, 类别, 来源, 标题, 链接) 元组列表
+        """
+        conditions = []
+        params = []
+        fts_terms = []
+        for keyword in keywords:
+            if self.has_fts and len(keyword) >= FTS_MIN_KEYWORD_LENGTH:
+                fts_terms.append('"' + keyword.replace('"', '""') + '"')
+            else:
+                conditions.append("news.title LIKE ? ESCAPE '\\'")
+                params.append('%' + keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        if fts_terms:
+            conditions.append("news.id IN (SELECT rowid FROM news_fts WHERE news_fts MATCH ?)")
+            params.append(' AND '.join(fts_terms))
+        if start_date is not None:
+            conditions.append("news.date >= ?")
+            params.append(start_date.isoformat())
+        if end_date is not None:
+            conditions.append("news.date <= ?")
+            params.append(end_date.isoformat())
+        if category is not None:
+            conditions.append("news.category = ?")
+            params.append(category)
+        if source is not None:
+            conditions.append("news.source = ?")
+            params.append(source)
+        
+        sql = "SELECT date, category, source, title, url FROM news"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY date DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+    
+    def labeled_titles(self, start_date=None, end_date=None):
+        """读取日期范围内的全部（标题, 类别），用于训练统计分类器
+        
+        Returns:
+            list: (标题, 类别) 元组列表
+        """
+        conditions = []
+        params = []
+        if start_date is not None:
+            conditions.append("date >= ?")
+            params.append(start_date.isoformat())
+        if end_date is not None:
+            conditions.append("date <= ?")
+            params.append(end_date.isoformat())
+        sql = "SELECT title, category FROM news"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return self.conn.execute(sql + " ORDER BY id", params).fetchall()
+
+def store_news(news_list):
+    """把本次运行收集到的全部新闻（去重前）写入本地数据库"""
+    if not news_list:
+        return
+    try:
+        with _profiler.span('store', items=len(news_list)):
+            # 去重时被合并掉的新闻还没有分类
+            uncategorized = [news for news in news_list if news.category_id is None]
+            categorize_items(uncategorized)
+            with NewsStore() as store:
+                count = store.upsert_many(news_list)
+        print(f"[*] 已写入本地数据库 {count} 条")
+    except sqlite3.Error as e:
+        print(f"[!] 写入本地数据库失败: {str(e)}")
+
+def simplify_feed_entries(entries):
+    """将feedparser条目精简为可缓存的字典（只保留标题、链接、GUID和发布时间）
+    
+    Args:
+        entries: feedparser条目列表
+    
+    Returns:
+        list: 精简后的条目列表
+    """
+    simple_entries = []
+    for entry in entries:
+        simple_entries.append({
+            'title': entry.get('title', ''),
+            'link': entry.get('link', ''),
+            'guid': entry.get('id', ''),
+            'timestamp': entry_timestamp(entry),
+        })
+    return simple_entries
+
+class FeedParseError(ValueError):
+    """快速解析器无法处理该feed（格式错误或不是RSS/Atom），需要回退到feedparser"""
+
+def _local_name(tag):
+    """去掉XML命名空间，返回本地标签名"""
+    return tag.rsplit('}', 1)[-1] if '}' in tag else tag
+
+_MONTHS = {name: i for i, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)}
+
+# RFC 822（RSS）：Sat, 17 Oct 2026 08:30:00 +0800，时区为数字偏移或 GMT/UT/UTC/Z
+_RFC822_RE = re.compile(r'(?:[A-Za-z]{3},?\s*)?(?P<day>\d{1,2})\s+(?P<month>[A-Za-z]{3})[A-Za-z]*\.?\s+(?P<year>\d{2,4})\s+'
+                        r'(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?\s*'
+                        r'(?P<zone>[+-]\d{2}:?\d{2}|GMT|UTC?|Z)?$')
+# ISO 8601（Atom）：2026-10-17T08:30:00+08:00、2026-10-17T00:30:00.123Z、2026-10-17
+_ISO8601_RE = re.compile(r'(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})'
+                         r'(?:[Tt ](?P<hour>\d{2}):(?P<minute>\d{2})(?::(?P<second>\d{2})(?:[.,]\d+)?)?)?\s*'
+                         r'(?P<zone>[+-]\d{2}:?\d{2}|[Zz])?$')
+_DAY_STARTS_MAX = 10000  # 缓存的日期数量上限
+
+# (年, 月, 日) 原始字符串 -> 当天0点（UTC）的Unix时间戳，无效日期为False
+_day_starts = {}
+# 时区字符串 -> 相对UTC的秒数
+_zone_offsets = {None: 0, 'GMT': 0, 'UT': 0, 'UTC': 0, 'Z': 0, 'z': 0}
+
+def utc_timestamp(fields):
+    """UTC时间的前6个字段（年、月、日、时、分、秒）-> Unix时间戳（秒）"""
+    year, month, day, hour, minute, second = fields[:6]
+    days = datetime.date(year, month, day).toordinal() - _EPOCH_ORDINAL
+    return days * 86400 + hour * 3600 + minute * 60 + second
+
+def _utc_day_start(year, month, day):
+    """_day_starts 的计算：年、月、日的原始字符串 -> 当天0点（UTC）的时间戳，无效日期返回False"""
+    month = _MONTHS.get(month.lower()) if month.isalpha() else int(month)
+    year = int(year)
+    if year < 100:
+        year += 2000 if year < 50 else 1900
+    try:
+        return (datetime.date(year, month, int(day)).toordinal() - _EPOCH_ORDINAL) * 86400
+    except (TypeError, ValueError):
+        return False
+
+def _zone_offset(zone):
+    """数字时区偏移（+0800、-05:00）-> 秒数"""
+    sign = -1 if zone[0] == '-' else 1
+    return sign * (int(zone[1:3]) * 3600 + int(zone[-2:]) * 60)
+
+def parse_feed_timestamp(value):
+    """解析RSS（RFC 822）或Atom（ISO 8601）日期，返回UTC Unix时间戳（秒）
+    
+    feed中实际出现的格式用正则表达式匹配后直接换算成时间戳（快速路径，
+    不创建datetime对象，日期和时区的换算结果缓存复用）；其他写法（例如
+    EST 之类的时区缩写）交给 email.utils 和 datetime.fromisoformat 处理。
+    没有时区的时间按UTC处理。
+    
+    Args:
+        value: 日期字符串
+    
+    Returns:
+        int: Unix时间戳，无法解析时返回None
+    """
+    value = (value or '').strip()
+    if not value:
+        return None
+    match = (_ISO8601_RE if value[:4].isdigit() else _RFC822_RE).match(value)
+    if match is not None:
+        year, month, day, hour, minute, second, zone = match.group(
+            'year', 'month', 'day', 'hour', 'minute', 'second', 'zone')
+        key = (year, month, day)
+        start = _day_starts.get(key)
+        if start is None:
+            if len(_day_starts) >= _DAY_STARTS_MAX:
+                _day_starts.clear()
+            start = _day_starts[key] = _utc_day_start(year, month, day)
+        offset = _zone_offsets.get(zone)
+        if offset is None:
+            offset = _zone_offsets[zone] = _zone_offset(zone)
+        if start is False:
+            return None
+        if hour is None:
+            return start - offset
+        hour, minute = int(hour), int(minute)
+        if hour < 24 and minute < 60:
+            return start + hour * 3600 + minute * 60 + int(second or 0) - offset
+        return None
+    # 不常见的写法
+    try:
+        if value[:4].isdigit():
+            if value.endswith(('Z', 'z')):
+                value = value[:-1] + '+00:00'
+            dt = datetime.datetime.fromisoformat(value)
+        else:
+            dt = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return int(dt.timestamp())
+
+# 条目中表示发布时间的标签（按优先级）
+_FEED_DATE_TAGS = ('pubDate', 'published', 'issued', 'date', 'updated', 'modified')
+# feed的根元素（用于识别非RSS/Atom的内容）
+_FEED_ROOT_TAGS = frozenset(['rss', 'feed', 'RDF', 'channel'])
+
+class FeedStreamParser:
+    """增量RSS/Atom解析器（iterparse风格的快速路径）
+    
+    逐块接收响应内容，每解析完一个 item/entry 就提取标题、链接和日期并
+    释放该元素，符合条件的条目达到 max_items 条后即可停止读取。返回的是
+    读到的全部条目（accept 只用于计数，日期筛选由调用方进行），这样缓存的
+    条目也适用于其他日期。accept 是 DateWindow 时，每个数据块中的条目先
+    批量解析日期，直接比较时间戳计数。
+    遇到格式错误或非RSS/Atom内容时抛出 FeedParseError，由调用方回退到
+    feedparser。
+    """
+    
+    def __init__(self, max_items=None, accept=None):
+        """
+        Args:
+            max_items: 符合条件的条目达到该数量后停止，None表示不限制
+            accept: 条目过滤函数，只有返回True的条目计入 max_items
+        """
+        self.max_items = max_items
+        self.accept = accept
+        self.entries = []
+        self.accepted = 0
+        self.complete = False
+        self._parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        self._root_checked = False
+    
+    @property
+    def done(self):
+        """是否已收集到足够的条目"""
+        return self.max_items is not None and self.accepted >= self.max_items
+    
+    def feed(self, chunk):
+        """送入一块数据
+        
+        Returns:
+            bool: 是否已收集到足够的条目（可以停止读取）
+        """
+        try:
+            self._parser.feed(chunk)
+            self._process_events()
+        except ElementTree.ParseError as e:
+            raise FeedParseError(str(e))
+        return self.done
+    
+    def close(self):
+        """数据全部送入后调用，返回收集到的条目"""
+        if not self.done:
+            try:
+                self._parser.close()
+                self._process_events()
+            except ElementTree.ParseError as e:
+                raise FeedParseError(str(e))
+            if not self._root_checked:
+                raise FeedParseError('空文档')
+            self.complete = True
+        return self.entries
+    
+    def _process_events(self):
+        items = []
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                if not self._root_checked:
+                    tag = _local_name(elem.tag)
+                    if tag not in _FEED_ROOT_TAGS:
+                        raise FeedParseError(f'不是RSS/Atom文档: <{tag}>')
+                    self._root_checked = True
+                continue
+            if elem.tag.endswith(('item', 'entry')) and _local_name(elem.tag) in ('item', 'entry'):
+                items.append(elem)
+        if not items:
+            return
+        window = self.accept if isinstance(self.accept, DateWindow) else None
+        timestamps = [self._entry_timestamp(elem) for elem in items]
+        for elem, timestamp in zip(items, timestamps):
+            if self.done:
+                break
+            entry = self._build_entry(elem, timestamp)
+            elem.clear()
+            self.entries.append(entry)
+            if window is not None:
+                self.accepted += timestamp is None or window.start <= timestamp < window.end
+            elif self.accept is None or self.accept(entry):
+                self.accepted += 1
+    
+    @staticmethod
+    def _entry_timestamp(elem):
+        dates = {}
+        for child in elem:
+            name = _local_name(child.tag)
+            if name in _FEED_DATE_TAGS and name not in dates:
+                dates[name] = child.text
+        for name in _FEED_DATE_TAGS:
+            if name in dates:
+                timestamp = parse_feed_timestamp(dates[name])
+                if timestamp is not None:
+                    return timestamp
+        return None
+    
+    @staticmethod
+    def _build_entry(elem, timestamp):
+        title = ''
+        link = ''
+        guid = ''
+        for child in elem:
+            name = _local_name(child.tag)
+            if name == 'title':
+                title = ''.join(child.itertext()).strip()
+            elif name in ('guid', 'id'):
+                guid = (child.text or '').strip()
+            elif name == 'link':
+                href = child.get('href')
+                if href is not None:
+                    # Atom: 优先使用 rel="alternate" 的链接
+                    if not link or child.get('rel', 'alternate') == 'alternate':
+                        link = href
+                elif not link:
+                    link = (child.text or '').strip()
+        return {'title': title, 'link': link, 'guid': guid, 'timestamp': timestamp}
+
+def parse_feed_content(content, max_items=None, accept=None):
+    """解析完整的feed内容：优先使用快速解析器，失败时回退到feedparser
+    
+    Args:
+        content: 响应内容（bytes）
+        max_items: 符合条件的条目达到该数量后停止（只对快速解析器生效）
+        accept: 条目过滤函数（只用于计数，返回的条目未经筛选）
+    
+    Returns:
+        tuple: (条目列表, 是否完整)
+    """
+    parser = FeedStreamParser(max_items, accept)
+    try:
+        for start in range(0, len(content), FEED_CHUNK_SIZE):
+            if parser.feed(content[start:start + FEED_CHUNK_SIZE]):
+                break
+        entries = parser.close()
+        return entries, parser.complete
+    except FeedParseError:
+        feed = _lazy_import('feedparser').parse(content)
+        return simplify_feed_entries(feed.entries), True
+
+def entry_timestamp(entry):
+    """条目的发布时间（UTC Unix时间戳，秒），没有日期信息时返回None
+    
+    也接受 feedparser 条目和旧版本缓存中的 published_parsed（UTC时间的前6个字段）。
+    """
+    timestamp = entry.get('timestamp')
+    if timestamp is not None:
+        return timestamp
+    try:
+        published = entry.get('published_parsed') or entry.get('updated_parsed')
+        if published:
+            return utc_timestamp(published)
+    except (ValueError, TypeError, IndexError):
+        pass
+    return None
+
+def local_midnight(date):
+    """本地时区中某一天0点的Unix时间戳（考虑夏令时）"""
+    return int(datetime.datetime.combine(date, datetime.time()).timestamp())
+
+def local_date(timestamp):
+    """Unix时间戳在本地时区中的日期（相同的日期共用一个 date 对象）"""
+    date = datetime.date.fromtimestamp(timestamp)
+    return _dates.setdefault(date, date)
+
+class DateWindow:
+    """本地时区中一段日期（包含两端）对应的UTC时间戳区间 [start, end)
+    
+    feed中的发布时间是UTC，日报却按本地日期划分：在UTC+8，10月17日是UTC的
+    10月16日16:00到10月17日16:00。区间两端只在创建时用本地时区换算一次，
+    之后每个条目只需比较两个整数。也可以直接作为条目过滤函数（accept）使用，
+    没有日期信息的条目同样接受。时区由系统设置（或 TZ 环境变量）决定。
+    """
+    __slots__ = ('start_date', 'end_date', 'start', 'end')
+    
+    def __init__(self, start_date, end_date=None):
+        self.start_date = start_date
+        self.end_date = start_date if end_date is None else end_date
+        self.start = local_midnight(self.start_date)
+        self.end = local_midnight(self.end_date + datetime.timedelta(days=1))
+    
+    def __contains__(self, timestamp):
+        return self.start <= timestamp < self.end
+    
+    def __call__(self, entry):
+        timestamp = entry_timestamp(entry)
+        return timestamp is None or self.start <= timestamp < self.end
+    
+    def __repr__(self):
+        return f"DateWindow({self.start_date!r}, {self.end_date!r})"
+
+def make_date_filter(target_date):
+    """构建条目过滤函数：只接受目标日期（本地时区）或没有日期信息的条目"""
+    return DateWindow(target_date)
+
+def filter_feed_entries(entries, source_name, target_date=None, max_items=MAX_ITEMS_PER_SOURCE, seen=None):
+    """从已解析的条目中筛选目标日期的新闻
+    
+    Args:
+        entries: 条目列表（feedparser条目或 simplify_feed_entries 的结果）
+        source_name: 新闻源名称
+        target_date: 目标日期（date对象），如果为None则使用昨天
+        max_items: 最多返回的符合条件的新闻数量
+        seen: SeenIndex 对象，见过的条目直接使用记录的发布时间和类别（仍然返回这些条目）
+    
+    Returns:
+        list: NewsItem 列表
+    """
+    news_list = []
+    
+    # 如果没有指定目标日期，使用昨天
+    if target_date is None:
+        target_date = datetime.datetime.now().date() - datetime.timedelta(days=1)
+    
+    # 检查是否有条目
+    if not entries:
+        return []
+    
+    # 目标日期在本地时区中的UTC时间戳区间，每个条目只比较整数
+    window = DateWindow(target_date)
+    start, end = window.start, window.end
+    for entry in entries:
+        if max_items is not None and len(news_list) >= max_items:
+            break
+        try:
+            key = known = None
+            if seen is not None:
+                key = seen.entry_key(source_name, entry)
+                known = seen.lookup(key)
+            if known is not None:
+                # 之前处理过的条目：直接使用记录的发布时间和类别
+                _, published, category_id = known
+            else:
+                published = entry_timestamp(entry)
+                category_id = None
+            
+            # 只接受目标日期的新闻（如果没有日期信息，也接受，但标记为目标日期）
+            if published is None or start <= published < end:
+                title = entry.get('title', '').strip()
+                link = entry.get('link', '')
+                
+                if title and len(title) > 5:
+                    news = NewsItem(title, link, source_name, target_date, published=published)
+                    news.category_id = category_id
+                    news_list.append(news)
+                    # 没有日期信息的条目不记录（它们每天都被当作目标日期的新闻）
+                    if key is not None and published is not None:
+                        seen.remember(key, news)
+        except (KeyError, AttributeError, ValueError, TypeError):
+            continue
+    
+    return news_list
+
+def bucket_feed_entries(entries, source_name, start_date, end_date):
+    """将条目按发布日期分桶（用于多日存档，不限制数量）
+    
+    Args:
+        entries: 条目列表（feedparser条目或 simplify_feed_entries 的结果）
+        source_name: 新闻源名称
+        start_date: 起始日期（包含，本地时区）
+        end_date: 结束日期（包含，本地时区）
+    
+    Returns:
+        list: 日期在范围内的 NewsItem 列表（没有日期信息的条目会被跳过）
+    """
+    news_list = []
+    window = DateWindow(start_date, end_date)
+    for entry in entries:
+        try:
+            published = entry_timestamp(entry)
+            if published is None or published not in window:
+                continue
+            title = entry.get('title', '').strip()
+            if title and len(title) > 5:
+                news_list.append(NewsItem(title, entry.get('link', ''), source_name, local_date(published),
+                                          published=published))
+        except (KeyError, AttributeError, ValueError, TypeError, IndexError):
+            continue
+    return news_list
+
+class RunDeadline:
+    """整次运行的截止时间，到期时记录尚未完成的新闻源"""
+    
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+        self.missing = []  # 截止时仍未完成的新闻源名称
+    
+    def remaining(self):
+        """剩余的秒数"""
+        return max(0.0, self.expires - time.monotonic())
+
+def hedged_call(func, delay, source_name):
+    """对冲请求：func() 超过 delay 秒仍未完成时再并行调用一次，返回先成功的结果
+    
+    两次都失败时抛出后失败的异常。第一次在 delay 之前就失败时直接抛出，不再对冲。
+    调用在独立的守护线程中进行，被放弃的那次请求在自己的超时时间内结束。
+    """
+    results = queue.Queue()
+    
+    def run():
+        try:
+            results.put((True, func()))
+        except Exception as e:
+            results.put((False, e))
+    
+    threading.Thread(target=run, daemon=True).start()
+    try:
+        ok, value = results.get(timeout=delay)
+    except queue.Empty:
+        safe_print(f"    [~] {source_name}: {delay:.1f}秒未完成，发送对冲请求")
+        threading.Thread(target=run, daemon=True).start()
+        for _ in range(2):
+            ok, value = results.get()
+            if ok:
+                return value
+        raise value
+    if ok:
+        return value
+    raise value
+
+def report_fetch_error(source_name, error):
+    """打印获取失败的原因"""
+    requests = _lazy_import('requests')
+    if isinstance(error, requests.Timeout):
+        safe_print(f"    [-] {source_name}: 超时")
+    elif isinstance(error, requests.RequestException):
+        safe_print(f"    [-] {source_name}: 网络错误 ({str(error)[:30]})")
+    else:
+        safe_print(f"    [-] {source_name}: 失败 ({str(error)[:30]})")
+
+def read_feed_stream(chunks, max_items=None, accept=None):
+    """从响应数据块流式解析feed，收集到足够条目后立即停止读取
+    
+    快速解析失败时，把已读取的数据和剩余数据拼接起来交给feedparser。
+    
+    Args:
+        chunks: 响应数据块的迭代器
+        max_items: 最多收集的条目数量
+        accept: 条目过滤函数
+    
+    Returns:
+        tuple: (条目列表, 是否完整)
+    """
+    parser = FeedStreamParser(max_items, accept)
+    received = []
+    profiler = _profiler
+    start = time.perf_counter()
+    parse_time = 0.0
+    try:
+        for chunk in chunks:
+            received.append(chunk)
+            if profiler.enabled:
+                parse_start = time.perf_counter()
+                done = parser.feed(chunk)
+                parse_time += time.perf_counter() - parse_start
+            else:
+                done = parser.feed(chunk)
+            if done:
+                break
+        entries = parser.close()
+        if profiler.enabled:
+            # 下载与解析交替进行：解析器内的时间计为parse，其余为等待网络数据
+            total = time.perf_counter() - start
+            profiler.add('download', start, total - parse_time)
+            profiler.add('parse', start, parse_time)
+        return entries, parser.complete
+    except FeedParseError:
+        content = b''.join(received) + b''.join(chunks)
+        if profiler.enabled:
+            profiler.add('download', start, time.perf_counter() - start - parse_time)
+        with profiler.span('feedparser.parse'):
+            feed = _lazy_import('feedparser').parse(content)
+        return simplify_feed_entries(feed.entries), True
+
+def request_feed(rss_url, timeout=RSS_TIMEOUT, cache=None, require_complete=False, session=None, window=None,
+                 max_items=None):
+    """发送（条件）GET请求（失败时抛出异常）
+    
+    Args:
+        rss_url: RSS源URL
+        timeout: 超时时间
+        cache: FeedCache 对象，为None时不使用条件GET缓存
+        require_complete: 是否只在缓存的条目完整时才发送条件请求
+        session: requests.Session 对象（复用连接），为None时每次新建连接
+        window: 请求的日期范围（DateWindow），缓存的部分条目不能满足时不发送条件请求
+        max_items: 请求最多需要的该范围内的条目数量
+    
+    Returns:
+        tuple: (响应对象, 缓存的条目) —— 内容未变化时响应对象为None；
+               否则缓存的条目为None，调用方负责关闭响应
+    """
+    # 使用requests获取RSS，设置超时
+    headers = dict(REQUEST_HEADERS)
+    if cache is not None:
+        headers.update(cache.conditional_headers(rss_url, require_complete, window, max_items))
+    profiler = _profiler
+    if profiler.enabled:
+        # requests不提供DNS耗时，开启性能分析时单独解析一次（之后的连接会命中系统DNS缓存）
+        parts = urllib.parse.urlsplit(rss_url)
+        with profiler.span('dns'):
+            try:
+                socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+            except (OSError, UnicodeError):
+                pass
+    http = session if session is not None else _lazy_import('requests')
+    with profiler.span('connect+ttfb'):
+        response = http.get(rss_url, headers=headers, timeout=timeout, stream=True)
+    
+    if response.status_code == 304 and cache is not None:
+        # 内容未变化，直接复用缓存的条目
+        entries = cache.get_entries(rss_url)
+        response.close()
+        if entries is not None:
+            return None, entries
+        response = http.get(rss_url, headers=REQUEST_HEADERS, timeout=timeout, stream=True)
+    
+    try:
+        response.raise_for_status()  # 检查HTTP状态码
+    except Exception:
+        response.close()
+        raise
+    return response, None
+
+def fetch_feed_entries(rss_url, timeout=RSS_TIMEOUT, cache=None, max_items=None, accept=None, session=None):
+    """下载并解析RSS feed，返回精简后的条目（失败时抛出异常）
+    
+    Args:
+        rss_url: RSS源URL
+        timeout: 超时时间
+        cache: FeedCache 对象，为None时不使用条件GET缓存
+        max_items: 符合条件的条目达到该数量后停止解析，None表示解析全部条目
+        accept: 条目过滤函数（与 max_items 配合实现提前停止）
+        session: requests.Session 对象（复用连接），为None时每次新建连接
+    
+    Returns:
+        list: simplify_feed_entries 格式的条目列表（未按日期筛选）
+    """
+    window = accept if isinstance(accept, DateWindow) else None
+    response, entries = request_feed(rss_url, timeout, cache, require_complete=max_items is None,
+                                     session=session, window=window, max_items=max_items)
+    if response is None:
+        return entries
+    
+    try:
+        chunks = response.iter_content(FEED_CHUNK_SIZE)
+        entries, complete = read_feed_stream(chunks, max_items, accept)
+        if cache is not None:
+            cache.store(rss_url, response.headers.get('ETag'),
+                        response.headers.get('Last-Modified'), entries, complete)
+        return entries
+    finally:
+        # 提前停止时剩余内容不再下载
+        response.close()
+
+def download_feed(rss_url, timeout=RSS_TIMEOUT, cache=None, window=None, max_items=None):
+    """只下载feed、不解析（解析交给解析进程池，失败时抛出异常）
+    
+    window 和 max_items 同 request_feed，决定缓存的部分条目能否复用。
+    
+    Returns:
+        tuple: (响应内容, ETag, Last-Modified, 缓存的条目) —— 内容未变化时只有缓存的条目不为None
+    """
+    response, entries = request_feed(rss_url, timeout, cache, window=window, max_items=max_items)
+    if response is None:
+        return None, None, None, entries
+    try:
+        with _profiler.span('download'):
+            content = response.content
+        return content, response.headers.get('ETag'), response.headers.get('Last-Modified'), None
+    finally:
+        response.close()
+
+class _PageCollector:
+    """合并多页结果：跳过重复条目，判断是否需要继续翻页"""
+    
+    def __init__(self, max_items=None, accept=None):
+        self.max_items = max_items
+        self.accept = accept
+        self.entries = []
+        self.accepted = 0
+        self._keys = set()
+    
+    def add(self, page):
+        """加入一页条目
+        
+        Returns:
+            bool: 是否已经不需要下一页
+        """
+        page_accepted = 0
+        for entry in page:
+            # 翻页期间列表可能有新条目插入，已经出现过的条目会在下一页再次出现
+            key = entry.get('guid') or entry.get('link') or entry.get('title')
+            if key in self._keys:
+                continue
+            self._keys.add(key)
+            self.entries.append(entry)
+            if self.accept is None or self.accept(entry):
+                page_accepted += 1
+        had_accepted = self.accepted > 0
+        self.accepted += page_accepted
+        if not page:
+            return True
+        if self.max_items is not None and self.accepted >= self.max_items:
+            return True
+        # 按时间倒序的列表：之前的页有目标日期的条目而这一页没有，说明已经翻过了目标日期
+        return self.accept is not None and had_accepted and not page_accepted
+
+class SourceAdapter:
+    """新闻源适配器：把一种来源（feed、JSON接口、HTML列表页）转换为统一格式的条目
+    
+    条目格式与 simplify_feed_entries 相同（title、link、guid、timestamp），
+    之后的日期筛选、去重和分类与RSS源完全一样。新闻源用 'adapter' 字段选择适配器。
+    
+    子类实现 parse(body, source)：只处理响应内容、不访问网络，可以直接用保存的页面测试。
+    有多页的来源用 page_urls 给出各页的地址，按顺序请求，直到条目足够或翻过目标日期。
+    """
+    
+    name = None
+    
+    def page_urls(self, source):
+        """按顺序请求的页面地址"""
+        return [source['url']]
+    
+    def parse(self, body, source, max_items=None, accept=None):
+        """解析一页响应内容
+        
+        Args:
+            body: 响应内容（bytes）
+            source: 新闻源字典（包含适配器的配置）
+            max_items: 最多收集的符合条件的条目数量
+            accept: 条目过滤函数（与 max_items 配合实现提前停止）
+        
+        Returns:
+            list: 条目列表
+        """
+        raise NotImplementedError
+    
+    def fetch(self, source, timeout=RSS_TIMEOUT, cache=None, max_items=None, accept=None, session=None):
+        """下载并解析（失败时抛出异常，参数同 fetch_feed_entries）"""
+        collector = _PageCollector(max_items, accept)
+        for url in self.page_urls(source):
+            try:
+                response, _ = request_feed(url, timeout, session=session)
+                try:
+                    with _profiler.span('download'):
+                        body = response.content
+                finally:
+                    response.close()
+            except Exception:
+                # 第一页之后的页面失败（例如已经超出接口的页数）时返回已经取到的条目
+                if not collector.entries:
+                    raise
+                break
+            with _profiler.span('parse'):
+                page = self.parse(body, source, max_items, accept)
+            if collector.add(page):
+                break
+        return collector.entries
+    
+    async def fetch_async(self, session, source, timeout=RSS_TIMEOUT, max_items=None, accept=None):
+        """fetch 的异步版本（session 为 aiohttp.ClientSession）"""
+        import asyncio
+        import aiohttp
+        
+        collector = _PageCollector(max_items, accept)
+        for url in self.page_urls(source):
+            try:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout),
+                                       trace_request_ctx={'source': source['name']}) as response:
+                    response.raise_for_status()
+                    body = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if not collector.entries:
+                    raise
+                break
+            if collector.add(self.parse(body, source, max_items, accept)):
+                break
+        return collector.entries
+
+class FeedAdapter(SourceAdapter):
+    """RSS / Atom feed（默认）：边下载边解析，支持条件GET缓存和提前停止"""
+    
+    name = 'rss'
+    
+    def parse(self, body, source, max_items=None, accept=None):
+        return parse_feed_content(body, max_items, accept)[0]
+    
+    def fetch(self, source, timeout=RSS_TIMEOUT, cache=None, max_items=None, accept=None, session=None):
+        return fetch_feed_entries(source['url'], timeout, cache, max_items, accept, session)
+
+class JsonApiAdapter(SourceAdapter):
+    """分页的JSON接口（例如新浪滚动新闻），一次请求返回几十到上百条
+    
+    新闻源配置：
+        url: 接口地址，页码处写 {page}
+        pages: 最多请求的页数（默认1）
+        first_page: 第一页的页码（默认1）
+        items: 条目列表在响应中的路径，用点分隔（例如 'result.data'），默认为响应本身
+        fields: 条目字段名 {'title': ..., 'link': ..., 'guid': ..., 'date': ...}，
+                日期可以是Unix时间戳（秒）或RFC 822 / ISO 8601字符串
+    """
+    
+    name = 'json'
+    DEFAULT_FIELDS = {'title': 'title', 'link': 'url', 'guid': 'id', 'date': 'date'}
+    
+    def page_urls(self, source):
+        url = source['url']
+        if '{page}' not in url:
+            return [url]
+        first = source.get('first_page', 1)
+        return [url.replace('{page}', str(page)) for page in range(first, first + source.get('pages', 1))]
+    
+    @staticmethod
+    def _date(value):
+        if isinstance(value, str) and value.strip().isdigit():
+            value = int(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if value > 1e11:  # 毫秒
+                value /= 1000
+            return int(value)
+        if isinstance(value, str):
+            return parse_feed_timestamp(value)
+        return None
+    
+    def parse(self, body, source, max_items=None, accept=None):
+        data = json.loads(body)
+        for key in filter(None, source.get('items', '').split('.')):
+            data = data.get(key) if isinstance(data, dict) else None
+        if not isinstance(data, list):
+            raise ValueError(f"JSON响应中没有条目列表（{source.get('items') or '根'}）")
+        fields = dict(self.DEFAULT_FIELDS, **source.get('fields', {}))
+        title_field, link_field, guid_field, date_field = (
+            fields['title'], fields['link'], fields['guid'], fields['date'])
+        entries = []
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            entries.append({
+                'title': html.unescape(str(item.get(title_field) or '')),
+                'link': str(item.get(link_field) or ''),
+                'guid': str(item.get(guid_field) or ''),
+                'timestamp': self._date(item.get(date_field)),
+            })
+        return entries
+
+def parse_selector(selector):
+    """解析简单的CSS选择器：标签、.类名、#id 的组合，空格表示后代
+    
+    Returns:
+        list: [(标签或None, id或None, 类名集合)]，从外到内
+    """
+    parts = []
+    for token in selector.split():
+        match = re.fullmatch(r'([a-zA-Z][a-zA-Z0-9]*|\*)?((?:[.#][\w-]+)*)', token)
+        if match is None:
+            raise ValueError(f"不支持的选择器: {selector}")
+        tag = match.group(1)
+        ids = re.findall(r'#([\w-]+)', match.group(2))
+        classes = frozenset(re.findall(r'\.([\w-]+)', match.group(2)))
+        parts.append((None if tag in (None, '*') else tag.lower(), ids[0] if ids else None, classes))
+    if not parts:
+        raise ValueError("选择器为空")
+    return parts
+
+def _element_matches(element, simple):
+    tag, element_id, classes = element
+    want_tag, want_id, want_classes = simple
+    return ((want_tag is None or want_tag == tag) and (want_id is None or want_id == element_id)
+            and want_classes <= classes)
+
+def selector_matches(stack, selector):
+    """当前元素（stack[-1]）是否匹配选择器（stack 为从根到当前元素的路径）"""
+    if not stack or not _element_matches(stack[-1], selector[-1]):
+        return False
+    i = len(stack) - 2
+    for simple in reversed(selector[:-1]):
+        while i >= 0 and not _element_matches(stack[i], simple):
+            i -= 1
+        if i < 0:
+            return False
+        i -= 1
+    return True
+
+# HTML中没有结束标签的元素
+_VOID_ELEMENTS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                            'param', 'source', 'track', 'wbr'])
+# 结束标签可以省略的元素：遇到同名的开始标签时，之前未闭合的同名元素自动结束
+_IMPLIED_END_ELEMENTS = frozenset(['li', 'p', 'dt', 'dd', 'tr', 'td', 'th', 'option'])
+
+class HtmlListParser(html.parser.HTMLParser):
+    """从HTML列表页中提取新闻条目
+    
+    每个匹配 item 选择器的元素是一条新闻：其中第一个匹配 link 选择器且有 href
+    的元素提供标题和链接，条目中其余文字里匹配 date_pattern 的部分作为日期。
+    只维护一个元素栈，不构建DOM树，收集到足够的条目后停止。
+    """
+    
+    def __init__(self, base_url, item, link='a', date_pattern=None, max_items=None, accept=None):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.item = parse_selector(item)
+        self.link = parse_selector(link)
+        self.date_pattern = re.compile(date_pattern) if date_pattern else None
+        self.max_items = max_items
+        self.accept = accept
+        self.entries = []
+        self.done = False
+        self._accepted = 0
+        self._stack = []
+        self._item_depth = None  # 当前条目元素在栈中的深度
+        self._link_depth = None  # 当前链接元素在栈中的深度
+        self._href = None
+        self._title = []
+        self._text = []
+    
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if (self._item_depth is not None and tag in _IMPLIED_END_ELEMENTS
+                and self._stack[self._item_depth - 1][0] == tag):
+            # 例如省略了 </li> 的列表：下一个 <li> 开始时上一条新闻结束
+            self.handle_endtag(tag)
+            if self.done:
+                return
+        attrs = dict(attrs)
+        element = (tag, attrs.get('id'), frozenset((attrs.get('class') or '').split()))
+        self._stack.append(element)
+        depth = len(self._stack)
+        if self._item_depth is None:
+            if selector_matches(self._stack, self.item):
+                self._item_depth = depth
+                self._href = None
+                self._title = []
+                self._text = []
+        elif self._href is None and attrs.get('href') and selector_matches(self._stack, self.link):
+            self._link_depth = depth
+            self._href = attrs['href']
+        if tag in _VOID_ELEMENTS:
+            self._stack.pop()
+    
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_ELEMENTS:
+            self.handle_endtag(tag)
+    
+    def handle_endtag(self, tag):
+        if self.done or tag in _VOID_ELEMENTS:
+            return
+        # 容错：关闭最近的同名元素（未闭合的子元素一起关闭），找不到时忽略
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                del self._stack[i:]
+                break
+        else:
+            return
+        depth = len(self._stack)
+        if self._link_depth is not None and depth < self._link_depth:
+            self._link_depth = None
+        if self._item_depth is not None and depth < self._item_depth:
+            self._finish_item()
+    
+    def handle_data(self, data):
+        if self._item_depth is None:
+            return
+        if self._link_depth is not None:
+            self._title.append(data)
+        else:
+            self._text.append(data)
+    
+    def _finish_item(self):
+        self._item_depth = None
+        self._link_depth = None
+        title = ' '.join(''.join(self._title).split())
+        if not title or not self._href:
+            return
+        entry = {
+            'title': title,
+            'link': urllib.parse.urljoin(self.base_url, self._href),
+            'guid': '',
+            'timestamp': self._date(' '.join(self._text)),
+        }
+        self.entries.append(entry)
+        if self.accept is None or self.accept(entry):
+            self._accepted += 1
+            if self.max_items is not None and self._accepted >= self.max_items:
+                self.done = True
+    
+    def _date(self, text):
+        if self.date_pattern is None:
+            return None
+        match = self.date_pattern.search(text)
+        if match is None:
+            return None
+        fields = match.groupdict()
+        try:
+            month, day = int(fields['month']), int(fields['day'])
+            if fields.get('year'):
+                year = int(fields['year'])
+            else:
+                # 页面没有给出年份：取使日期不晚于今天的年份（1月1日看到的“12月31日”是去年的）
+                today = datetime.date.today()
+                year = today.year - ((month, day) > (today.month, today.day))
+            # 页面上的时间是网站所在地的时间，按本地时区换算
+            return int(datetime.datetime(year, month, day,
+                                         int(fields.get('hour') or 0), int(fields.get('minute') or 0)).timestamp())
+        except (KeyError, TypeError, ValueError, OverflowError, OSError):
+            return None
+    
+    def close(self):
+        super().close()
+        if self._item_depth is not None and not self.done:
+            self._finish_item()
+        return self.entries
+
+def decode_html(body, encoding=None):
+    """把HTML页面（bytes）解码为文本，没有指定编码时从 <meta charset> 检测，找不到时使用UTF-8"""
+    if encoding is None:
+        match = re.search(rb'<meta[^>]+charset=["\']?([\w-]+)', body[:4096], re.IGNORECASE)
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return body.decode(encoding, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+# HTML页面中的日期（2025-12-30 08:00、2025/12/30、12月30日 08:00 等），在标题以外的文字中查找
+HTML_DATE_PATTERN = (r'(?:(?P<year>\d{4})[-/年])?(?P<month>\d{1,2})(?:[-/]|月)(?P<day>\d{1,2})日?'
+                     r'(?:\s*(?P<hour>\d{1,2}):(?P<minute>\d{2}))?')
+
+class HtmlListAdapter(SourceAdapter):
+    """HTML列表页（没有feed的网站）
+    
+    新闻源配置：
+        item: 每条新闻对应元素的选择器（例如 'ul.list_009 li'）
+        link: 条目中标题链接的选择器（默认 'a'）
+        date_pattern: 日期的正则表达式（命名分组 year、month、day、hour、minute），
+                      默认为 HTML_DATE_PATTERN，设为空字符串表示不提取日期
+        encoding: 页面编码（默认从 <meta charset> 检测，找不到时使用UTF-8）
+    """
+    
+    name = 'html'
+    
+    def parse(self, body, source, max_items=None, accept=None):
+        if 'item' not in source:
+            raise ValueError("HTML列表页的新闻源需要 item 选择器")
+        parser = HtmlListParser(source['url'], source['item'], source.get('link', 'a'),
+                                source.get('date_pattern', HTML_DATE_PATTERN), max_items, accept)
+        text = decode_html(body, source.get('encoding'))
+        for start in range(0, len(text), FEED_CHUNK_SIZE):
+            parser.feed(text[start:start + FEED_CHUNK_SIZE])
+            if parser.done:
+                break
+        return parser.close()
+
+# 适配器名称 -> 适配器（新闻源的 'adapter' 字段，默认 'rss'；Atom与RSS使用同一个解析器）
+SOURCE_ADAPTERS = {
+    'rss': FeedAdapter(),
+    'atom': FeedAdapter(),
+    'json': JsonApiAdapter(),
+    'html': HtmlListAdapter(),
+}
+
+def get_adapter(source):
+    """新闻源使用的适配器"""
+    return SOURCE_ADAPTERS[source.get('adapter', 'rss')]
+
+def source_max_items(source):
+    """每个源最多获取的新闻数量（新闻源可以用 'max_items' 字段单独设置）"""
+    return source.get('max_items', MAX_ITEMS_PER_SOURCE)
+
+def parse_feed_for_date(content, target_date, max_items=MAX_ITEMS_PER_SOURCE):
+    """解析feed内容，只收集目标日期的条目（可以在解析进程中调用）
+    
+    Returns:
+        tuple: (条目列表, 是否完整)
+    """
+    return parse_feed_content(content, max_items, make_date_filter(target_date))
+
+def parse_feed_batch(jobs, target_date, max_items=MAX_ITEMS_PER_SOURCE):
+    """解析进程的任务：解析一批feed并筛选目标日期的新闻
+    
+    Args:
+        jobs: [(新闻源名称, 响应内容)] 或 [(新闻源名称, 响应内容, 最多返回的新闻数量)] 列表
+        target_date: 目标日期（date对象）
+        max_items: 每个源默认最多返回的新闻数量
+    
+    Returns:
+        list: [(新闻源名称, 条目列表, 是否完整, 新闻列表, 解析耗时, 错误信息)]，
+              解析失败时错误信息不为None
+    """
+    results = []
+    for job in jobs:
+        source_name, content = job[:2]
+        limit = job[2] if len(job) > 2 else max_items
+        start = time.perf_counter()
+        try:
+            entries, complete = parse_feed_for_date(content, target_date, limit)
+            news_list = filter_feed_entries(entries, source_name, target_date, limit)
+        except Exception as e:
+            results.append((source_name, None, False, [], time.perf_counter() - start, str(e)))
+        else:
+            results.append((source_name, entries, complete, news_list, time.perf_counter() - start, None))
+    return results
+
+def fetch_news_from_rss(rss_url, source_name, target_date=None, timeout=RSS_TIMEOUT, max_items=MAX_ITEMS_PER_SOURCE, cache=None,
+                        session=None, seen=None):
+    """从RSS feed获取目标日期的新闻（失败时抛出异常，参数同 get_news_from_rss）"""
+    # 如果没有指定目标日期，使用昨天
+    if target_date is None:
+        target_date = datetime.datetime.now().date() - datetime.timedelta(days=1)
+    entries = fetch_feed_entries(rss_url, timeout, cache, max_items, make_date_filter(target_date), session)
+    return filter_feed_entries(entries, source_name, target_date, max_items, seen)
+
+def fetch_source_news(source, target_date, timeout=RSS_TIMEOUT, cache=None, session=None, seen=None):
+    """用新闻源的适配器获取目标日期的新闻（失败时抛出异常）"""
+    max_items = source_max_items(source)
+    entries = get_adapter(source).fetch(source, timeout, cache, max_items, make_date_filter(target_date), session)
+    return filter_feed_entries(entries, source['name'], target_date, max_items, seen)
+
+def get_news_from_rss(rss_url, source_name, target_date=None, timeout=RSS_TIMEOUT, max_items=MAX_ITEMS_PER_SOURCE, cache=None):
+    """从RSS feed获取新闻（带超时控制）
+    
+    Args:
+        rss_url: RSS源URL
+        source_name: 新闻源名称
+        target_date: 目标日期（date对象），如果为None则使用昨天
+        timeout: 超时时间
+        max_items: 最大获取数量
+        cache: FeedCache 对象，为None时不使用条件GET缓存
+    """
+    try:
+        return fetch_news_from_rss(rss_url, source_name, target_date, timeout, max_items, cache)
+    except Exception as e:
+        report_fetch_error(source_name, e)
+        return []
+
+def fetch_news_worker(source, target_date, cache=None, health=None, session=None, limiter=None, hedge=False,
+                      seen=None):
+    """工作线程函数
+    
+    Args:
+        source: 新闻源字典
+        target_date: 目标日期（date对象）
+        cache: FeedCache 对象
+        health: SourceHealthStore 对象，用于自适应超时和记录健康状况
+        session: requests.Session 对象（复用连接）
+        limiter: HostLimiter 对象，按主机限制并发和请求频率
+        hedge: 超过该源通常耗时（见 SourceHealthStore.hedge_delay）时是否发送对冲请求
+        seen: SeenIndex 对象，见过的条目复用记录的日期和类别
+    """
+    url = source['url']
+    timeout = health.timeout_for(url) if health is not None else RSS_TIMEOUT
+    start = time.perf_counter()
+    
+    def fetch():
+        nonlocal start
+        start = time.perf_counter()  # 不计入等待主机名额的时间
+        with _profiler.span('fetch', source=source['name']):
+            return fetch_source_news(source, target_date, timeout, cache, session, seen)
+    
+    def polite_fetch():
+        return limiter.call(url, fetch) if limiter is not None else fetch()
+    
+    hedge_delay = health.hedge_delay(url) if hedge and health is not None else None
+    try:
+        if hedge_delay is not None:
+            news_list = hedged_call(polite_fetch, hedge_delay, source['name'])
+        else:
+            news_list = polite_fetch()
+    except Exception as e:
+        report_fetch_error(source['name'], e)
+        if health is not None:
+            health.record_failure(url, time.perf_counter() - start)
+        news_list = []
+    else:
+        if health is not None:
+            health.record_success(url, time.perf_counter() - start)
+    if news_list:
+        safe_print(f"    [+] {source['name']}: 找到 {len(news_list)} 条")
+    return source['name'], news_list
+
+def fetch_archive_worker(source, start_date, end_date, cache=None, limiter=None):
+    """存档模式的工作线程函数：一次下载，返回日期范围内的全部新闻"""
+    url = source['url']
+    
+    def fetch():
+        return get_adapter(source).fetch(source, cache=cache)
+    
+    try:
+        entries = limiter.call(url, fetch) if limiter is not None else fetch()
+    except Exception as e:
+        report_fetch_error(source['name'], e)
+        return source['name'], []
+    news_list = bucket_feed_entries(entries, source['name'], start_date, end_date)
+    if news_list:
+        safe_print(f"    [+] {source['name']}: 找到 {len(news_list)} 条")
+    return source['name'], news_list
+
+async def fetch_news_worker_async(session, source, target_date, timeout=RSS_TIMEOUT, max_items=MAX_ITEMS_PER_SOURCE, cache=None, health=None,
+                                  parse_executor=None, limiter=None, seen=None):
+    """异步工作协程（与 fetch_news_worker 返回相同的结果格式）
+    
+    Args:
+        session: 共享的 aiohttp.ClientSession（连接池）
+        source: 新闻源字典
+        target_date: 目标日期（date对象）
+        timeout: 单个请求的截止时间（秒）
+        max_items: 最大获取数量
+        cache: FeedCache 对象，为None时不使用条件GET缓存
+        health: SourceHealthStore 对象，用于自适应超时和记录健康状况
+        parse_executor: 解析用的执行器（进程池），None表示使用默认的线程池
+        limiter: HostLimiter 对象，按主机限制并发和请求频率
+        seen: SeenIndex 对象，见过的条目复用记录的日期和类别
+    
+    Returns:
+        tuple: (新闻源名称, 新闻列表)
+    """
+    import asyncio
+    import aiohttp
+    
+    source_name = source['name']
+    url = source['url']
+    adapter = get_adapter(source)
+    max_items = source.get('max_items', max_items)
+    news_list = []
+    if health is not None:
+        timeout = health.timeout_for(url, timeout)
+    profiler = _profiler
+    
+    async def download(headers):
+        # 返回 (内容, ETag, Last-Modified)；条件请求返回304时内容为None
+        request_timeout = aiohttp.ClientTimeout(total=timeout)
+        async with session.get(url, headers=headers, timeout=request_timeout,
+                               trace_request_ctx={'source': source_name}) as response:
+            if response.status == 304 and headers is not None:
+                return None, None, None
+            response.raise_for_status()  # 检查HTTP状态码
+            download_start = time.perf_counter()
+            content = await response.read()
+            profiler.add('download', download_start, time.perf_counter() - download_start, source=source_name)
+            return content, response.headers.get('ETag'), response.headers.get('Last-Modified')
+    
+    failed = True
+    for attempt in range(2):
+        if limiter is not None:
+            await limiter.acquire_async(url)
+        start = time.perf_counter()
+        try:
+            if not isinstance(adapter, FeedAdapter):
+                entries = await adapter.fetch_async(session, source, timeout, max_items,
+                                                    make_date_filter(target_date))
+                news_list = filter_feed_entries(entries, source_name, target_date, max_items, seen)
+                failed = False
+                break
+            headers = (cache.conditional_headers(url, window=DateWindow(target_date), max_items=max_items)
+                       if cache is not None else None)
+            entries = None
+            content, etag, last_modified = await download(headers)
+            if content is None:
+                # 内容未变化，直接复用缓存的条目
+                entries = cache.get_entries(url)
+                if entries is None:
+                    # 缓存记录已不存在（如被其他进程清理），不带条件头重新请求
+                    content, etag, last_modified = await download(None)
+            
+            if entries is None:
+                # 解析是CPU密集型的同步代码，放到线程中执行以免阻塞事件循环
+                loop = asyncio.get_running_loop()
+                parse_start = time.perf_counter()
+                entries, complete = await loop.run_in_executor(
+                    parse_executor, parse_feed_for_date, content, target_date, max_items)
+                profiler.add('parse', parse_start, time.perf_counter() - parse_start, source=source_name)
+                if cache is not None:
+                    cache.store(url, etag, last_modified, entries, complete)
+            news_list = filter_feed_entries(entries, source_name, target_date, max_items, seen)
+            failed = False
+        except asyncio.TimeoutError:
+            safe_print(f"    [-] {source_name}: 超时")
+        except aiohttp.ClientError as e:
+            delay = throttle_delay(e) if limiter is not None else None
+            if delay is not None:
+                # 被限流：暂停该主机，等待时间不长时重试一次
+                limiter.pause(url, delay)
+                if not attempt and delay <= HOST_RETRY_AFTER_MAX:
+                    continue
+            safe_print(f"    [-] {source_name}: 网络错误 ({str(e)[:30]})")
+        except Exception as e:
+            safe_print(f"    [-] {source_name}: 失败 ({str(e)[:30]})")
+        finally:
+            if limiter is not None:
+                limiter.release(url)
+        break
+    
+    elapsed = time.perf_counter() - start
+    profiler.add('fetch', start, elapsed, source=source_name)
+    if health is not None:
+        if failed:
+            health.record_failure(url, elapsed)
+        else:
+            health.record_success(url, elapsed)
+    if news_list:
+        safe_print(f"    [+] {source_name}: 找到 {len(news_list)} 条")
+    return source_name, news_list
+
+def _make_profile_trace_config():
+    """aiohttp的请求跟踪钩子：记录每个源的DNS、建立连接和首字节耗时"""
+    import aiohttp
+    
+    def source_of(ctx):
+        return (ctx.trace_request_ctx or {}).get('source')
+    
+    async def on_request_start(session, ctx, params):
+        ctx.request_start = ctx.ttfb_start = time.perf_counter()
+    
+    async def on_dns_start(session, ctx, params):
+        ctx.dns_start = time.perf_counter()
+    
+    async def on_dns_end(session, ctx, params):
+        _profiler.add('dns', ctx.dns_start, time.perf_counter() - ctx.dns_start, source=source_of(ctx))
+    
+    async def on_connect_start(session, ctx, params):
+        ctx.connect_start = time.perf_counter()
+    
+    async def on_connect_end(session, ctx, params):
+        ctx.ttfb_start = time.perf_counter()
+        _profiler.add('connect', ctx.connect_start, ctx.ttfb_start - ctx.connect_start, source=source_of(ctx))
+    
+    async def on_request_end(session, ctx, params):
+        _profiler.add('ttfb', ctx.ttfb_start, time.perf_counter() - ctx.ttfb_start, source=source_of(ctx))
+    
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_dns_resolvehost_start.append(on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_end)
+    trace_config.on_connection_create_start.append(on_connect_start)
+    trace_config.on_connection_create_end.append(on_connect_end)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+async def _fetch_all_news_async(sources, target_date, max_connections, max_per_host, timeout, cache, on_result=None, health=None,
+                                parse_executor=None, limiter=None, deadline=None, seen=None):
+    """在同一个连接池中并发获取所有新闻源，每个源完成时调用 on_result
+    
+    到达截止时间时取消剩余的任务，只返回已完成的结果。
+    """
+    import asyncio
+    import aiohttp
+    
+    # 连接池：同一主机的keep-alive连接会被复用，并分别限制全局和单主机并发
+    connector = aiohttp.TCPConnector(
+        limit=max_connections,
+        limit_per_host=max_per_host,
+        keepalive_timeout=ASYNC_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=300,
+    )
+    trace_configs = [_make_profile_trace_config()] if _profiler.enabled else None
+    async with aiohttp.ClientSession(connector=connector, headers=REQUEST_HEADERS,
+                                     trace_configs=trace_configs) as session:
+        tasks = [
+            asyncio.ensure_future(fetch_news_worker_async(session, source, target_date, timeout, cache=cache,
+                                                          health=health, parse_executor=parse_executor,
+                                                          limiter=limiter, seen=seen))
+            for source in sources
+        ]
+        results = []
+        try:
+            for next_result in asyncio.as_completed(tasks, timeout=deadline.remaining() if deadline else None):
+                result = await next_result
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+        except asyncio.TimeoutError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return results
+
+def fetch_all_news_async(sources, target_date, max_connections=ASYNC_MAX_CONNECTIONS,
+                         max_per_host=ASYNC_MAX_PER_HOST, timeout=RSS_TIMEOUT, cache=None, on_result=None,
+                         health=None, parse_executor=None, limiter=None, deadline=None, seen=None):
+    """使用asyncio并发获取所有新闻源（需要安装aiohttp）
+    
+    Args:
+        sources: 新闻源列表
+        target_date: 目标日期（date对象）
+        max_connections: 全局最大并发连接数
+        max_per_host: 每个主机最大并发连接数
+        timeout: 单个请求的截止时间（秒）
+        cache: FeedCache 对象，为None时不使用条件GET缓存
+        on_result: 每个源完成时的回调函数，参数为 (新闻源名称, 新闻列表)
+        health: SourceHealthStore 对象，用于自适应超时和记录健康状况
+        parse_executor: 解析用的执行器（进程池），None表示使用默认的线程池
+        limiter: HostLimiter 对象，按主机限制并发和请求频率
+        deadline: RunDeadline 对象，到期时取消剩余的源
+        seen: SeenIndex 对象，见过的条目复用记录的日期和类别
+    
+    Returns:
+        list: (新闻源名称, 新闻列表) 元组列表（按完成顺序，到达截止时间时只有已完成的源）
+    
+    Raises:
+        ImportError: 未安装aiohttp
+    """
+    import asyncio
+    import aiohttp  # noqa: F401  提前检查依赖是否可用
+    
+    return asyncio.run(_fetch_all_news_async(sources, target_date, max_connections, max_per_host,
+                                             timeout, cache, on_result, health, parse_executor, limiter,
+                                             deadline, seen))
+
+def is_async_available():
+    """检查异步获取所需的aiohttp是否已安装"""
+    try:
+        import aiohttp  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _iter_fetch_results_async(sources, target_date, cache, health, parse_executor=None, limiter=None,
+                              deadline=None, seen=None):
+    """在后台线程运行事件循环，通过队列逐个产出已完成的源"""
+    results = queue.Queue()
+    errors = []
+    done = object()
+    
+    def run():
+        try:
+            fetch_all_news_async(sources, target_date, cache=cache, on_result=results.put, health=health,
+                                 parse_executor=parse_executor, limiter=limiter, deadline=deadline, seen=seen)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            results.put(done)
+    
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    finished = set()
+    while True:
+        result = results.get()
+        if result is done:
+            break
+        finished.add(result[0])
+        yield result
+    thread.join()
+    if errors:
+        raise errors[0]
+    if deadline is not None:
+        deadline.missing.extend(source['name'] for source in sources if source['name'] not in finished)
+
+def download_feed_worker(source, target_date, cache=None, health=None, limiter=None):
+    """下载线程函数（解析进程池模式）：只下载，不解析
+    
+    Returns:
+        tuple: (download_feed 的结果, 下载耗时, 异常) —— 下载失败时结果为None
+    """
+    url = source['url']
+    timeout = health.timeout_for(url) if health is not None else RSS_TIMEOUT
+    start = time.perf_counter()
+    
+    def download():
+        nonlocal start
+        start = time.perf_counter()  # 不计入等待主机名额的时间
+        with _profiler.span('fetch', source=source['name']):
+            adapter = get_adapter(source)
+            if not isinstance(adapter, FeedAdapter):
+                # JSON接口和HTML列表页在下载线程中直接解析，与缓存命中一样返回条目
+                return None, None, None, adapter.fetch(source, timeout, max_items=source_max_items(source),
+                                                       accept=make_date_filter(target_date))
+            return download_feed(url, timeout, cache, DateWindow(target_date), source_max_items(source))
+    
+    try:
+        result = limiter.call(url, download) if limiter is not None else download()
+    except Exception as e:
+        return None, time.perf_counter() - start, e
+    return result, time.perf_counter() - start, None
+
+def _iter_fetch_results_processes(sources, target_date, cache, health, parse_workers, limiter=None,
+                                  deadline=None):
+    """下载和解析分为两个阶段：线程池负责网络I/O，进程池负责解析和日期筛选
+    
+    下载完成的响应攒成批次发送给解析进程，减少进程间传输的开销；
+    有空闲的解析进程时不等批次攒满，避免解析进程空转。
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    downloads = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    parsers = ProcessPoolExecutor(max_workers=parse_workers)
+    try:
+        future_to_source = {
+            downloads.submit(download_feed_worker, source, target_date, cache, health, limiter): source
+            for source in sources
+        }
+        pending_downloads = set(future_to_source)
+        parse_futures = {}  # 解析任务 -> [(新闻源, ETag, Last-Modified, 下载耗时)]
+        batch = []
+        
+        def fail(source, error, elapsed):
+            report_fetch_error(source['name'], error)
+            if health is not None:
+                health.record_failure(source['url'], elapsed)
+            return source['name'], []
+        
+        def succeed(source, news_list, elapsed):
+            if health is not None:
+                health.record_success(source['url'], elapsed)
+            if news_list:
+                safe_print(f"    [+] {source['name']}: 找到 {len(news_list)} 条")
+            return source['name'], news_list
+        
+        while pending_downloads or parse_futures:
+            timeout = deadline.remaining() if deadline is not None else None
+            done, _ = wait(pending_downloads | set(parse_futures), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # 到达截止时间：未下载完、未解析完和还在攒批的源都算未完成
+                unfinished = {future_to_source[future]['name'] for future in pending_downloads}
+                unfinished.update(source['name'] for jobs in parse_futures.values() for source, _, _, _ in jobs)
+                unfinished.update(source['name'] for source, _, _, _, _ in batch)
+                deadline.missing.extend(source['name'] for source in sources if source['name'] in unfinished)
+                break
+            for future in done:
+                if future in pending_downloads:
+                    pending_downloads.discard(future)
+                    source = future_to_source[future]
+                    result, elapsed, error = future.result()
+                    if error is not None:
+                        yield fail(source, error, elapsed)
+                        continue
+                    content, etag, last_modified, entries = result
+                    if entries is not None:
+                        # 内容未变化，直接复用缓存的条目
+                        news_list = filter_feed_entries(entries, source['name'], target_date, source_max_items(source))
+                        yield succeed(source, news_list, elapsed)
+                    else:
+                        batch.append((source, content, etag, last_modified, elapsed))
+                    continue
+                
+                jobs = parse_futures.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    for source, _, _, elapsed in jobs:
+                        yield fail(source, e, elapsed)
+                    continue
+                for (source, etag, last_modified, elapsed), result in zip(jobs, results):
+                    _, entries, complete, news_list, parse_time, error = result
+                    _profiler.add('parse', time.perf_counter() - parse_time, parse_time, source=source['name'])
+                    if error is not None:
+                        yield fail(source, ValueError(error), elapsed)
+                        continue
+                    if cache is not None:
+                        cache.store(source['url'], etag, last_modified, entries, complete)
+                    yield succeed(source, news_list, elapsed)
+            
+            if batch and (len(batch) >= PARSE_BATCH_SIZE or not pending_downloads
+                          or len(parse_futures) < parse_workers):
+                jobs = [(source['name'], content, source_max_items(source)) for source, content, _, _, _ in batch]
+                future = parsers.submit(parse_feed_batch, jobs, target_date, MAX_ITEMS_PER_SOURCE)
+                parse_futures[future] = [(source, etag, last_modified, elapsed)
+                                         for source, _, etag, last_modified, elapsed in batch]
+                batch = []
+    finally:
+        downloads.shutdown(wait=False, cancel_futures=True)
+        parsers.shutdown(wait=False, cancel_futures=True)
+
+def iter_fetch_results(sources, target_date, use_async=False, cache=None, health=None,
+                       parse_workers=PARSE_WORKERS, limiter=None, deadline=None, hedge=False, seen=None):
+    """并发获取所有新闻源，按完成顺序逐个产出结果
+    
+    Args:
+        sources: 新闻源列表
+        target_date: 目标日期（date对象）
+        use_async: 是否使用asyncio异步获取
+        cache: FeedCache 对象，为None时不使用条件GET缓存
+        health: SourceHealthStore 对象，用于自适应超时和记录健康状况
+        parse_workers: 解析进程数，0表示在下载线程（或默认线程池）中解析
+        limiter: HostLimiter 对象，按主机限制并发和请求频率，None表示不限制
+        deadline: RunDeadline 对象，到期时取消剩余的源并把它们记录到 deadline.missing
+        hedge: 是否对慢于通常耗时的源发送对冲请求（仅线程池模式）
+        seen: SeenIndex 对象，见过的条目复用记录的日期和类别（解析进程池模式下不使用）
+    
+    Yields:
+        tuple: (新闻源名称, 新闻列表)，处理失败时新闻列表为None
+    """
+    if use_async:
+        if parse_workers:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=parse_workers) as parsers:
+                yield from _iter_fetch_results_async(sources, target_date, cache, health, parsers, limiter,
+                                                     deadline, seen)
+        else:
+            yield from _iter_fetch_results_async(sources, target_date, cache, health, limiter=limiter,
+                                                 deadline=deadline, seen=seen)
+        return
+    
+    if parse_workers:
+        yield from _iter_fetch_results_processes(sources, target_date, cache, health, parse_workers, limiter,
+                                                 deadline)
+        return
+    
+    # 不使用 with：到达截止时间时不等待仍在进行的请求（它们会在各自的超时时间内结束）
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    try:
+        # 提交所有任务，传递目标日期
+        future_to_source = {
+            executor.submit(fetch_news_worker, source, target_date, cache, health, limiter=limiter,
+                            hedge=hedge, seen=seen): source
+            for source in sources
+        }
+        
+        # 收集结果
+        pending = set(future_to_source)
+        while pending:
+            timeout = deadline.remaining() if deadline is not None else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                deadline.missing.extend(source['name'] for future, source in future_to_source.items()
+                                        if future in pending)
+                break
+            for future in done:
+                try:
+                    yield future.result()
+                except Exception:
+                    source = future_to_source[future]
+                    safe_print(f"    [-] {source['name']}: 处理失败")
+                    yield source['name'], None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def get_desktop_path():
+    """获取桌面路径（跨平台支持）
+    
+    Returns:
+        str: 桌面路径
+    """
+    if sys.platform == 'win32':
+        # Windows: 优先使用注册表获取真实桌面路径
+        try:
+            import winreg
+            key = winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER,
+                r'Software\Microsoft\Windows\CurrentVersion\Explorer\Shell Folders'
+            )
+            desktop = winreg.QueryValueEx(key, 'Desktop')[0]
+            winreg.CloseKey(key)
+            if os.path.exists(desktop):
+                return desktop
+        except (ImportError, OSError):
+            pass
+        
+        # 备用方案：尝试标准路径
+        home = os.path.expanduser('~')
+        possible_paths = [
+            os.path.join(home, 'Desktop'),
+            os.path.join(home, '桌面'),  # 中文系统
+        ]
+        for path in possible_paths:
+            if os.path.exists(path):
+                return path
+        
+        # 如果都不存在，使用标准路径（即使不存在也会创建）
+        return os.path.join(home, 'Desktop')
+        
+    elif sys.platform == 'darwin':  # macOS
+        home = os.path.expanduser('~')
+        desktop = os.path.join(home, 'Desktop')
+        return desktop
+        
+    else:  # Linux 和其他 Unix 系统
+        home = os.path.expanduser('~')
+        desktop = os.path.join(home, 'Desktop')
+        return desktop
+
+def get_desktop_news_folder():
+    """获取桌面上的每日新闻文件夹路径，如果不存在则创建
+    
+    Returns:
+        str: 每日新闻文件夹路径
+    """
+    try:
+        desktop = get_desktop_path()
+        
+        # 如果桌面路径不存在，尝试创建
+        if not os.path.exists(desktop):
+            try:
+                os.makedirs(desktop, exist_ok=True)
+            except Exception as e:
+                # 如果无法创建桌面，使用用户主目录
+                desktop = os.path.expanduser('~')
+                print(f"[!] 警告: 无法访问桌面，将使用用户目录: {desktop}")
+        
+        # 创建每日新闻文件夹
+        news_folder = os.path.join(desktop, '每日新闻')
+        if not os.path.exists(news_folder):
+            try:
+                os.makedirs(news_folder, exist_ok=True)
+                print(f"[*] 已创建文件夹: {news_folder}")
+            except Exception as e:
+                raise Exception(f"无法创建新闻文件夹 {news_folder}: {str(e)}")
+        
+        return news_folder
+        
+    except Exception as e:
+        # 如果所有方法都失败，使用用户主目录
+        fallback_path = os.path.join(os.path.expanduser('~'), '每日新闻')
+        try:
+            os.makedirs(fallback_path, exist_ok=True)
+            print(f"[!] 警告: 使用备用路径: {fallback_path}")
+            return fallback_path
+        except:
+            raise Exception(f"无法创建新闻文件夹，请检查文件权限: {str(e)}")
+
+def open_file_with_default_app(file_path):
+    """使用系统默认程序打开文件（跨平台）
+    
+    Args:
+        file_path: 文件路径
+    """
+    try:
+        if sys.platform == 'win32':
+            os.startfile(file_path)
+        elif sys.platform == 'darwin':  # macOS
+            os.system(f'open "{file_path}"')
+        else:  # Linux
+            os.system(f'xdg-open "{file_path}"')
+    except Exception as e:
+        print(f"[!] 无法自动打开文件: {str(e)}")
+        print(f"    请手动打开: {file_path}")
+
+# Markdown标题中需要转义的字符（str.translate 一次完成，不必链式调用 replace）
+MARKDOWN_ESCAPE = str.maketrans({
+    '\\': '\\\\', '|': '\\|', '*': '\\*', '_': '\\_', '[': '\\[', ']': '\\]',
+})
+
+# HTML/XML转义（与 html.escape 相同），同时去掉XML 1.0中不允许出现的控制字符
+XML_ESCAPE = str.maketrans({
+    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;',
+    **{chr(c): None for c in range(0x20) if c not in (0x09, 0x0A, 0x0D)},
+})
+
+class DigestView:
+    """渲染用的日报视图
+    
+    只遍历一次 news_by_category，把各格式都要用到的数据（标题、链接、来源、
+    日期、生成时间）整理好，所有渲染器共享同一个视图。
+    """
+    
+    def __init__(self, news_by_category, unique_news, date_str, missing_sources=()):
+        self.date_str = date_str
+        self.missing_sources = list(missing_sources)  # 到达时间预算时仍未完成的新闻源
+        self.generated = datetime.datetime.now().astimezone()
+        self.generated_text = self.generated.strftime('%Y-%m-%d %H:%M:%S')
+        self.total = len(unique_news)
+        # [(类别, [(标题, 链接, 来源列表, 日期, 发布时间戳, 摘要), ...]), ...]，按 CATEGORY_ORDER 排列，跳过空类别
+        self.sections = []
+        for category in CATEGORY_ORDER:
+            news_list = news_by_category.get(category)
+            if news_list:
+                self.sections.append((category, [
+                    (news.title, news.url, news.sources, news.date, news.published, news.summary) for news in news_list
+                ]))
+
+class Renderer:
+    """日报渲染器：把 DigestView 渲染为一种格式的完整文本
+    
+    子类设置 name/extension/content_type 并实现 render。各部分先追加到
+    列表中，最后一次 join 成字符串，由调用方整体写入文件。
+    """
+    name = None
+    extension = None
+    content_type = None
+    
+    def render(self, view):
+        raise NotImplementedError
+
+class MarkdownRenderer(Renderer):
+    name = 'md'
+    extension = '.md'
+    content_type = 'text/markdown; charset=utf-8'
+    
+    def render(self, view):
+        parts = [
+            f"# 热点新闻日报 {view.date_str}\n\n",
+            f"*自动生成于 {view.generated_text}*\n\n",
+            f"**共 {view.total} 条热点新闻**\n\n",
+            "---\n\n",
+        ]
+        for category, entries in view.sections:
+            parts.append(f"## {category} ({len(entries)} 条)\n\n")
+            for i, (title, url, sources, _, _, summary) in enumerate(entries, 1):
+                # 来源作为标注
+                parts.append(f"{i}. [{title.translate(MARKDOWN_ESCAPE)}]({url}) *({' / '.join(sources)})*\n")
+                if summary:
+                    parts.append(f"   > {summary.translate(MARKDOWN_ESCAPE)}\n")
+            parts.append("\n")
+        if view.missing_sources:
+            parts.append(f"> 以下 {len(view.missing_sources)} 个新闻源在时间预算内未完成，本日报不包含它们的新闻："
+                         f"{'、'.join(view.missing_sources)}\n\n")
+        parts.append("---\n\n")
+        parts.append(f"*此日报由 {APP_NAME} v{VERSION} 自动生成*\n")
+        parts.append(f"*生成时间: {view.generated_text}*\n")
+        parts.append("*许可证: MIT License*\n")
+        return ''.join(parts)
+
+class HtmlRenderer(Renderer):
+    name = 'html'
+    extension = '.html'
+    content_type = 'text/html; charset=utf-8'
+    
+    def render(self, view):
+        parts = [
+            '<!DOCTYPE html>\n<html lang="zh-CN">\n<head>\n<meta charset="utf-8">\n',
+            f'<title>热点新闻日报 {view.date_str}</title>\n</head>\n<body>\n',
+            f'<h1>热点新闻日报 {view.date_str}</h1>\n',
+            f'<p><em>自动生成于 {view.generated_text}</em></p>\n',
+            f'<p><strong>共 {view.total} 条热点新闻</strong></p>\n',
+        ]
+        for category, entries in view.sections:
+            parts.append(f'<h2>{category.translate(XML_ESCAPE)} ({len(entries)} 条)</h2>\n<ol>\n')
+            for title, url, sources, _, _, summary in entries:
+                summary = f'<p>{summary.translate(XML_ESCAPE)}</p>' if summary else ''
+                parts.append(f'<li><a href="{url.translate(XML_ESCAPE)}">{title.translate(XML_ESCAPE)}</a> '
+                             f'<em>({" / ".join(sources).translate(XML_ESCAPE)})</em>{summary}</li>\n')
+            parts.append('</ol>\n')
+        if view.missing_sources:
+            parts.append(f'<p>以下 {len(view.missing_sources)} 个新闻源在时间预算内未完成，本日报不包含它们的新闻：'
+                         f'{"、".join(view.missing_sources).translate(XML_ESCAPE)}</p>\n')
+        parts.append(f'<hr>\n<p><em>此日报由 {APP_NAME} v{VERSION} 自动生成</em></p>\n</body>\n</html>\n')
+        return ''.join(parts)
+
+class JsonRenderer(Renderer):
+    name = 'json'
+    extension = '.json'
+    content_type = 'application/json; charset=utf-8'
+    
+    def render(self, view):
+        return json.dumps({
+            'date': view.date_str,
+            'generated': view.generated.isoformat(timespec='seconds'),
+            'total': view.total,
+            'categories': [
+                {
+                    'name': category,
+                    'news': [dict({'title': title, 'url': url, 'sources': sources},
+                                  **({'summary': summary} if summary else {}))
+                             for title, url, sources, _, _, summary in entries],
+                }
+                for category, entries in view.sections
+            ],
+            'missing_sources': view.missing_sources,
+        }, ensure_ascii=False)
+
+def _feed_timestamp(date, published, generated):
+    """条目的发布时间：有发布时间戳时使用它，否则取新闻日期当天0点（本地时区）"""
+    if published is not None:
+        return datetime.datetime.fromtimestamp(published, generated.tzinfo)
+    return datetime.datetime.combine(date, datetime.time(), generated.tzinfo)
+
+class RssRenderer(Renderer):
+    name = 'rss'
+    extension = '.rss.xml'
+    content_type = 'application/rss+xml; charset=utf-8'
+    
+    def render(self, view):
+        title = f'热点新闻日报 {view.date_str}'
+        parts = [
+            '<?xml version="1.0" encoding="utf-8"?>\n<rss version="2.0">\n<channel>\n',
+            f'<title>{title}</title>\n<link>{FEED_LINK}</link>\n',
+            f'<description>共 {view.total} 条热点新闻</description>\n<language>zh-CN</language>\n',
+            f'<lastBuildDate>{email.utils.format_datetime(view.generated)}</lastBuildDate>\n',
+            f'<generator>{APP_NAME} v{VERSION}</generator>\n',
+        ]
+        for category, entries in view.sections:
+            category = category.translate(XML_ESCAPE)
+            for title, url, sources, date, published, summary in entries:
+                url = url.translate(XML_ESCAPE)
+                description = f'{summary} ({" / ".join(sources)})' if summary else ' / '.join(sources)
+                parts.append(
+                    f'<item>\n<title>{title.translate(XML_ESCAPE)}</title>\n<link>{url}</link>\n'
+                    f'<guid isPermaLink="true">{url}</guid>\n<category>{category}</category>\n'
+                    f'<description>{description.translate(XML_ESCAPE)}</description>\n'
+                    f'<pubDate>{email.utils.format_datetime(_feed_timestamp(date, published, view.generated))}</pubDate>\n'
+                    '</item>\n')
+        parts.append('</channel>\n</rss>\n')
+        return ''.join(parts)
+
+class AtomRenderer(Renderer):
+    name = 'atom'
+    extension = '.atom.xml'
+    content_type = 'application/atom+xml; charset=utf-8'
+    
+    def render(self, view):
+        updated = view.generated.isoformat(timespec='seconds')
+        parts = [
+            '<?xml version="1.0" encoding="utf-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="zh-CN">\n',
+            f'<title>热点新闻日报 {view.date_str}</title>\n',
+            f'<id>urn:newspaper:digest:{view.date_str}</id>\n<updated>{updated}</updated>\n',
+            f'<link href="{FEED_LINK}"/>\n<author><name>{APP_NAME}</name></author>\n',
+            f'<generator version="{VERSION}">{APP_NAME}</generator>\n',
+        ]
+        for category, entries in view.sections:
+            category = category.translate(XML_ESCAPE)
+            for title, url, sources, date, published, summary in entries:
+                url = url.translate(XML_ESCAPE)
+                description = f'{summary} ({" / ".join(sources)})' if summary else ' / '.join(sources)
+                # Atom要求每个条目都有id，没有链接的新闻用标题的哈希
+                entry_id = url or f'urn:sha1:{hashlib.sha1(title.encode("utf-8")).hexdigest()}'
+                parts.append(
+                    f'<entry>\n<title>{title.translate(XML_ESCAPE)}</title>\n<link href="{url}"/>\n'
+                    f'<id>{entry_id}</id>\n<updated>{_feed_timestamp(date, published, view.generated).isoformat()}</updated>\n'
+                    f'<category term="{category}"/>\n'
+                    f'<summary>{description.translate(XML_ESCAPE)}</summary>\n'
+                    '</entry>\n')
+        parts.append('</feed>\n')
+        return ''.join(parts)
+
+# 格式名称 -> 渲染器
+RENDERERS = {renderer.name: renderer for renderer in (
+    MarkdownRenderer(), HtmlRenderer(), JsonRenderer(), RssRenderer(), AtomRenderer(),
+)}
+
+def render_digest(news_by_category, unique_news, date_str, formats=OUTPUT_FORMATS, missing_sources=()):
+    """把日报渲染为多种格式（共享同一个视图，多种格式并发渲染）
+    
+    Returns:
+        dict: 格式名称 -> 文本
+    """
+    view = DigestView(news_by_category, unique_news, date_str, missing_sources)
+    if len(formats) == 1:
+        return {formats[0]: RENDERERS[formats[0]].render(view)}
+    with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+        futures = {fmt: executor.submit(RENDERERS[fmt].render, view) for fmt in formats}
+    return {fmt: future.result() for fmt, future in futures.items()}
+
+def render_markdown(news_by_category, unique_news, date_str):
+    """生成Markdown格式的日报内容（按类别分类）"""
+    return render_digest(news_by_category, unique_news, date_str, ('md',))['md']
+
+def save_digest(news_by_category, unique_news, date_str, formats=OUTPUT_FORMATS, output_dir=None,
+                missing_sources=()):
+    """将日报保存为一种或多种格式的文件
+    
+    每种格式在内存中生成完整文本后原子地写入（先写临时文件再替换），
+    多种格式时渲染和写入都并发进行。
+    
+    Args:
+        news_by_category: 按类别分类的新闻字典
+        unique_news: 去重后的新闻列表
+        date_str: 日期字符串（格式：YYYY-MM-DD）
+        formats: 输出格式（RENDERERS 中的名称）
+        output_dir: 保存文件夹，默认为桌面的"每日新闻"文件夹
+        missing_sources: 到达时间预算时仍未完成的新闻源名称，会列在日报中
+    
+    Returns:
+        dict: 格式名称 -> 保存的文件路径
+    """
+    # 获取保存文件夹（默认使用桌面路径）
+    news_folder = output_dir or get_desktop_news_folder()
+    view = DigestView(news_by_category, unique_news, date_str, missing_sources)
+    
+    def render_and_write(fmt):
+        renderer = RENDERERS[fmt]
+        filename = os.path.join(news_folder, f"{date_str}{renderer.extension}")
+        try:
+            write_text_atomic(filename, renderer.render(view))
+        except IOError as e:
+            raise Exception(f"无法写入文件 {filename}: {str(e)}")
+        return filename
+    
+    try:
+        if len(formats) == 1:
+            return {formats[0]: render_and_write(formats[0])}
+        with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+            futures = {fmt: executor.submit(render_and_write, fmt) for fmt in formats}
+        return {fmt: future.result() for fmt, future in futures.items()}
+    except Exception as e:
+        raise Exception(f"保存文件时出错: {str(e)}")
+
+def save_to_markdown(news_by_category, unique_news, date_str, output_dir=None):
+    """将新闻保存为Markdown文件（按类别分类）
+    
+    Returns:
+        str: 保存的文件路径
+    """
+    return save_digest(news_by_category, unique_news, date_str, ('md',), output_dir)['md']
+
+# 英文单词和中文字符串的切分规则
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_CJK_RE = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+
+def title_shingles(title):
+    """将标题切分为特征集合：中文按字符二元组，英文按单词
+    
+    Args:
+        title: 新闻标题
+    
+    Returns:
+        frozenset: 特征集合
+    """
+    text = title.lower()
+    shingles = set(_WORD_RE.findall(text))
+    for run in _CJK_RE.findall(text):
+        if len(run) == 1:
+            shingles.add(run)
+        else:
+            shingles.update(run[i:i + 2] for i in range(len(run) - 1))
+    return frozenset(shingles)
+
+def choose_lsh_bands(threshold, num_perm=MINHASH_NUM_PERM, min_recall=MINHASH_MIN_RECALL):
+    """选择LSH分段参数：在保证阈值处召回率的前提下，每段行数尽量多（候选更少）
+    
+    Returns:
+        tuple: (段数, 每段行数)
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= min_recall:
+            best = (bands, rows)
+    return best
+
+class NearDuplicateIndex:
+    """近似重复新闻索引（MinHash签名 + LSH分段哈希）
+    
+    每个标题计算MinHash签名并按段放入哈希桶，查询时只比较落入相同桶的
+    候选，候选数量与已收录的新闻总数无关。候选再用特征集合的精确
+    Jaccard相似度确认，避免误合并。
+    """
+    
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD, num_perm=MINHASH_NUM_PERM):
+        self.threshold = threshold
+        self.bands, self.rows = choose_lsh_bands(threshold, num_perm)
+        num_hashes = self.bands * self.rows
+        self._hash_bytes = num_hashes * 4
+        self._hash_format = struct.Struct(f'<{num_hashes}I')
+        self._buckets = [{} for _ in range(self.bands)]
+        self._items = []
+        self._shingle_hashes = {}
+    
+    def _shingle_vector(self, shingle):
+        """单个特征在所有哈希函数下的取值（带缓存）
+        
+        用SHAKE-128的可变长输出一次得到全部32位哈希值，相当于一组
+        相互独立的哈希函数，避免在Python层逐个计算。
+        """
+        vector = self._shingle_hashes.get(shingle)
+        if vector is None:
+            if len(self._shingle_hashes) >= MINHASH_SHINGLE_CACHE:
+                self._shingle_hashes.clear()
+            digest = hashlib.shake_128(shingle.encode('utf-8')).digest(self._hash_bytes)
+            vector = self._shingle_hashes[shingle] = self._hash_format.unpack(digest)
+        return vector
+    
+    def _signature(self, shingles):
+        # 签名的每一位是所有特征在该哈希函数下的最小值
+        return list(map(min, zip(*[self._shingle_vector(s) for s in shingles])))
+    
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [tuple(signature[i * rows:(i + 1) * rows]) for i in range(self.bands)]
+    
+    def find_or_add(self, news):
+        """查找与该新闻近似重复的已收录新闻；没有则收录它
+        
+        Args:
+            news: NewsItem
+        
+        Returns:
+            NewsItem: 已收录的重复新闻，或者None（表示该新闻已被收录为新条目）
+        """
+        shingles = title_shingles(news.title)
+        if not shingles:
+            return None
+        band_keys = self._band_keys(self._signature(shingles))
+        
+        checked = set()
+        for band, key in enumerate(band_keys):
+            for index in self._buckets[band].get(key, ()):
+                if index in checked:
+                    continue
+                checked.add(index)
+                other_shingles, other = self._items[index]
+                overlap = len(shingles & other_shingles)
+                if overlap / (len(shingles) + len(other_shingles) - overlap) >= self.threshold:
+                    return other
+        
+        index = len(self._items)
+        self._items.append((shingles, news))
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(index)
+        return None
+
+def merge_news_source(survivor, duplicate):
+    """把重复新闻的来源记录到保留的新闻上"""
+    survivor.merge_sources(duplicate)
+
+def format_sources(news):
+    """新闻来源的显示文本（合并过的新闻会列出所有来源）"""
+    return ' / '.join(news.sources)
+
+class NewsDeduplicator:
+    """增量去重器：先去除完全相同的标题，再用MinHash检测措辞略有不同的近似重复
+    
+    被合并的重复新闻的来源会记录在保留新闻的 sources 中。
+    """
+    
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD):
+        self._seen_titles = {}
+        self._near_index = NearDuplicateIndex(threshold) if threshold and threshold < 1 else None
+    
+    def add(self, news):
+        """加入一条新闻
+        
+        Args:
+            news: NewsItem
+        
+        Returns:
+            bool: 是否为新的（非重复）新闻
+        """
+        title_lower = news.title.lower().strip()
+        if not title_lower or len(news.title) <= 5:
+            return False
+        # 完全相同的标题
+        survivor = self._seen_titles.get(title_lower)
+        # 措辞略有不同的同一新闻
+        if survivor is None and self._near_index is not None:
+            survivor = self._near_index.find_or_add(news)
+        if survivor is not None:
+            merge_news_source(survivor, news)
+            return False
+        self._seen_titles[title_lower] = news
+        return True
+
+def deduplicate_news(all_news, threshold=NEAR_DUP_THRESHOLD):
+    """去除重复的新闻（完全相同的标题和近似重复的标题）
+    
+    Args:
+        all_news: NewsItem 列表
+        threshold: 近似重复的相似度阈值（0~1），为1或None时只去除完全相同的标题
+    
+    Returns:
+        list: 去重后的新闻列表（保持原顺序）
+    """
+    deduplicator = NewsDeduplicator(threshold)
+    return [news for news in all_news if deduplicator.add(news)]
+
+def group_news_by_category(unique_news):
+    """按类别分类新闻
+    
+    Args:
+        unique_news: 去重后的新闻列表
+    
+    Returns:
+        dict: 类别 -> 新闻列表
+    """
+    news_by_category = {}
+    for news in categorize_items(unique_news):
+        category = news.category
+        if category not in news_by_category:
+            news_by_category[category] = []
+        news_by_category[category].append(news)
+    return news_by_category
+
+def title_ngrams(title, ngram_range=CLUSTER_NGRAM_RANGE):
+    """标题的字符n-gram（中文连续汉字和英文单词分别切分，英文单词两端补空格）
+    
+    Returns:
+        list: n-gram列表（可能重复，重复次数即词频）
+    """
+    text = title.lower()
+    low, high = ngram_range
+    grams = []
+    for run in _CJK_RE.findall(text) + [f' {word} ' for word in _WORD_RE.findall(text)]:
+        if len(run) < low:
+            grams.append(run)
+            continue
+        for n in range(low, min(high, len(run)) + 1):
+            grams.extend(run[i:i + n] for i in range(len(run) - n + 1))
+    return grams
+
+def cluster_news(news_list, threshold=CLUSTER_THRESHOLD):
+    """把不同来源报道同一事件的新闻聚成一组
+    
+    标题表示为字符n-gram的TF-IDF稀疏向量（字典，已归一化）。按顺序处理每条
+    新闻：与某个事件的第一条新闻（代表）的余弦相似度达到阈值时加入该事件，
+    否则成为新事件的代表。只和代表比较，相似关系不会一环扣一环地传递，
+    不会把大量只是略有相似的标题连成一个巨大的事件。为了不两两比较，每个
+    代表只取权重最高的 CLUSTER_BLOCK_KEYS 个n-gram作为分块键，新闻只和
+    至少共享 CLUSTER_MIN_SHARED_KEYS 个分块键的代表比较；对应代表太多的
+    分块键区分度低，达到 CLUSTER_MAX_BLOCK 后不再加入新的代表。
+    
+    Args:
+        news_list: NewsItem 列表（通常是去重后的新闻）
+        threshold: 余弦相似度阈值
+    
+    Returns:
+        list: 事件列表，每个事件是 news_list 中的下标列表（按下标排序，事件按第一条新闻的下标排序）
+    """
+    import heapq
+    from collections import Counter
+    
+    count = len(news_list)
+    term_counts = [Counter(title_ngrams(news.title)) for news in news_list]
+    document_frequency = Counter()
+    for counts in term_counts:
+        document_frequency.update(counts.keys())
+    idf = {gram: math.log((1 + count) / (1 + df)) + 1 for gram, df in document_frequency.items()}
+    
+    vectors = []
+    for counts in term_counts:
+        vector = {gram: tf * idf[gram] for gram, tf in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({gram: weight / norm for gram, weight in vector.items()})
+    
+    clusters = {}  # 代表的下标 -> 事件中的下标列表
+    blocks = {}  # 分块键 -> 代表的下标列表
+    for i, vector in enumerate(vectors):
+        keys = heapq.nlargest(CLUSTER_BLOCK_KEYS, vector, key=vector.get)
+        # 同一事件的标题通常共享多个权重最高的n-gram，只共享一个的不必计算相似度
+        shared = Counter()
+        for key in keys:
+            shared.update(blocks.get(key, ()))
+        best, best_similarity = None, threshold
+        for j, hits in shared.items():
+            if hits < CLUSTER_MIN_SHARED_KEYS:
+                continue
+            other = vectors[j]
+            # 稀疏向量的点积：只遍历两者共有的n-gram（集合交集在C层完成）
+            similarity = sum(vector[gram] * other[gram] for gram in vector.keys() & other.keys())
+            if similarity >= best_similarity and (best is None or similarity > best_similarity or j < best):
+                best, best_similarity = j, similarity
+        if best is not None:
+            clusters[best].append(i)
+            continue
+        clusters[i] = [i]
+        for key in keys:
+            block = blocks.setdefault(key, [])
+            if len(block) < CLUSTER_MAX_BLOCK:
+                block.append(i)
+    return list(clusters.values())
+
+def news_timestamp(news):
+    """新闻的发布时间戳；没有时间信息时按发布日期的中午计算"""
+    if news.published is not None:
+        return news.published
+    return (news.date.toordinal() - _EPOCH_ORDINAL) * 86400 + 43200
+
+def story_hotness(stories, latest):
+    """事件的热度：报道的来源数量 + 时效性
+    
+    时效性按最新一条报道距离 latest 的时间指数衰减（半衰期 HOTNESS_HALF_LIFE 小时），
+    取值在0~1之间，乘以 HOTNESS_RECENCY_WEIGHT，主要用于区分来源数量相同的事件。
+    
+    Args:
+        stories: 同一事件的 NewsItem 列表
+        latest: 参考时间戳（通常是全部新闻中最新的发布时间）
+    """
+    sources = {name for news in stories for name in news.sources}
+    age_hours = max(0, latest - max(news_timestamp(news) for news in stories)) / 3600
+    return len(sources) + HOTNESS_RECENCY_WEIGHT * 0.5 ** (age_hours / HOTNESS_HALF_LIFE)
+
+def rank_news(news_by_category, unique_news, threshold=CLUSTER_THRESHOLD):
+    """按热度对每个类别的新闻排序（原地排序）
+    
+    先对全部新闻跨来源聚类，再按事件热度从高到低排列；同一事件的新闻排在一起，
+    较新的在前。
+    
+    Args:
+        news_by_category: 类别 -> 新闻列表
+        unique_news: 去重后的全部新闻
+        threshold: 聚类的余弦相似度阈值
+    
+    Returns:
+        int: 事件数量
+    """
+    if not unique_news:
+        return 0
+    clusters = cluster_news(unique_news, threshold)
+    latest = max(news_timestamp(news) for news in unique_news)
+    sort_keys = {}
+    for cluster in clusters:
+        stories = [unique_news[i] for i in cluster]
+        score = story_hotness(stories, latest)
+        for news in stories:
+            sort_keys[news] = (-score, cluster[0], -news_timestamp(news))
+    for news_list in news_by_category.values():
+        news_list.sort(key=sort_keys.__getitem__)
+    return len(clusters)
+
+class ArticleCache:
+    """文章正文的磁盘缓存（按URL，LRU淘汰）
+    
+    每篇文章一个文件（URL哈希命名，第一行是URL，其余是提取出的正文），
+    以文件的修改时间作为最近使用时间：命中时更新修改时间，超出容量时
+    删除最久未使用的文件。不需要索引文件，多个进程同时使用也不会损坏。
+    """
+    
+    def __init__(self, cache_dir=None, max_entries=ARTICLE_CACHE_MAX_ENTRIES):
+        if cache_dir is None:
+            cache_dir = os.path.join(get_data_dir(), ARTICLE_CACHE_DIR_NAME)
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+    
+    def _path(self, url):
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, digest + '.txt')
+    
+    def get(self, url):
+        """返回缓存的正文（并更新最近使用时间），不存在时返回None"""
+        path = self._path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached_url, _, text = f.read().partition('\n')
+            if cached_url != url:
+                return None
+            os.utime(path)
+        except OSError:
+            return None
+        return text
+    
+    def put(self, url, text):
+        """保存正文"""
+        try:
+            write_text_atomic(self._path(url), f"{url}\n{text}")
+        except OSError as e:
+            safe_print(f"[!] 无法保存文章缓存: {str(e)}")
+    
+    def evict(self):
+        """超出容量时删除最久未使用的文章
+        
+        Returns:
+            int: 删除的文章数量
+        """
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.txt')]
+        except OSError:
+            return 0
+        overflow = len(entries) - self.max_entries
+        if overflow <= 0:
+            return 0
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        removed = 0
+        for entry in entries[:overflow]:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+# 正文提取时跳过的元素（导航、脚本、页眉页脚等）
+_ARTICLE_SKIP_TAGS = frozenset(['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form',
+                                'button', 'select', 'textarea', 'iframe', 'svg', 'figure'])
+
+class ArticleTextParser(html.parser.HTMLParser):
+    """从文章页面中提取正文
+    
+    收集每个 <p> 段落的文字，并记录它的父元素；正文通常是同一个容器中
+    连续的多个段落，取段落文字总长度最大的容器作为正文。
+    """
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._stack = []  # (标签, 元素编号)
+        self._skip_depth = 0
+        self._element_count = 0
+        self._paragraph = None  # 当前段落的文字片段
+        self._paragraph_parent = None
+        self.paragraphs = []  # (父元素编号, 段落文字)
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_ELEMENTS:
+            if tag == 'br' and self._paragraph is not None:
+                self._paragraph.append('\n')
+            return
+        self._element_count += 1
+        if tag == 'p' and self._paragraph is not None:
+            self._finish_paragraph()  # 未闭合的 <p>
+        self._stack.append((tag, self._element_count))
+        if tag in _ARTICLE_SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == 'p' and not self._skip_depth:
+            self._paragraph = []
+            self._paragraph_parent = self._stack[-2][1] if len(self._stack) > 1 else 0
+    
+    def handle_endtag(self, tag):
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                break
+        else:
+            return
+        for closed, _ in self._stack[i:]:
+            if closed in _ARTICLE_SKIP_TAGS:
+                self._skip_depth -= 1
+            elif closed == 'p' and self._paragraph is not None:
+                self._finish_paragraph()
+        del self._stack[i:]
+    
+    def handle_data(self, data):
+        if self._paragraph is not None and not self._skip_depth:
+            self._paragraph.append(data)
+    
+    def _finish_paragraph(self):
+        text = ' '.join(''.join(self._paragraph).split())
+        if len(text) >= ARTICLE_MIN_PARAGRAPH:
+            self.paragraphs.append((self._paragraph_parent, text))
+        self._paragraph = None
+    
+    def text(self):
+        """正文（段落之间用换行分隔），没有找到段落时返回空字符串"""
+        if self._paragraph is not None:
+            self._finish_paragraph()
+        lengths = {}
+        for parent, text in self.paragraphs:
+            lengths[parent] = lengths.get(parent, 0) + len(text)
+        if not lengths:
+            return ''
+        best = max(lengths, key=lengths.get)
+        return '\n'.join(text for parent, text in self.paragraphs if parent == best)
+
+def extract_article_text(body, encoding=None):
+    """从文章页面（bytes）中提取正文"""
+    parser = ArticleTextParser()
+    parser.feed(decode_html(body, encoding))
+    parser.close()
+    return parser.text()
+
+# 句末标点（后面紧跟的引号归入同一句）、英文句点加空白、换行
+_SENTENCE_END_RE = re.compile(r'(?<=[。！？!?；])(?![”」』"\'])|(?<=[。！？!?；][”」』"\'])|(?<=[.;])\s+|\n+')
+
+def split_sentences(text):
+    """把正文切分为句子（中文按句末标点，英文按句点加空白），过短和过长的句子丢弃"""
+    sentences = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        sentence = sentence.strip()
+        if SUMMARY_MIN_SENTENCE <= len(sentence) <= SUMMARY_MAX_SENTENCE:
+            sentences.append(sentence)
+    return sentences[:SUMMARY_MAX_CANDIDATES]
+
+def textrank_summaries(documents, count=SUMMARY_SENTENCES, max_chars=SUMMARY_MAX_CHARS):
+    """批量计算抽取式摘要（TextRank，需要numpy）
+    
+    所有文章的句子表示为哈希字符n-gram的词频向量，一次矩阵乘法得到全部句子
+    两两之间的余弦相似度，只保留同一篇文章内的相似度（块对角），然后对所有
+    文章同时做幂迭代（阻尼系数 0.85）。每篇文章取得分最高的句子，按原文顺序
+    排列，总长度不超过 max_chars（至少一句）。
+    
+    Args:
+        documents: 每篇文章的句子列表
+        count: 每篇摘要最多的句子数
+        max_chars: 每篇摘要最多的字符数
+    
+    Returns:
+        list: 与 documents 一一对应的摘要（没有句子的文章为空字符串）
+    """
+    import numpy as np
+    
+    sentences = [sentence for document in documents for sentence in document]
+    if not sentences:
+        return [''] * len(documents)
+    owner = np.repeat(np.arange(len(documents)), [len(document) for document in documents])
+    features, rows = hashed_ngrams(sentences, SUMMARY_HASH_BITS)
+    size = 1 << SUMMARY_HASH_BITS
+    vectors = np.bincount(rows * size + features, minlength=len(sentences) * size)
+    vectors = vectors.reshape(len(sentences), size).astype(np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+    
+    similarity = vectors @ vectors.T
+    similarity *= owner[:, None] == owner[None, :]
+    np.fill_diagonal(similarity, 0)
+    totals = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(similarity, totals, out=np.zeros_like(similarity), where=totals > 0)
+    
+    # 每篇文章的得分向量各自归一化，互不影响
+    sizes = np.bincount(owner, minlength=len(documents)).astype(np.float32)
+    base = (1 - TEXTRANK_DAMPING) / sizes[owner]
+    scores = 1 / sizes[owner]
+    for _ in range(TEXTRANK_ITERATIONS):
+        updated = base + TEXTRANK_DAMPING * (transition.T @ scores)
+        converged = np.abs(updated - scores).max() < 1e-6
+        scores = updated
+        if converged:
+            break
+    
+    summaries = []
+    start = 0
+    for document in documents:
+        document_scores = scores[start:start + len(document)]
+        start += len(document)
+        chosen = []
+        length = 0
+        for i in np.argsort(-document_scores, kind='stable'):
+            if len(chosen) >= count:
+                break
+            if chosen and length + len(document[i]) > max_chars:
+                continue
+            chosen.append(i)
+            length += len(document[i])
+        summaries.append(' '.join(document[i] for i in sorted(chosen)))
+    return summaries
+
+def lead_summaries(documents, count=SUMMARY_SENTENCES, max_chars=SUMMARY_MAX_CHARS):
+    """没有numpy时的摘要：取每篇文章开头的几句"""
+    summaries = []
+    for document in documents:
+        chosen = []
+        length = 0
+        for sentence in document[:count]:
+            if chosen and length + len(sentence) > max_chars:
+                break
+            chosen.append(sentence)
+            length += len(sentence)
+        summaries.append(' '.join(chosen))
+    return summaries
+
+def fetch_article_text(url, session=None, timeout=ARTICLE_TIMEOUT):
+    """下载文章页面并提取正文（失败时抛出异常），超过 ARTICLE_MAX_BYTES 的部分不下载"""
+    http = session if session is not None else _lazy_import('requests')
+    with http.get(url, headers=REQUEST_HEADERS, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        chunks = []
+        received = 0
+        for chunk in response.iter_content(FEED_CHUNK_SIZE):
+            chunks.append(chunk)
+            received += len(chunk)
+            if received >= ARTICLE_MAX_BYTES:
+                break
+        content_type = response.headers.get('Content-Type', '')
+    match = re.search(r'charset=([\w-]+)', content_type)
+    return extract_article_text(b''.join(chunks), match.group(1) if match else None)
+
+def summarize_news(news_by_category, per_category=SUMMARY_PER_CATEGORY, cache=None):
+    """为每个类别排在最前面的新闻生成摘要（写入 news.summary）
+    
+    文章页面并发下载（全局最多 ARTICLE_MAX_WORKERS 个，每个主机最多
+    ARTICLE_MAX_PER_HOST 个并按令牌桶限速），提取的正文保存在磁盘缓存中，
+    之后的运行（包括之后几天仍在排行中的新闻）不再重复下载。
+    
+    Args:
+        news_by_category: 类别 -> 新闻列表（已按热度排序）
+        per_category: 每个类别生成摘要的新闻数量
+        cache: ArticleCache 对象，为None时使用默认的缓存目录
+    
+    Returns:
+        int: 生成了摘要的新闻数量
+    """
+    selected = [news for news_list in news_by_category.values() for news in news_list[:per_category] if news.url]
+    if not selected:
+        return 0
+    if cache is None:
+        cache = ArticleCache()
+    texts = {}
+    missing = []
+    for news in selected:
+        text = cache.get(news.url)
+        if text is None:
+            missing.append(news.url)
+        else:
+            texts[news.url] = text
+    missing = list(dict.fromkeys(missing))
+    cached = len(texts)
+    
+    failed = 0
+    if missing:
+        requests = _lazy_import('requests')
+        limiter = HostLimiter(ARTICLE_MAX_PER_HOST, ARTICLE_HOST_RATE, ARTICLE_HOST_BURST)
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=ARTICLE_MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(limiter.call, job['url'], lambda url=job['url']: fetch_article_text(url, session)):
+                    job['url']
+                for job in interleave_by_host([{'url': url} for url in missing])
+            }
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    text = future.result()
+                except Exception:
+                    failed += 1
+                    continue
+                texts[url] = text
+                cache.put(url, text)
+        cache.evict()
+    
+    documents = [split_sentences(texts.get(news.url, '')) for news in selected]
+    try:
+        summaries = textrank_summaries(documents)
+    except ImportError:
+        print("[!] 未安装 numpy，摘要改为取文章开头的句子（pip install numpy）")
+        summaries = lead_summaries(documents)
+    summarized = 0
+    for news, summary in zip(selected, summaries):
+        news.summary = summary or None
+        summarized += bool(summary)
+    print(f"[*] 文章摘要: {summarized}/{len(selected)} 条（缓存 {cached} 篇，"
+          f"下载 {len(missing) - failed} 篇，失败 {failed} 篇）")
+    return summarized
+
+class NewsPipeline:
+    """流式处理管道
+    
+    每个源的结果一到达就立即去重、分类并追加到对应类别的缓冲区，
+    不必等待所有源完成，也不需要保留未去重的全部新闻。
+    """
+    
+    def __init__(self, dedup_threshold=NEAR_DUP_THRESHOLD):
+        self.deduplicator = NewsDeduplicator(dedup_threshold)
+        self.unique_news = []
+        self.news_by_category = {}
+        self.feeds_done = 0
+    
+    def add_feed(self, source_name, news_list):
+        """处理一个源的结果
+        
+        Args:
+            source_name: 新闻源名称
+            news_list: 该源的新闻列表
+        
+        Returns:
+            list: 去重后新增的新闻
+        """
+        self.feeds_done += 1
+        with _profiler.span('dedup', source=source_name, items=len(news_list)):
+            new_items = [news for news in news_list if self.deduplicator.add(news)]
+        with _profiler.span('categorize_news', source=source_name, items=len(new_items)):
+            categorize_items(new_items)
+        for news in new_items:
+            self.news_by_category.setdefault(news.category, []).append(news)
+        self.unique_news.extend(new_items)
+        return new_items
+    
+    def status_line(self, total_feeds):
+        """实时控制台视图的一行进度摘要"""
+        counts = ' · '.join(
+            f"{category} {len(self.news_by_category[category])}"
+            for category in CATEGORY_ORDER if self.news_by_category.get(category)
+        )
+        return f"    [~] 进度 {self.feeds_done}/{total_feeds} | 共 {len(self.unique_news)} 条 | {counts}"
+
+def report_digest(news_by_category, unique_news, date_str, formats=OUTPUT_FORMATS, output_dir=None,
+                  missing_sources=(), open_file=True, rank=True, summarize=False):
+    """在控制台显示日报并保存为文件
+    
+    Args:
+        news_by_category: 类别 -> 新闻列表
+        unique_news: 去重后的全部新闻
+        date_str: 日期字符串（YYYY-MM-DD）
+        formats: 输出格式（RENDERERS 中的名称）
+        output_dir: 日报文件的保存文件夹，默认为桌面的"每日新闻"文件夹
+        missing_sources: 在时间预算内未完成的源名称
+        open_file: 保存后是否用默认程序打开文件（多种格式时打开第一种）
+        rank: 是否按热度排序每个类别的新闻（见 rank_news），否则按获取到的顺序
+        summarize: 是否为每个类别排在最前面的新闻下载文章并生成摘要（见 summarize_news）
+    """
+    if rank and unique_news:
+        with _profiler.span('rank', items=len(unique_news)):
+            stories = rank_news(news_by_category, unique_news)
+        print(f"[*] 按热度排序: {len(unique_news)} 条新闻归为 {stories} 个事件")
+        print()
+    if summarize and unique_news:
+        with _profiler.span('summarize'):
+            summarize_news(news_by_category)
+        print()
+    
+    # 显示结果
+    print("=" * 70)
+    print(f"{date_str} 热点新闻 (共 {len(unique_news)} 条)")
+    print("=" * 70)
+    print()
+    
+    if not unique_news:
+        print(f"{date_str} 暂时没有找到热点新闻，请稍后再试。")
+        print("提示：可能是网络问题或新闻源暂时不可用。")
+        return
+    
+    # 显示类别统计
+    print("\n类别统计：")
+    for category in CATEGORY_ORDER:
+        if category in news_by_category and news_by_category[category]:
+            count = len(news_by_category[category])
+            print(f"  {category}: {count} 条")
+    print()
+    
+    # 按类别显示新闻
+    for category in CATEGORY_ORDER:
+        if category in news_by_category and news_by_category[category]:
+            news_list = news_by_category[category]
+            print("\n" + "=" * 70)
+            print(f"【{category}】({len(news_list)} 条)")
+            print("=" * 70)
+            
+            # 限制显示数量，避免输出过多
+            display_count = min(len(news_list), MAX_DISPLAY_COUNT)
+            for i, news in enumerate(news_list[:display_count], 1):
+                print(f"{i}. {news.title}")
+                print(f"   来源: {format_sources(news)} | 链接: {news.url}")
+                if news.summary:
+                    print(f"   摘要: {news.summary}")
+            if len(news_list) > display_count:
+                print(f"   ... 还有 {len(news_list) - display_count} 条新闻（已保存到文件）")
     
     print()
     print("=" * 70)
     print(f"新闻获取完成！共找到 {len(unique_news)} 条热点新闻")
     print("=" * 70)
     
-    # 保存为Markdown文件
+    # 保存为日报文件
     try:
-        filename = save_to_markdown(news_by_category, unique_news, yesterday_str)
-        file_path = os.path.abspath(filename)
-        print(f"\n[✓] 结果已保存到: {file_path}")
+        with _profiler.span('save_digest', items=len(unique_news)):
+            filenames = save_digest(news_by_category, unique_news, date_str, formats, output_dir,
+                                    missing_sources)
+        file_path = os.path.abspath(filenames[formats[0]])
+        print()
+        for filename in filenames.values():
+            print(f"[✓] 结果已保存到: {os.path.abspath(filename)}")
         
         # 自动打开文件
+        if not open_file:
+            return
         try:
             print("[*] 正在打开新闻文件...")
             open_file_with_default_app(file_path)
@@ -477,9 +4381,1035 @@ def get_yesterday_hot_news():
         import traceback
         traceback.print_exc()
 
+def get_yesterday_hot_news(use_async=False, use_cache=True, dedup_threshold=NEAR_DUP_THRESHOLD, live=False,
+                           use_health=True, sources=None, target_date=None, output_dir=None, open_file=True,
+                           parse_workers=PARSE_WORKERS, use_store=True, formats=OUTPUT_FORMATS, host_limits=True,
+                           deadline=RUN_DEADLINE, hedge=False, use_seen=True, rank=True, summarize=False):
+    """获取前一天的热点新闻（使用并发加速）
+    
+    Args:
+        use_async: 是否使用asyncio异步获取（连接池复用，需要安装aiohttp）
+        use_cache: 是否使用条件GET缓存（ETag / Last-Modified）
+        dedup_threshold: 近似重复的相似度阈值（0~1），为1时只去除完全相同的标题
+        live: 是否在每个源完成时显示实时进度
+        use_health: 是否根据新闻源健康记录自适应超时、熔断和排序
+        sources: 新闻源列表，默认为 ALL_RSS_SOURCES
+        target_date: 要获取的日期，默认为昨天
+        output_dir: 日报文件的保存文件夹，默认为桌面的"每日新闻"文件夹
+        open_file: 保存后是否用默认程序打开文件（多种格式时打开第一种）
+        parse_workers: 解析进程数，0表示在下载线程中解析
+        use_store: 是否把收集到的新闻写入本地数据库（用于 query 检索历史新闻）
+        formats: 输出格式（RENDERERS 中的名称）
+        host_limits: 是否按主机限制并发和请求频率（见 HostLimiter）
+        deadline: 获取阶段的时间预算（秒），到期后用已返回的结果生成日报，0表示不限制
+        hedge: 是否对慢于通常耗时的源发送对冲请求
+        use_seen: 是否使用已处理条目索引（见过的条目复用日期和类别）
+        rank: 是否按热度排序每个类别的新闻
+        summarize: 是否为排在最前面的新闻生成文章摘要
+    """
+    print("=" * 70)
+    print(f"{APP_NAME} v{VERSION}")
+    print("=" * 70)
+    if target_date is None:
+        target_date = (datetime.datetime.now() - datetime.timedelta(days=1)).date()
+    yesterday_date = target_date
+    yesterday_str = target_date.strftime('%Y-%m-%d')
+    print(f"正在获取 {yesterday_str} 的热点新闻...")
+    if sources is None:
+        sources = ALL_RSS_SOURCES
+        if _sources_origin:
+            print(f"共 {len(ALL_RSS_SOURCES)} 个新闻源（{_sources_origin}）")
+        else:
+            print(f"共 {len(ALL_RSS_SOURCES)} 个新闻源（国内: {len(DOMESTIC_RSS_SOURCES)}, 国外: {len(INTERNATIONAL_RSS_SOURCES)}）")
+    else:
+        print(f"共 {len(sources)} 个新闻源")
+    print("=" * 70)
+    print()
+    
+    # 流式处理：每个源完成后立即去重、分类
+    pipeline = NewsPipeline(dedup_threshold)
+    
+    success_count = 0
+    fail_count = 0
+    
+    # 条件GET缓存：未变化的源直接复用上次解析的条目
+    cache = FeedCache.load() if use_cache else None
+    
+    # 健康记录：跳过熔断中的源，慢的源先开始
+    health = SourceHealthStore.load() if use_health else None
+    if health is not None:
+        sources, skipped = health.plan(sources)
+        if skipped:
+            names = ', '.join(source['name'] for source in skipped)
+            print(f"[~] 跳过 {len(skipped)} 个持续失败的源（熔断中）: {names}")
+            print()
+    
+    # 已处理条目索引：之前运行中见过的条目不再计算日期和分类（解析进程池模式下不使用）
+    seen = SeenIndex.load() if use_seen and not parse_workers else None
+    
+    # 按主机限速：不同主机的源交错排列，避免同一主机的多个源同时发出请求
+    limiter = None
+    if host_limits:
+        limiter = HostLimiter()
+        sources = interleave_by_host(sources)
+    
+    if use_async and not is_async_available():
+        print("[!] 未安装 aiohttp，已回退到线程池模式（pip install aiohttp）")
+        use_async = False
+    
+    if use_async:
+        # 使用asyncio连接池并发获取新闻
+        print(f"[*] 正在异步获取新闻（最多{ASYNC_MAX_CONNECTIONS}个连接，每个主机{ASYNC_MAX_PER_HOST}个）...")
+    else:
+        # 使用线程池并发获取新闻
+        print(f"[*] 正在并发获取新闻（最多{MAX_WORKERS}个线程）...")
+    if parse_workers:
+        print(f"[*] 使用 {parse_workers} 个解析进程（每批最多 {PARSE_BATCH_SIZE} 个feed）")
+    if deadline:
+        print(f"[*] 时间预算 {deadline:g} 秒，到期后不再等待剩余的源")
+    print()
+    
+    run_deadline = RunDeadline(deadline) if deadline else None
+    fetch_start = time.perf_counter()
+    collected = []
+    for source_name, news_list in iter_fetch_results(sources, yesterday_date, use_async, cache, health,
+                                                     parse_workers, limiter, run_deadline, hedge, seen):
+        if news_list is None:
+            fail_count += 1
+            continue
+        if news_list:
+            success_count += 1
+        if use_store:
+            collected.extend(news_list)
+        pipeline.add_feed(source_name, news_list)
+        if live:
+            safe_print(pipeline.status_line(len(sources)))
+    _profiler.add('fetch_all', fetch_start, time.perf_counter() - fetch_start)
+    
+    if cache is not None:
+        cache.save()
+    if health is not None:
+        health.save()
+    
+    missing_sources = run_deadline.missing if run_deadline is not None else []
+    
+    print()
+    print(f"[*] 完成：成功 {success_count} 个源，失败 {fail_count} 个源")
+    if seen is not None and seen.hits:
+        print(f"[*] {seen.hits} 个条目之前已处理过（复用日期和类别），{seen.misses} 个新条目")
+    if missing_sources:
+        print(f"[~] 已到达时间预算（{deadline:g}秒），{len(missing_sources)} 个源未完成: {', '.join(missing_sources)}")
+    if use_store:
+        store_news(collected)
+    if seen is not None:
+        # 在分类（包括 store_news 对被合并新闻的分类）完成后保存，记录每个条目的类别
+        seen.save()
+    print()
+    
+    report_digest(pipeline.news_by_category, pipeline.unique_news, yesterday_str, formats, output_dir,
+                  missing_sources, open_file, rank, summarize)
+
+def backfill_news(start_date, end_date, use_cache=True, dedup_threshold=NEAR_DUP_THRESHOLD, use_store=True,
+                  formats=OUTPUT_FORMATS, host_limits=True, rank=True):
+    """多日存档模式：每个源只获取一次，按发布日期分桶并生成每天的日报
+    
+    Args:
+        start_date: 起始日期（date对象，包含）
+        end_date: 结束日期（date对象，包含）
+        use_cache: 是否使用条件GET缓存
+        dedup_threshold: 近似重复的相似度阈值（0~1）
+        use_store: 是否把收集到的新闻写入本地数据库
+        formats: 输出格式（RENDERERS 中的名称）
+        host_limits: 是否按主机限制并发和请求频率（见 HostLimiter）
+        rank: 是否按热度排序每个类别的新闻
+    """
+    print("=" * 70)
+    print(f"{APP_NAME} v{VERSION}")
+    print("=" * 70)
+    print(f"存档模式: {start_date.isoformat()} ~ {end_date.isoformat()}")
+    print(f"共 {len(ALL_RSS_SOURCES)} 个新闻源")
+    print("=" * 70)
+    print()
+    
+    cache = FeedCache.load() if use_cache else None
+    archive = NewsArchive()
+    limiter = HostLimiter() if host_limits else None
+    sources = interleave_by_host(ALL_RSS_SOURCES) if host_limits else ALL_RSS_SOURCES
+    added = 0
+    collected = []
+    
+    print(f"[*] 正在并发获取新闻（最多{MAX_WORKERS}个线程）...")
+    print()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(fetch_archive_worker, source, start_date, end_date, cache, limiter)
+            for source in sources
+        ]
+        for future in as_completed(futures):
+            source_name, news_list = future.result()
+            added += archive.add(news_list)
+            if use_store:
+                collected.extend(news_list)
+    
+    if cache is not None:
+        cache.save()
+    archive.save()
+    print()
+    print(f"[*] 存档新增 {added} 条新闻")
+    if use_store:
+        store_news(collected)
+    print()
+    
+    # 从存档生成每天的日报文件
+    day = start_date
+    while day <= end_date:
+        unique_news = deduplicate_news(archive.load_day(day), dedup_threshold)
+        date_str = day.strftime('%Y-%m-%d')
+        if unique_news:
+            news_by_category = group_news_by_category(unique_news)
+            if rank:
+                rank_news(news_by_category, unique_news)
+            try:
+                filenames = save_digest(news_by_category, unique_news, date_str, formats)
+                paths = ', '.join(os.path.abspath(filename) for filename in filenames.values())
+                print(f"[✓] {date_str}: {len(unique_news)} 条 -> {paths}")
+            except Exception as e:
+                print(f"[!] {date_str}: 保存文件时出错: {str(e)}")
+        else:
+            print(f"[-] {date_str}: 没有新闻")
+        day += datetime.timedelta(days=1)
+
+def shard_of(source, count, by_host=SHARD_BY_HOST):
+    """新闻源所属的分片（0 ~ count-1）
+    
+    默认按源的URL哈希分区，同一主机的大量源也能均匀分到各个分片，但按主机限速
+    只在每个进程内有效。by_host 为True时按主机名哈希分区：同一主机的源总在同一个
+    分片中，按主机限速在多个进程/多台机器之间仍然有效，但一个主机上的全部源都由
+    一个分片获取。两种方式的结果都与源在列表中的位置无关，增删其他源不会移动它。
+    """
+    key = host_of(source['url']) if by_host else source['url']
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+def select_shard(sources, shard, by_host=SHARD_BY_HOST):
+    """选出属于某个分片的新闻源
+    
+    Args:
+        sources: 新闻源列表
+        shard: (分片序号, 分片总数)，序号从1开始
+        by_host: 是否按主机名划分（见 shard_of），同一次运行的全部分片必须使用相同的设置
+    """
+    index, count = shard
+    return [source for source in sources if shard_of(source, count, by_host) == index - 1]
+
+def shard_state_path(filename, shard):
+    """分片进程各自使用的状态文件路径（缓存、健康记录）
+    
+    同一台机器上的多个分片进程如果共用状态文件，后保存的会覆盖先保存的。
+    """
+    stem, ext = os.path.splitext(filename)
+    index, count = shard
+    return os.path.join(get_data_dir(), f"{stem}.shard-{index}-of-{count}{ext}")
+
+def shard_result_path(date_str, shard, shard_dir=None):
+    """分片结果文件的路径"""
+    if shard_dir is None:
+        shard_dir = os.path.join(get_data_dir(), SHARD_DIR_NAME)
+    os.makedirs(shard_dir, exist_ok=True)
+    index, count = shard
+    return os.path.join(shard_dir, f"{date_str}.shard-{index}-of-{count}.json.gz")
+
+def write_shard_result(path, date_str, shard, news_list, failed=(), missing=()):
+    """写入分片结果文件（gzip压缩的JSON，每条新闻是一个 [标题, 链接, 来源, 日期, 发布时间戳] 数组）"""
+    import gzip
+    
+    data = {
+        'version': SHARD_FORMAT_VERSION,
+        'date': date_str,
+        'shard': list(shard),
+        'failed': list(failed),
+        'missing': list(missing),
+        'news': [[news.title, news.url, news.source, news.date.isoformat(), news.published] for news in news_list],
+    }
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def read_shard_result(path):
+    """读取 write_shard_result 写入的分片结果
+    
+    Returns:
+        dict: 除 news 转换为 NewsItem 列表外，与写入时的字段相同
+    
+    Raises:
+        ValueError: 文件格式错误或版本不兼容
+        OSError: 无法读取文件
+    """
+    import gzip
+    
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+    except (EOFError, gzip.BadGzipFile) as e:
+        raise ValueError(str(e))
+    if not isinstance(data, dict) or data.get('version') != SHARD_FORMAT_VERSION:
+        raise ValueError("不是分片结果文件或版本不兼容")
+    try:
+        news_list = []
+        for title, url, source, date, published in data['news']:
+            day = _dates.get(date)
+            if day is None:
+                day = _dates[date] = datetime.date.fromisoformat(date)
+            news_list.append(NewsItem(title, url, source, day, published=published))
+        data['news'] = news_list
+        data['shard'] = tuple(data['shard'])
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"分片结果文件格式错误: {str(e)}")
+    return data
+
+def fetch_shard(shard, use_async=False, use_cache=True, use_health=True, sources=None, target_date=None,
+                shard_dir=None, parse_workers=PARSE_WORKERS, host_limits=True, deadline=RUN_DEADLINE,
+                hedge=False, by_host=SHARD_BY_HOST):
+    """分片模式：只获取属于某个分片的新闻源，把原始结果写入分片结果文件
+    
+    不去重、不分类、不生成日报，这些在 merge 中对全部分片的结果统一进行。
+    分片进程不使用已处理条目索引：它记录的类别要在分类之后才有，而分类在 merge 中进行。
+    N 个分片可以是同一台机器上的 N 个进程，也可以分布在多台机器上
+    （把分片结果文件复制到同一个目录后再 merge）。
+    
+    Args:
+        shard: (分片序号, 分片总数)，序号从1开始
+        其余参数与 get_yesterday_hot_news 相同
+        shard_dir: 分片结果文件的保存目录，默认为 ~/.newspaper/shards
+        by_host: 是否按主机名划分分片（见 shard_of）
+    
+    Returns:
+        str: 分片结果文件的路径
+    """
+    index, count = shard
+    if target_date is None:
+        target_date = (datetime.datetime.now() - datetime.timedelta(days=1)).date()
+    date_str = target_date.strftime('%Y-%m-%d')
+    if sources is None:
+        sources = ALL_RSS_SOURCES
+    sources = select_shard(sources, shard, by_host)
+    print(f"[*] 分片 {index}/{count}: 获取 {date_str} 的新闻，{len(sources)} 个新闻源")
+    
+    # 每个分片使用自己的状态文件，同一台机器上的分片进程互不覆盖
+    cache = FeedCache.load(shard_state_path(FEED_CACHE_FILE, shard)) if use_cache else None
+    health = SourceHealthStore.load(shard_state_path(SOURCE_HEALTH_FILE, shard)) if use_health else None
+    skipped = []
+    if health is not None:
+        sources, skipped = health.plan(sources)
+        if skipped:
+            print(f"[~] 跳过 {len(skipped)} 个持续失败的源（熔断中）")
+    limiter = None
+    if host_limits:
+        limiter = HostLimiter()
+        sources = interleave_by_host(sources)
+    if use_async and not is_async_available():
+        print("[!] 未安装 aiohttp，已回退到线程池模式（pip install aiohttp）")
+        use_async = False
+    
+    run_deadline = RunDeadline(deadline) if deadline else None
+    collected = []
+    failed = [source['name'] for source in skipped]
+    fetch_start = time.perf_counter()
+    for source_name, news_list in iter_fetch_results(sources, target_date, use_async, cache, health,
+                                                     parse_workers, limiter, run_deadline, hedge):
+        if news_list is None:
+            failed.append(source_name)
+            continue
+        collected.extend(news_list)
+    _profiler.add('fetch_all', fetch_start, time.perf_counter() - fetch_start)
+    
+    if cache is not None:
+        cache.save()
+    if health is not None:
+        health.save()
+    missing = run_deadline.missing if run_deadline is not None else []
+    
+    path = shard_result_path(date_str, shard, shard_dir)
+    write_shard_result(path, date_str, shard, collected, failed, missing)
+    print(f"[*] 分片 {index}/{count}: {len(collected)} 条新闻，失败 {len(failed)} 个源，未完成 {len(missing)} 个源")
+    print(f"[✓] 分片结果已保存到: {os.path.abspath(path)}")
+    return path
+
+def merge_shards(paths=(), target_date=None, shard_dir=None, dedup_threshold=NEAR_DUP_THRESHOLD, use_store=True,
+                 formats=OUTPUT_FORMATS, output_dir=None, open_file=True, rank=True, summarize=False):
+    """合并分片结果：对全部分片的新闻统一去重、分类并生成日报
+    
+    Args:
+        paths: 分片结果文件列表，为空时读取 shard_dir 中目标日期的全部分片结果
+        target_date: 要合并的日期，默认为昨天（只在 paths 为空时使用）
+        shard_dir: 分片结果文件所在目录，默认为 ~/.newspaper/shards
+        dedup_threshold: 近似重复的相似度阈值（0~1）
+        use_store: 是否把收集到的新闻写入本地数据库
+        formats: 输出格式（RENDERERS 中的名称）
+        output_dir: 日报文件的保存文件夹
+        open_file: 保存后是否用默认程序打开文件
+        rank: 是否按热度排序每个类别的新闻
+        summarize: 是否为排在最前面的新闻生成文章摘要
+    """
+    if not paths:
+        if target_date is None:
+            target_date = (datetime.datetime.now() - datetime.timedelta(days=1)).date()
+        if shard_dir is None:
+            shard_dir = os.path.join(get_data_dir(), SHARD_DIR_NAME)
+        prefix = target_date.strftime('%Y-%m-%d') + '.shard-'
+        try:
+            paths = sorted(os.path.join(shard_dir, name) for name in os.listdir(shard_dir)
+                           if name.startswith(prefix) and name.endswith('.json.gz'))
+        except OSError:
+            paths = []
+        if not paths:
+            print(f"[-] {shard_dir} 中没有 {target_date.isoformat()} 的分片结果")
+            return
+    
+    shards = []
+    for path in paths:
+        try:
+            shards.append(read_shard_result(path))
+        except (OSError, ValueError) as e:
+            print(f"[!] 无法读取分片结果 {path}: {str(e)}")
+    if not shards:
+        return
+    shards.sort(key=lambda data: data['shard'])
+    dates = {data['date'] for data in shards}
+    counts = {data['shard'][1] for data in shards}
+    if len(dates) > 1 or len(counts) > 1:
+        print(f"[!] 分片结果不属于同一次运行（日期: {', '.join(sorted(dates))}，"
+              f"分片总数: {', '.join(map(str, sorted(counts)))}）")
+        return
+    date_str = shards[0]['date']
+    count = shards[0]['shard'][1]
+    present = {data['shard'][0] for data in shards}
+    absent = [index for index in range(1, count + 1) if index not in present]
+    
+    print("=" * 70)
+    print(f"{APP_NAME} v{VERSION} - 合并分片")
+    print("=" * 70)
+    print(f"[*] {date_str}: 读取 {len(shards)}/{count} 个分片，共 {sum(len(data['news']) for data in shards)} 条新闻")
+    if absent:
+        print(f"[!] 缺少分片: {', '.join(f'{index}/{count}' for index in absent)}（对应的新闻源不在日报中）")
+    
+    # 按分片、按来源送入流式管道，与单进程运行的去重和分类过程相同
+    pipeline = NewsPipeline(dedup_threshold)
+    collected = []
+    failed = []
+    missing_sources = []
+    for data in shards:
+        by_source = {}
+        for news in data['news']:
+            by_source.setdefault(news.source, []).append(news)
+        for source_name, news_list in by_source.items():
+            pipeline.add_feed(source_name, news_list)
+        collected.extend(data['news'])
+        failed.extend(data['failed'])
+        missing_sources.extend(data['missing'])
+    if failed:
+        print(f"[*] 各分片共有 {len(failed)} 个源获取失败")
+    if missing_sources:
+        print(f"[~] {len(missing_sources)} 个源在时间预算内未完成: {', '.join(missing_sources)}")
+    if use_store:
+        store_news(collected)
+    print()
+    
+    report_digest(pipeline.news_by_category, pipeline.unique_news, date_str, formats, output_dir,
+                  missing_sources, open_file, rank, summarize)
+
+class DigestSnapshot:
+    """某一时刻的日报快照：各格式的内容在生成时就编码好，HTTP请求只需要直接发送"""
+    
+    def __init__(self, version, news_by_category, unique_news, date_str):
+        self.version = version
+        self.etag = f'"{date_str}-{version}"'
+        self.bodies = {
+            fmt: text.encode('utf-8')
+            for fmt, text in render_digest(news_by_category, unique_news, date_str, tuple(RENDERERS)).items()
+        }
+
+class DigestModel:
+    """serve 模式的内存新闻模型
+    
+    每个源每次刷新后只把之前没见过的新闻并入去重/分类管道（已经从feed中
+    滚出的新闻仍然保留），目标日期变化时才整体重建。模型变化后由刷新线程
+    重新生成快照并整体替换引用，HTTP请求线程读取快照时不需要加锁，
+    也不会被后台获取阻塞。
+    """
+    
+    def __init__(self, target_date, dedup_threshold=NEAR_DUP_THRESHOLD, rank=True):
+        self.dedup_threshold = dedup_threshold
+        self.rank = rank
+        self.version = 0
+        self.reset(target_date)
+        self.publish()
+    
+    def reset(self, target_date):
+        """切换到新的目标日期，清空已有的新闻"""
+        self.target_date = target_date
+        self.pipeline = NewsPipeline(self.dedup_threshold)
+        self._seen = {}
+        self.dirty = True
+    
+    def update(self, source_name, news_list):
+        """并入一个源的最新结果
+        
+        Returns:
+            list: 之前没见过的新闻
+        """
+        seen = self._seen.setdefault(source_name, set())
+        fresh = []
+        for news in news_list:
+            key = NewsArchive.news_key(news)
+            if key not in seen:
+                seen.add(key)
+                fresh.append(news)
+        if fresh:
+            self.pipeline.add_feed(source_name, fresh)
+            self.dirty = True
+        return fresh
+    
+    def publish(self):
+        """重新生成快照（只在刷新线程中调用）"""
+        self.version += 1
+        if self.rank:
+            rank_news(self.pipeline.news_by_category, self.pipeline.unique_news)
+        self.snapshot = DigestSnapshot(self.version, self.pipeline.news_by_category,
+                                       self.pipeline.unique_news, self.target_date.strftime('%Y-%m-%d'))
+        self.dirty = False
+
+def make_digest_handler(model):
+    """创建 serve 模式的HTTP请求处理类
+    
+    路径: / 或 /digest.html、/digest.md、/digest.json、/digest.rss、/digest.atom
+    """
+    import http.server
+    
+    paths = {'/': 'html', **{f'/digest.{fmt}': fmt for fmt in RENDERERS}}
+    
+    class DigestRequestHandler(http.server.BaseHTTPRequestHandler):
+        server_version = f"NewsPaper/{VERSION}"
+        
+        def do_GET(self):
+            fmt = paths.get(self.path.split('?', 1)[0])
+            if fmt is None:
+                self.send_error(404)
+                return
+            snapshot = model.snapshot
+            if self.headers.get('If-None-Match') == snapshot.etag:
+                self.send_response(304)
+                self.send_header('ETag', snapshot.etag)
+                self.end_headers()
+                return
+            body = snapshot.bodies[fmt]
+            self.send_response(200)
+            self.send_header('Content-Type', RENDERERS[fmt].content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', snapshot.etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return DigestRequestHandler
+
+def serve_news(host=SERVE_HOST, port=SERVE_PORT, interval=SERVE_REFRESH_INTERVAL,
+               dedup_threshold=NEAR_DUP_THRESHOLD, use_cache=True, use_health=True, use_store=True,
+               host_limits=True, use_seen=True, rank=True):
+    """守护进程模式：常驻后台按各源的刷新间隔持续获取，并通过本地HTTP端口提供当前日报
+    
+    Args:
+        host: 监听地址
+        port: 监听端口
+        interval: 每个源默认的刷新间隔（秒）
+        dedup_threshold: 近似重复的相似度阈值（0~1）
+        use_cache: 是否使用条件GET缓存
+        use_health: 是否使用新闻源健康记录
+        use_store: 是否把收集到的新闻写入本地数据库
+        host_limits: 是否按主机限制并发和请求频率（见 HostLimiter）
+        use_seen: 是否使用已处理条目索引（见过的条目复用日期和类别）
+        rank: 是否按热度排序每个类别的新闻
+    """
+    import heapq
+    import http.server
+    
+    def yesterday():
+        return (datetime.datetime.now() - datetime.timedelta(days=1)).date()
+    
+    cache = FeedCache.load() if use_cache else None
+    health = SourceHealthStore.load() if use_health else None
+    limiter = HostLimiter() if host_limits else None
+    seen = SeenIndex.load() if use_seen else None
+    model = DigestModel(yesterday(), dedup_threshold, rank)
+    
+    # 常驻的连接池：同一主机的连接在多次刷新之间复用
+    requests = _lazy_import('requests')
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=len(ALL_RSS_SOURCES), pool_maxsize=MAX_WORKERS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    
+    httpd = http.server.ThreadingHTTPServer((host, port), make_digest_handler(model))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    
+    print("=" * 70)
+    print(f"{APP_NAME} v{VERSION} - 守护进程模式")
+    print("=" * 70)
+    print(f"[*] 日报地址: http://{host}:{httpd.server_address[1]}/ （/digest.md、/digest.json、/digest.rss、/digest.atom）")
+    print(f"[*] 共 {len(ALL_RSS_SOURCES)} 个新闻源，默认每 {interval} 秒刷新一次，按 Ctrl+C 退出")
+    print()
+    
+    # 调度队列：(下次刷新时间, 源序号)，启动时全部立即刷新
+    now = time.monotonic()
+    schedule = [(now, i) for i in range(len(ALL_RSS_SOURCES))]
+    running = {}  # 进行中的任务 -> (源序号, 目标日期)
+    collected = []
+    last_save = now
+    
+    def save():
+        if cache is not None:
+            cache.save()
+        if health is not None:
+            health.save()
+        if use_store and collected:
+            store_news(collected)
+            collected.clear()
+        if seen is not None:
+            seen.save()
+    
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    try:
+        while True:
+            now = time.monotonic()
+            
+            # 跨过零点后切换到新的一天，所有源立即重新获取
+            target_date = yesterday()
+            if target_date != model.target_date:
+                print(f"[*] 日期切换到 {target_date.isoformat()}，重新获取所有新闻源")
+                model.reset(target_date)
+                busy = {index for index, _ in running.values()}
+                schedule = [(now, i) for i in range(len(ALL_RSS_SOURCES)) if i not in busy]
+                heapq.heapify(schedule)
+            
+            # 提交到期的源（熔断中的源推迟到下一个周期）
+            while schedule and schedule[0][0] <= now:
+                _, index = heapq.heappop(schedule)
+                source = ALL_RSS_SOURCES[index]
+                source_interval = source.get('interval', interval)
+                if health is not None and health.plan([source])[1]:
+                    heapq.heappush(schedule, (now + source_interval, index))
+                    continue
+                future = executor.submit(fetch_news_worker, source, model.target_date, cache, health, session, limiter,
+                                         seen=seen)
+                running[future] = (index, model.target_date)
+            
+            # 等待任务完成或下一个源到期（最多1秒，以便检查日期切换）
+            timeout = min(max(0.0, schedule[0][0] - now), 1.0) if schedule else 1.0
+            if running:
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(timeout)
+                done = ()
+            for future in done:
+                index, fetched_date = running.pop(future)
+                source = ALL_RSS_SOURCES[index]
+                if fetched_date != model.target_date:
+                    # 获取期间跨过了零点，结果属于前一天，立即重新获取
+                    heapq.heappush(schedule, (time.monotonic(), index))
+                    continue
+                heapq.heappush(schedule, (time.monotonic() + source.get('interval', interval), index))
+                try:
+                    source_name, news_list = future.result()
+                except Exception as e:
+                    report_fetch_error(source['name'], e)
+                    continue
+                collected.extend(model.update(source_name, news_list))
+            
+            if model.dirty:
+                model.publish()
+                safe_print(f"    [~] 日报已更新（版本 {model.version}）: 共 {len(model.pipeline.unique_news)} 条")
+            
+            if time.monotonic() - last_save >= SERVE_SAVE_INTERVAL:
+                save()
+                last_save = time.monotonic()
+    except KeyboardInterrupt:
+        print("\n[*] 正在停止...")
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        executor.shutdown(wait=False, cancel_futures=True)
+        save()
+
+def print_health_report():
+    """打印每个新闻源的健康状况"""
+    health = SourceHealthStore.load()
+    print(f"{'新闻源':<16} {'p50':>7} {'p95':>7} {'超时':>6} {'失败率':>7}  {'最后成功':<19} 状态")
+    for source in ALL_RSS_SOURCES:
+        url = source['url']
+        p50 = health.latency_percentile(url, 50)
+        p95 = health.latency_percentile(url, 95)
+        error_rate = health.error_rate(url)
+        last_success = health.last_success(url)
+        print(f"{source['name']:<16} "
+              f"{'-' if p50 is None else f'{p50:.2f}s':>7} "
+              f"{'-' if p95 is None else f'{p95:.2f}s':>7} "
+              f"{health.timeout_for(url):>5.1f}s "
+              f"{'-' if error_rate is None else f'{error_rate:.0%}':>7}  "
+              f"{datetime.datetime.fromtimestamp(last_success).strftime('%Y-%m-%d %H:%M:%S') if last_success else '-':<19} "
+              f"{'熔断' if health.is_open(url) else '正常'}")
+
+def query_news(keywords, start_date=None, end_date=None, category=None, source=None,
+               limit=QUERY_DEFAULT_LIMIT):
+    """检索本地数据库中的历史新闻并打印结果"""
+    with NewsStore() as store:
+        start = time.perf_counter()
+        rows = store.search(keywords, start_date, end_date, category, source, limit)
+        elapsed = time.perf_counter() - start
+    for date, category, source, title, url in rows:
+        print(f"{date}  [{category}] {title}")
+        print(f"            来源: {source} | 链接: {url}")
+    print(f"\n[*] 找到 {len(rows)} 条（{elapsed * 1000:.1f} 毫秒）" +
+          ("，只显示前 {} 条，可用 --limit 调整".format(limit) if len(rows) >= limit else ""))
+
+def classifier_model_path():
+    """朴素贝叶斯模型文件的路径"""
+    return os.path.join(get_data_dir(), CLASSIFIER_MODEL_FILE)
+
+def load_bayes_classifier(path=None):
+    """加载训练好的朴素贝叶斯模型，未安装numpy或还没有训练时返回None并提示原因"""
+    path = path or classifier_model_path()
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("[!] 未安装 numpy，已回退到关键词分类（pip install numpy）")
+        return None
+    try:
+        return NaiveBayesClassifier.load(path)
+    except FileNotFoundError:
+        print("[!] 还没有训练统计分类器，已回退到关键词分类（先运行 train-classifier）")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[!] 无法加载统计分类器，已回退到关键词分类: {str(e)}")
+    return None
+
+def train_classifier(start_date=None, end_date=None, use_stored_labels=False):
+    """从本地数据库中的历史新闻离线训练朴素贝叶斯分类器
+    
+    默认用 NEWS_CATEGORIES 关键词分类的结果作为标注（自举）；use_stored_labels
+    为True时使用数据库中记录的类别（例如手工修正过的）。留出 NB_HOLDOUT 比例
+    的数据评估与标注的一致率，然后用全部数据训练并保存模型。
+    
+    Args:
+        start_date: 起始日期（date对象，包含）
+        end_date: 结束日期（date对象，包含）
+        use_stored_labels: 是否使用数据库中记录的类别作为标注
+    """
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("[!] 训练统计分类器需要 numpy（pip install numpy）")
+        return
+    try:
+        with NewsStore() as store:
+            rows = store.labeled_titles(start_date, end_date)
+    except sqlite3.Error as e:
+        print(f"[!] 无法读取本地数据库: {str(e)}")
+        return
+    if not rows:
+        print("[-] 本地数据库中没有新闻，请先运行几次以积累训练数据")
+        return
+    titles = [title for title, _ in rows]
+    if use_stored_labels:
+        labels = [category for _, category in rows]
+    else:
+        labels = get_keyword_classifier().classify_many(titles)
+    print(f"[*] 训练数据: {len(titles)} 条标题（标注来源: {'数据库中的类别' if use_stored_labels else '关键词分类'}）")
+    
+    # 留出一部分数据评估
+    step = max(2, round(1 / NB_HOLDOUT))
+    train_idx = [i for i in range(len(titles)) if i % step]
+    test_idx = [i for i in range(len(titles)) if not i % step]
+    if train_idx and test_idx:
+        model = NaiveBayesClassifier.train([titles[i] for i in train_idx], [labels[i] for i in train_idx])
+        predicted = model.classify_many([titles[i] for i in test_idx])
+        agree = sum(1 for i, label in zip(test_idx, predicted) if labels[i] == label)
+        print(f"[*] 留出 {len(test_idx)} 条评估: 与标注一致 {agree / len(test_idx):.1%}")
+    
+    start = time.perf_counter()
+    model = NaiveBayesClassifier.train(titles, labels)
+    path = classifier_model_path()
+    model.save(path)
+    print(f"[✓] 训练耗时 {time.perf_counter() - start:.2f}s，模型已保存到: {path}")
+    print("    使用 --classifier bayes 启用统计分类")
+
+def print_startup_timing():
+    """打印启动耗时分解（--startup-timing），用于跟踪启动速度的退化"""
+    print(f"{APP_NAME} v{VERSION} 启动耗时")
+    print("=" * 70)
+    previous = _startup_begin
+    for label, mark in _startup_marks:
+        print(f"  {label:<20} {(mark - previous) * 1000:>8.1f} ms")
+        previous = mark
+    print(f"  {'合计':<20} {(previous - _startup_begin) * 1000:>8.1f} ms")
+    print("  （不含解释器启动；打包的应用还需要加上解压和加载的时间）")
+    
+    # 按需导入的模块：本次运行还没有导入的也导入一次，测量首次使用时的额外耗时
+    print()
+    print("按需导入（首次使用时的额外耗时）:")
+    for name in _LAZY_MODULES + ('asyncio', 'aiohttp'):
+        try:
+            _lazy_import(name)
+        except ImportError:
+            print(f"  {name:<20} {'未安装':>8}")
+            continue
+        elapsed = _import_timings.get(name)
+        print(f"  {name:<20} " + (f"{elapsed * 1000:>8.1f} ms" if elapsed is not None else f"{'已由其他模块导入':>8}"))
+    
+    if getattr(sys, 'frozen', False):
+        return
+    # 源代码运行时，用 -X importtime 统计本模块直接导入的各个模块的累计耗时
+    import subprocess
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import NewsPaper'],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True)
+    rows = []
+    module_indent = None
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        indent = len(name) - len(name.lstrip())
+        rows.append((indent, int(parts[1]), name.strip()))
+        if name.strip() == 'NewsPaper':
+            module_indent = indent
+    if module_indent is None:
+        return
+    # -X importtime 按导入完成的顺序输出，子模块在父模块之前
+    direct = []
+    for indent, cumulative, name in reversed(rows):
+        if name == 'NewsPaper':
+            total = cumulative
+            continue
+        if indent == module_indent + 2:
+            direct.append((cumulative, name))
+        elif indent <= module_indent:
+            if direct:
+                break
+    print()
+    print(f"模块导入耗时（python -X importtime，import NewsPaper 共 {total / 1000:.1f} ms）:")
+    for cumulative, name in sorted(direct, reverse=True)[:10]:
+        print(f"  {name:<20} {cumulative / 1000:>8.1f} ms")
+
+def parse_date_arg(value):
+    """argparse 日期参数解析（YYYY-MM-DD）"""
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的日期: {value}（格式应为 YYYY-MM-DD）")
+
+def parse_threshold_arg(value):
+    """argparse 相似度阈值参数解析（0~1）"""
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = -1
+    if not 0 < threshold <= 1:
+        raise argparse.ArgumentTypeError(f"无效的阈值: {value}（应在 0~1 之间）")
+    return threshold
+
+def finish_profile(profiler):
+    """打印性能分析汇总，并把JSON trace写入数据目录"""
+    profiler.print_summary()
+    trace_path = os.path.join(get_data_dir(),
+                              f"profile-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    try:
+        profiler.write_trace(trace_path)
+        print(f"\n[✓] 性能分析trace已保存到: {trace_path}（可在 chrome://tracing 或 ui.perfetto.dev 中打开）")
+    except OSError as e:
+        print(f"\n[!] 无法保存性能分析trace: {str(e)}")
+
+def parse_workers_arg(value):
+    """解析 --parse-workers 参数：非负整数，auto 表示CPU核心数"""
+    if value == 'auto':
+        return os.cpu_count() or 1
+    try:
+        workers = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的进程数: {value}")
+    if workers < 0:
+        raise argparse.ArgumentTypeError(f"进程数不能为负数: {value}")
+    return workers
+
+def parse_formats_arg(value):
+    """解析 --format 参数：逗号分隔的输出格式列表"""
+    formats = tuple(dict.fromkeys(fmt.strip().lower() for fmt in value.split(',') if fmt.strip()))
+    unknown = [fmt for fmt in formats if fmt not in RENDERERS]
+    if not formats or unknown:
+        raise argparse.ArgumentTypeError(f"无效的输出格式: {value}（可选: {', '.join(RENDERERS)}）")
+    return formats
+
+def parse_shard_arg(value):
+    """解析 --shard 参数：i/N（1 <= i <= N）"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的分片: {value}（格式应为 i/N，例如 1/4）")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"无效的分片: {value}（应满足 1 <= i <= N）")
+    return index, count
+
+def parse_args(argv=None):
+    """解析命令行参数
+    
+    Args:
+        argv: 参数列表，默认为 sys.argv[1:]
+    
+    Returns:
+        argparse.Namespace: 解析结果
+    """
+    parser = argparse.ArgumentParser(description=f"{APP_NAME} v{VERSION}")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='使用asyncio异步获取（连接池复用，需要安装aiohttp）')
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help='不使用条件GET缓存，强制重新下载所有RSS源')
+    parser.add_argument('--backfill', nargs=2, type=parse_date_arg, metavar=('START', 'END'),
+                        help='存档模式：一次获取并生成 START 到 END（YYYY-MM-DD）之间每天的日报')
+    parser.add_argument('--dedup-threshold', type=parse_threshold_arg, default=NEAR_DUP_THRESHOLD,
+                        metavar='T', help=f'近似重复新闻的标题相似度阈值（0~1，默认{NEAR_DUP_THRESHOLD}，1表示只去除完全相同的标题）')
+    parser.add_argument('--live', action='store_true',
+                        help='实时显示进度：每个源完成时输出当前各类别的新闻数量')
+    parser.add_argument('--no-health', dest='use_health', action='store_false',
+                        help='不使用新闻源健康记录（固定超时，不跳过持续失败的源）')
+    parser.add_argument('--health-report', action='store_true',
+                        help='显示每个新闻源的响应耗时、失败率和熔断状态后退出')
+    parser.add_argument('--parse-workers', type=parse_workers_arg, default=PARSE_WORKERS, metavar='N',
+                        help='使用N个进程解析feed（auto表示CPU核心数，默认0：在下载线程中解析）')
+    parser.add_argument('--profile', action='store_true',
+                        help='记录每个阶段（DNS、连接、下载、解析、去重、分类、保存）的耗时，输出汇总表和JSON trace')
+    parser.add_argument('--no-store', dest='use_store', action='store_false',
+                        help='不把新闻写入本地数据库')
+    parser.add_argument('--deadline', type=float, default=RUN_DEADLINE, metavar='SECONDS',
+                        help='获取阶段的时间预算（秒，默认不限制），到期后用已返回的结果生成日报，并在日报末尾列出未完成的源')
+    parser.add_argument('--hedge', action='store_true',
+                        help='某个源超过它通常的耗时仍未完成时再并行请求一次（对冲请求，缩短尾延迟）')
+    parser.add_argument('--no-seen-index', dest='use_seen', action='store_false',
+                        help='不使用已处理条目索引（所有条目都重新计算发布时间和分类；分片模式不使用该索引）')
+    parser.add_argument('--no-host-limits', dest='host_limits', action='store_false',
+                        help=f'不按主机限速（默认每个主机最多同时{HOST_MAX_CONCURRENCY}个请求、每秒{HOST_RATE:g}个）')
+    parser.add_argument('--format', dest='formats', type=parse_formats_arg, default=OUTPUT_FORMATS, metavar='FORMATS',
+                        help=f'日报输出格式，多个用逗号分隔（{"/".join(RENDERERS)}，默认{",".join(OUTPUT_FORMATS)}）')
+    parser.add_argument('--no-rank', dest='rank', action='store_false',
+                        help='不按热度排序，每个类别的新闻按获取到的顺序排列')
+    parser.add_argument('--summarize', action='store_true',
+                        help=f'下载每个类别前{SUMMARY_PER_CATEGORY}条新闻的文章，提取正文并生成摘要（正文缓存在 ~/.newspaper/articles）')
+    parser.add_argument('--sources', metavar='FILE',
+                        help='新闻源配置文件（TOML/JSON），默认使用 ~/.newspaper/sources.toml 或 sources.json，都不存在时使用内置列表')
+    parser.add_argument('--shard', type=parse_shard_arg, metavar='i/N',
+                        help='分片模式：只获取第 i 个分片（共 N 个，按源的URL哈希划分）的新闻源，结果写入分片文件，之后用 merge 生成日报')
+    parser.add_argument('--shard-by-host', dest='shard_by_host', action='store_true',
+                        help='按主机名划分分片：同一主机的源由同一个分片获取，按主机限速跨进程有效（所有分片须使用相同设置）')
+    parser.add_argument('--shard-dir', metavar='DIR', help='分片结果文件的保存目录（默认 ~/.newspaper/shards）')
+    parser.add_argument('--classifier', choices=('keyword', 'bayes'), default=CLASSIFIER,
+                        help='新闻分类方式：keyword（关键词，默认）或 bayes（统计分类器，需要numpy并先运行 train-classifier）')
+    parser.add_argument('--startup-timing', action='store_true',
+                        help='显示启动耗时分解（标准库导入、模块初始化、按需导入的模块）后退出')
+    parser.add_argument('--version', action='version', version=f"{APP_NAME} v{VERSION}")
+    
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    query = subparsers.add_parser('query', help='检索本地数据库中的历史新闻',
+                                  description='按关键词、日期范围、类别和来源检索历史新闻')
+    query.add_argument('keywords', nargs='*', metavar='KEYWORD', help='标题关键词（全部匹配）')
+    query.add_argument('--from', dest='start_date', type=parse_date_arg, metavar='DATE',
+                       help='起始日期（YYYY-MM-DD，包含）')
+    query.add_argument('--to', dest='end_date', type=parse_date_arg, metavar='DATE',
+                       help='结束日期（YYYY-MM-DD，包含）')
+    query.add_argument('--category', choices=CATEGORY_ORDER, help='新闻类别')
+    query.add_argument('--source', help='新闻源名称')
+    query.add_argument('--limit', type=int, default=QUERY_DEFAULT_LIMIT, help=f'最多显示的条数（默认{QUERY_DEFAULT_LIMIT}）')
+    
+    serve = subparsers.add_parser('serve', help='守护进程模式：持续刷新并通过本地HTTP端口提供日报',
+                                  description='常驻后台，按各源的刷新间隔持续获取，通过本地HTTP端口提供Markdown/JSON/HTML/RSS/Atom格式的日报')
+    serve.add_argument('--host', default=SERVE_HOST, help=f'监听地址（默认{SERVE_HOST}）')
+    serve.add_argument('--port', type=int, default=SERVE_PORT, help=f'监听端口（默认{SERVE_PORT}）')
+    serve.add_argument('--interval', type=int, default=SERVE_REFRESH_INTERVAL, metavar='SECONDS',
+                       help=f'每个源默认的刷新间隔（秒，默认{SERVE_REFRESH_INTERVAL}）')
+    
+    merge = subparsers.add_parser('merge', help='合并 --shard 的分片结果：统一去重、分类并生成日报',
+                                  description='读取各分片的结果文件，对全部新闻去重、分类并生成日报')
+    merge.add_argument('paths', nargs='*', metavar='FILE',
+                       help='分片结果文件（默认读取 --shard-dir 中目标日期的全部分片结果）')
+    merge.add_argument('--date', type=parse_date_arg, metavar='DATE', help='要合并的日期（YYYY-MM-DD，默认昨天）')
+    
+    train = subparsers.add_parser('train-classifier', help='用本地数据库中的历史新闻训练统计分类器',
+                                  description='离线训练哈希字符n-gram朴素贝叶斯分类器（需要numpy），默认以关键词分类结果作为标注')
+    train.add_argument('--from', dest='start_date', type=parse_date_arg, metavar='DATE',
+                       help='起始日期（YYYY-MM-DD，包含）')
+    train.add_argument('--to', dest='end_date', type=parse_date_arg, metavar='DATE',
+                       help='结束日期（YYYY-MM-DD，包含）')
+    train.add_argument('--use-stored-labels', action='store_true',
+                       help='使用数据库中记录的类别作为标注（默认重新用关键词分类标注）')
+    return parser.parse_args(argv)
+
+_startup_marks.append(('模块初始化', time.perf_counter()))
+
 if __name__ == "__main__":
+    # 打包后的应用使用解析进程池时需要
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
     try:
-        get_yesterday_hot_news()
+        args = parse_args()
+        _startup_marks.append(('参数解析', time.perf_counter()))
+        if args.profile:
+            set_profiler(Profiler())
+        sources_file = args.sources or find_sources_file()
+        if sources_file:
+            try:
+                set_sources(load_sources(sources_file), sources_file)
+            except (OSError, SourceConfigError) as e:
+                print(f"[!] 无法读取新闻源配置文件: {str(e)}")
+                sys.exit(1)
+        if args.classifier == 'bayes' and args.command != 'train-classifier':
+            set_classifier(load_bayes_classifier())
+        if args.startup_timing:
+            print_startup_timing()
+        elif args.command == 'query':
+            query_news(args.keywords, args.start_date, args.end_date, args.category, args.source, args.limit)
+        elif args.command == 'merge':
+            merge_shards(args.paths, args.date, args.shard_dir, dedup_threshold=args.dedup_threshold,
+                         use_store=args.use_store, formats=args.formats, rank=args.rank,
+                         summarize=args.summarize)
+        elif args.command == 'train-classifier':
+            train_classifier(args.start_date, args.end_date, args.use_stored_labels)
+        elif args.command == 'serve':
+            serve_news(args.host, args.port, args.interval, dedup_threshold=args.dedup_threshold,
+                       use_cache=args.use_cache, use_health=args.use_health, use_store=args.use_store,
+                       host_limits=args.host_limits, use_seen=args.use_seen, rank=args.rank)
+        elif args.health_report:
+            print_health_report()
+        elif args.shard:
+            fetch_shard(args.shard, use_async=args.use_async, use_cache=args.use_cache, use_health=args.use_health,
+                        shard_dir=args.shard_dir, parse_workers=args.parse_workers, host_limits=args.host_limits,
+                        deadline=args.deadline, hedge=args.hedge, by_host=args.shard_by_host)
+        elif args.backfill:
+            start_date, end_date = sorted(args.backfill)
+            backfill_news(start_date, end_date, use_cache=args.use_cache,
+                          dedup_threshold=args.dedup_threshold, use_store=args.use_store, formats=args.formats,
+                          host_limits=args.host_limits, rank=args.rank)
+        else:
+            get_yesterday_hot_news(use_async=args.use_async, use_cache=args.use_cache,
+                                   dedup_threshold=args.dedup_threshold, live=args.live,
+                                   use_health=args.use_health, parse_workers=args.parse_workers,
+                                   use_store=args.use_store, formats=args.formats, host_limits=args.host_limits,
+                                   deadline=args.deadline, hedge=args.hedge, use_seen=args.use_seen, rank=args.rank,
+                                   summarize=args.summarize)
+        if args.profile:
+            finish_profile(get_profiler())
         
         # 如果是打包后的应用，等待用户按键后退出
         if getattr(sys, 'frozen', False):
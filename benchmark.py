@@ -0,0 +1,778 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+热点新闻获取器 - 性能基准测试
+对分类、解析等处理阶段进行离线基准测试，不访问网络
+
+用法:
+    python benchmark.py categorize [--titles 100000] [--extra-keywords 0]
+    python benchmark.py classifier [--titles 100000] [--train 50000]
+    python benchmark.py cluster [--titles 20000]
+    python benchmark.py parse [--items 2000] [--body-size 2000]
+    python benchmark.py dates [--count 200000] [--items 5000]
+    python benchmark.py parse-pool [--feeds 400] [--workers 1,2,4] [--fixtures DIR]
+    python benchmark.py items [--count 300000]
+    python benchmark.py suite [--sources 26,500,5000] [--latency 20] [--error-rate 0.02] [--slow-rate 0.02] [--synthetic]
+    python benchmark.py record [--out benchmark_fixtures]
+
+suite 启动一个本地替身HTTP服务器，用 fixture 代替真实新闻源，测量完整运行的耗时、
+各阶段吞吐量和内存峰值。默认使用仓库中的 benchmark_fixtures（RSS/Atom格式的小型fixture集），
+--synthetic 改用合成feed；运行 record 重新录制真实的feed后，可以用 --fixtures 指定录制目录。
+"""
+
+import sys
+import os
+import time
+import random
+import datetime
+import argparse
+import io
+import gc
+import json
+import tempfile
+import threading
+import contextlib
+import tracemalloc
+import email.utils
+import http.server
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# 设置控制台编码
+if sys.platform == 'win32':
+    try:
+        sys.stdout.reconfigure(encoding='utf-8')
+        sys.stderr.reconfigure(encoding='utf-8')
+    except:
+        os.environ['PYTHONIOENCODING'] = 'utf-8'
+else:
+    os.environ['PYTHONIOENCODING'] = 'utf-8'
+
+import NewsPaper
+
+# 仓库中的 fixture 目录（suite 默认使用）
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_fixtures')
+
+# 生成合成标题用的填充词
+FILLER_ZH = '的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严'
+FILLER_EN = ['the', 'new', 'report', 'says', 'after', 'over', 'city', 'plan', 'year', 'people',
+             'first', 'week', 'official', 'record', 'talks', 'local', 'update', 'amid', 'rise', 'fall']
+
+def legacy_categorize_news(title, categories=None):
+    """原始的逐关键词扫描实现（作为基准对照）"""
+    if categories is None:
+        categories = NewsPaper.NEWS_CATEGORIES
+    title_lower = title.lower()
+    title_with_spaces = ' ' + title_lower + ' '
+    category_priority = [c for c in NewsPaper.CATEGORY_ORDER if c != '其他']
+    for category in category_priority:
+        keywords = categories[category]
+        for keyword in keywords:
+            keyword_lower = keyword.lower()
+            if keyword_lower.isascii():
+                if f' {keyword_lower} ' in title_with_spaces or title_lower.startswith(keyword_lower + ' ') or title_lower.endswith(' ' + keyword_lower):
+                    return category
+            else:
+                if keyword in title:
+                    return category
+    return '其他'
+
+def make_titles(count, seed=42):
+    """生成合成标题：中文、英文混合，约一半包含关键词"""
+    rng = random.Random(seed)
+    keywords = [kw.strip() for kws in NewsPaper.NEWS_CATEGORIES.values() for kw in kws]
+    titles = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            words = rng.sample(FILLER_EN, rng.randint(5, 10))
+            if rng.random() < 0.5:
+                words.insert(rng.randrange(len(words)), rng.choice(keywords))
+            titles.append(' '.join(words).capitalize())
+        else:
+            chars = [rng.choice(FILLER_ZH) for _ in range(rng.randint(12, 28))]
+            if rng.random() < 0.5:
+                chars.insert(rng.randrange(len(chars)), rng.choice(keywords))
+            titles.append(''.join(chars))
+    return titles
+
+def make_extra_keywords(count, seed=7):
+    """生成额外的合成关键词，模拟扩充后的关键词表"""
+    rng = random.Random(seed)
+    labels = [c for c in NewsPaper.CATEGORY_ORDER if c != '其他']
+    categories = {c: list(kws) for c, kws in NewsPaper.NEWS_CATEGORIES.items()}
+    for i in range(count):
+        if i % 2:
+            keyword = ''.join(rng.choice(FILLER_ZH) for _ in range(rng.randint(3, 5)))
+        else:
+            keyword = f"kw{i}{rng.choice(FILLER_EN)}"
+        categories[rng.choice(labels)].append(keyword)
+    return categories
+
+def make_feed(kind, items, body_size, seed=1):
+    """生成合成feed（按时间倒序，最新的条目是昨天的）
+    
+    Args:
+        kind: 'rss'、'atom' 或 'malformed'（包含XML未定义的实体，触发回退）
+        items: 条目数量
+        body_size: 每个条目正文的字节数
+    """
+    rng = random.Random(seed)
+    now = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=1)
+    body = ''.join(rng.choice(FILLER_ZH) for _ in range(body_size // 3))
+    parts = []
+    for i in range(items):
+        title = ''.join(rng.choice(FILLER_ZH) for _ in range(16)) + f" {i}"
+        published = now - datetime.timedelta(minutes=30 * i)
+        if kind == 'atom':
+            parts.append(f"<entry><title>{title}</title><link href=\"https://example.com/{i}\"/>"
+                         f"<updated>{published.isoformat()}</updated><content>{body}</content></entry>")
+        else:
+            entity = '&nbsp;' if kind == 'malformed' else ''
+            parts.append(f"<item><title>{title}{entity}</title><link>https://example.com/{i}</link>"
+                         f"<pubDate>{email.utils.format_datetime(published)}</pubDate>"
+                         f"<description>{body}</description></item>")
+    if kind == 'atom':
+        doc = f'<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom"><title>bench</title>{"".join(parts)}</feed>'
+    else:
+        doc = f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>bench</title>{"".join(parts)}</channel></rss>'
+    return doc.encode('utf-8')
+
+def iter_chunks(content, size=NewsPaper.FEED_CHUNK_SIZE):
+    """模拟网络响应的数据块"""
+    for start in range(0, len(content), size):
+        yield content[start:start + size]
+
+def measure(func, *args):
+    """运行函数并返回 (结果, 耗时秒数, 内存峰值字节数)
+    
+    耗时和内存分两次测量，避免 tracemalloc 的开销影响计时。
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def timed(func, *args):
+    """运行函数并返回 (结果, 耗时秒数)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def print_row(name, seconds, count):
+    print(f"  {name:<24} {seconds:>9.3f} s  {count / seconds:>12,.0f} 条/秒")
+
+def bench_categorize(args):
+    """对比原始分类函数和编译后的自动机分类器"""
+    titles = make_titles(args.titles)
+    categories = make_extra_keywords(args.extra_keywords) if args.extra_keywords else NewsPaper.NEWS_CATEGORIES
+    keyword_count = sum(len(kws) for kws in categories.values())
+    print(f"[*] 分类基准: {len(titles):,} 条标题, {keyword_count:,} 个关键词")
+
+    classifier, build_time = timed(NewsPaper.KeywordClassifier, categories)
+    legacy, legacy_time = timed(lambda: [legacy_categorize_news(t, categories) for t in titles])
+    compiled, compiled_time = timed(classifier.classify_many, titles)
+
+    print(f"  {'编译自动机':<24} {build_time:>9.3f} s")
+    print_row('原始 categorize_news', legacy_time, len(titles))
+    print_row('KeywordClassifier', compiled_time, len(titles))
+    print(f"  加速比: {legacy_time / compiled_time:.1f}x")
+
+    same = sum(1 for a, b in zip(legacy, compiled) if a == b)
+    print(f"  结果一致: {same / len(titles):.1%}（差异来自单词边界规则：原实现只把空格视为边界，中英文混排时会漏匹配）")
+
+def bench_classifier(args):
+    """对比关键词分类和哈希n-gram朴素贝叶斯分类器的批量吞吐量（需要numpy）"""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("[!] 统计分类器需要 numpy（pip install numpy）")
+        return
+    keyword = NewsPaper.get_keyword_classifier()
+    train_titles = make_titles(args.train, seed=1)
+    titles = make_titles(args.titles)
+    print(f"[*] 分类器基准: 训练 {len(train_titles):,} 条, 测试 {len(titles):,} 条标题")
+
+    train_labels = keyword.classify_many(train_titles)
+    model, train_time = timed(NewsPaper.NaiveBayesClassifier.train, train_titles, train_labels)
+    expected, keyword_time = timed(keyword.classify_many, titles)
+    predicted, bayes_time = timed(model.classify_many, titles)
+
+    print_row('训练 NaiveBayes', train_time, len(train_titles))
+    print_row('KeywordClassifier', keyword_time, len(titles))
+    print_row('NaiveBayesClassifier', bayes_time, len(titles))
+    same = sum(1 for a, b in zip(expected, predicted) if a == b)
+    print(f"  与关键词分类一致: {same / len(titles):.1%}（合成标题由随机字词拼成，只有关键词带有类别信息）")
+
+def bench_cluster(args):
+    """跨来源聚类和热度排序的耗时（模拟多个来源报道同一批事件）"""
+    rng = random.Random(3)
+    target_date = datetime.date.today()
+    base = int(time.time())
+    stories = make_titles(max(1, args.titles // 3))
+    items = []
+    for i in range(args.titles):
+        title = rng.choice(stories)
+        if rng.random() < 0.5:
+            title += rng.choice(FILLER_ZH)  # 不同来源的措辞略有差异
+        items.append(NewsPaper.NewsItem(title, f'https://example.com/{i}', f'source-{i % 50}', target_date,
+                                        published=base - rng.randrange(86400)))
+    print(f"[*] 聚类基准: {len(items):,} 条新闻")
+
+    clusters, cluster_time = timed(NewsPaper.cluster_news, items)
+    news_by_category = NewsPaper.group_news_by_category(items)
+    _, rank_time = timed(NewsPaper.rank_news, news_by_category, items)
+    print_row('cluster_news', cluster_time, len(items))
+    print_row('rank_news（含聚类）', rank_time, len(items))
+    print(f"  事件数量: {len(clusters):,}，最大事件 {max(map(len, clusters)):,} 条")
+
+def bench_parse(args):
+    """对比 feedparser.parse 整体解析和流式快速解析（提前停止）"""
+    target_date = (datetime.datetime.now() - datetime.timedelta(days=1)).date()
+    max_items = NewsPaper.MAX_ITEMS_PER_SOURCE
+    accept = NewsPaper.make_date_filter(target_date)
+    feeds = [
+        ('小型RSS', make_feed('rss', 20, 200)),
+        ('大型RSS', make_feed('rss', args.items, args.body_size)),
+        ('大型Atom', make_feed('atom', args.items, args.body_size)),
+        ('格式错误（回退）', make_feed('malformed', 200, args.body_size)),
+    ]
+
+    def with_feedparser(content):
+        feed = NewsPaper.feedparser.parse(content)
+        entries = NewsPaper.simplify_feed_entries(feed.entries)
+        return NewsPaper.filter_feed_entries(entries, 'bench', target_date, max_items)
+
+    def with_stream(content):
+        entries, _ = NewsPaper.read_feed_stream(iter_chunks(content), max_items, accept)
+        return NewsPaper.filter_feed_entries(entries, 'bench', target_date, max_items)
+
+    print(f"[*] 解析基准: 每个源取 {max_items} 条 {target_date} 的新闻")
+    print(f"  {'feed':<16} {'大小':>9} {'解析器':<10} {'耗时':>10} {'内存峰值':>10} {'条目':>5}")
+    for name, content in feeds:
+        for parser_name, func in (('feedparser', with_feedparser), ('流式', with_stream)):
+            news, elapsed, peak = measure(func, content)
+            print(f"  {name:<16} {len(content) / 1024:>7.0f}KB {parser_name:<10} "
+                  f"{elapsed * 1000:>8.1f}ms {peak / 1024:>8.0f}KB {len(news):>5}")
+    print("  注：内存峰值不含响应内容本身；feedparser 需要先读入完整响应，流式解析只保留当前数据块")
+
+def legacy_parse_date(value):
+    """原来的日期解析：email.utils / datetime.fromisoformat 创建datetime对象后再换算"""
+    value = value.strip()
+    try:
+        if value[:4].isdigit():
+            if value.endswith(('Z', 'z')):
+                value = value[:-1] + '+00:00'
+            dt = datetime.datetime.fromisoformat(value)
+        else:
+            dt = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return int(dt.timestamp())
+
+def bench_dates(args):
+    """日期解析快速路径的吞吐量，以及先按日期批量过滤再构建条目的效果"""
+    rng = random.Random(3)
+    base = datetime.datetime.now(datetime.timezone.utc)
+    values = []
+    for _ in range(args.count):
+        published = base - datetime.timedelta(seconds=rng.randrange(30 * 86400))
+        zone = datetime.timezone(datetime.timedelta(hours=rng.choice((0, 8, -5))))
+        published = published.astimezone(zone)
+        values.append(email.utils.format_datetime(published) if rng.random() < 0.7
+                      else published.isoformat())
+    print(f"[*] 日期解析基准: {len(values):,} 个RFC 822/ISO 8601日期")
+    fast, fast_time = timed(lambda: [NewsPaper.parse_feed_timestamp(value) for value in values])
+    legacy, legacy_time = timed(lambda: [legacy_parse_date(value) for value in values])
+    print_row('parse_feed_timestamp', fast_time, len(values))
+    print_row('email.utils/fromisoformat', legacy_time, len(values))
+    print(f"  结果一致: {fast == legacy}")
+
+    # make_feed 的条目每隔30分钟一条；不限制条数，所有条目都要检查日期
+    target_date = (datetime.datetime.now() - datetime.timedelta(days=1)).date()
+    window = NewsPaper.DateWindow(target_date)
+    content = make_feed('rss', args.items, 200)
+    # 取3次中最快的一次（第一次运行包含缓存预热）
+    parsed, window_time = min(
+        (timed(NewsPaper.read_feed_stream, iter_chunks(content), None, window) for _ in range(3)),
+        key=lambda result: result[1])
+    callback_time = min(timed(NewsPaper.read_feed_stream, iter_chunks(content), None, lambda entry: window(entry))[1]
+                        for _ in range(3))
+    matched = sum(map(window, parsed[0]))
+    print(f"[*] 按日期过滤: {args.items:,} 个条目的feed，{matched} 条属于 {target_date}")
+    print_row('批量比较时间戳', window_time, args.items)
+    print_row('逐条调用过滤函数', callback_time, args.items)
+
+def parse_in_threads(feeds, target_date, max_items):
+    """在线程池中逐个解析（原来的方式：解析和下载共用线程，受GIL限制）"""
+    with ThreadPoolExecutor(max_workers=NewsPaper.MAX_WORKERS) as executor:
+        futures = [executor.submit(NewsPaper.parse_feed_batch, [(f"s{i}", content)], target_date, max_items)
+                   for i, content in enumerate(feeds)]
+        return sum(len(future.result()[0][3]) for future in futures)
+
+def parse_in_processes(feeds, target_date, max_items, workers, batch_size):
+    """在进程池中按批次解析"""
+    jobs = [(f"s{i}", content) for i, content in enumerate(feeds)]
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(NewsPaper.parse_feed_batch, batch, target_date, max_items)
+                   for batch in batches]
+        return sum(len(result[3]) for future in futures for result in future.result())
+
+def bench_parse_pool(args):
+    """对比线程内解析和解析进程池（不同进程数、批次大小）"""
+    if args.fixtures:
+        recorded, target_date = load_fixtures(args.fixtures)
+        feeds = [recorded[i] for i in range(args.feeds)]
+        feed_desc = f"录制的 {len(recorded)} 个feed（循环使用）"
+    else:
+        # 格式不规范的feed会回退到feedparser，是解析阶段最耗CPU的情况
+        rng = random.Random(5)
+        kinds = ['rss', 'atom', 'malformed']
+        weights = [(1 - args.malformed_rate) / 2, (1 - args.malformed_rate) / 2, args.malformed_rate]
+        feeds = [make_feed(rng.choices(kinds, weights)[0], args.items, args.body_size, seed=i)
+                 for i in range(args.feeds)]
+        target_date = (datetime.datetime.now() - datetime.timedelta(days=1)).date()
+        feed_desc = f"合成feed（{args.malformed_rate:.0%} 需要回退到feedparser）"
+    max_items = NewsPaper.MAX_ITEMS_PER_SOURCE
+    size = sum(len(content) for content in feeds)
+    print(f"[*] 解析进程池基准: {len(feeds)} 个{feed_desc}，共 {size / 1024 / 1024:.1f}MB，CPU核心数 {os.cpu_count()}")
+    
+    count, baseline = timed(parse_in_threads, feeds, target_date, max_items)
+    print(f"  {'方式':<22} {'耗时':>9} {'加速比':>8} {'新闻':>7}")
+    print(f"  {'线程池（' + str(NewsPaper.MAX_WORKERS) + '个线程）':<20} {baseline:>8.3f}s {1:>7.1f}x {count:>7}")
+    for workers in args.workers:
+        for batch_size in args.batch_sizes:
+            count, elapsed = timed(parse_in_processes, feeds, target_date, max_items, workers, batch_size)
+            label = f"{workers}进程 批次{batch_size}"
+            print(f"  {label:<20} {elapsed:>8.3f}s {baseline / elapsed:>7.1f}x {count:>7}")
+    print("  注：进程池耗时包含启动进程的开销；加速比受CPU核心数限制")
+
+def make_archive_text(count, seed=11):
+    """生成存档格式的JSON文本（与 NewsArchive 保存的每日文件相同）"""
+    rng = random.Random(seed)
+    names = [source['name'] for source in NewsPaper.ALL_RSS_SOURCES]
+    start = datetime.date.today() - datetime.timedelta(days=30)
+    rows = [
+        {'title': title, 'url': f"https://example.com/news/{i}", 'source': rng.choice(names),
+         'date': (start + datetime.timedelta(days=rng.randrange(30))).isoformat()}
+        for i, title in enumerate(make_titles(count, seed))
+    ]
+    return json.dumps(rows, ensure_ascii=False)
+
+def load_as_dicts(text):
+    """原来的表示方式：每条新闻一个字典（NewsArchive 原来的读取方式）"""
+    rows = json.loads(text)
+    for row in rows:
+        row['date'] = datetime.date.fromisoformat(row['date'])
+    return rows
+
+def load_as_items(text):
+    """NewsItem 表示方式（与 NewsArchive.load_day 相同：原地替换）"""
+    rows = json.loads(text)
+    for i, row in enumerate(rows):
+        rows[i] = NewsPaper.NewsItem.from_dict(row)
+    return rows
+
+def retained_memory(func, *args):
+    """运行函数并返回 (结果, 耗时秒数, 结果占用的内存字节数, 内存峰值字节数)"""
+    gc.collect()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+def bench_items(args):
+    """对比每条新闻一个字典和 NewsItem 的内存占用"""
+    text = make_archive_text(args.count)
+    print(f"[*] 新闻表示方式基准: {args.count:,} 条新闻（存档JSON {len(text.encode('utf-8')) / 1024 / 1024:.1f}MB）")
+    print(f"  {'表示方式':<12} {'读取耗时':>10} {'常驻内存':>10} {'每条':>8} {'峰值':>10}")
+    for name, func in (('字典', load_as_dicts), ('NewsItem', load_as_items)):
+        news, elapsed, current, peak = retained_memory(func, text)
+        print(f"  {name:<12} {elapsed:>9.3f}s {current / 1024 / 1024:>8.1f}MB "
+              f"{current / len(news):>6.0f}B {peak / 1024 / 1024:>8.1f}MB")
+        del news
+    
+    items = load_as_items(text)
+    
+    def pipeline(items):
+        unique_news = NewsPaper.deduplicate_news(items, threshold=1)
+        news_by_category = NewsPaper.group_news_by_category(unique_news)
+        return NewsPaper.render_markdown(news_by_category, unique_news, 'bench')
+    
+    _, elapsed, _, peak = retained_memory(pipeline, items)
+    print(f"  NewsItem 去重+分类+生成Markdown: {elapsed:.3f}s，额外内存峰值 {peak / 1024 / 1024:.1f}MB")
+    print("  注：常驻内存包含标题和链接字符串；字典方式中每条新闻的来源名称都是单独的字符串")
+
+def record_fixtures(args):
+    """录制 ALL_RSS_SOURCES 的真实响应，作为 suite 的 fixture"""
+    os.makedirs(args.out, exist_ok=True)
+    recorded = []
+    for i, source in enumerate(NewsPaper.ALL_RSS_SOURCES):
+        filename = f"{i:02d}.xml"
+        try:
+            response = NewsPaper.requests.get(source['url'], headers=NewsPaper.REQUEST_HEADERS,
+                                              timeout=NewsPaper.RSS_TIMEOUT)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"  [-] {source['name']}: {str(e)[:60]}")
+            continue
+        with open(os.path.join(args.out, filename), 'wb') as f:
+            f.write(response.content)
+        recorded.append({'name': source['name'], 'file': filename})
+        print(f"  [+] {source['name']}: {len(response.content) / 1024:.0f}KB")
+    index = {'recorded': datetime.date.today().isoformat(), 'sources': recorded}
+    with open(os.path.join(args.out, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    print(f"[✓] 已录制 {len(recorded)} 个源到 {os.path.abspath(args.out)}")
+
+def load_fixtures(directory):
+    """读取 record 录制的 fixture
+    
+    Returns:
+        tuple: (RecordedFixtures, 目标日期) —— 目标日期为录制日期的前一天
+    """
+    with open(os.path.join(directory, 'index.json'), encoding='utf-8') as f:
+        index = json.load(f)
+    fixtures = []
+    for source in index['sources']:
+        with open(os.path.join(directory, source['file']), 'rb') as f:
+            fixtures.append(f.read())
+    recorded = datetime.date.fromisoformat(index['recorded'])
+    return RecordedFixtures(fixtures), recorded - datetime.timedelta(days=1)
+
+class RecordedFixtures:
+    """录制的feed，源的数量多于录制数量时循环使用"""
+    
+    def __init__(self, feeds):
+        self.feeds = feeds
+    
+    def __len__(self):
+        return len(self.feeds)
+    
+    def __getitem__(self, index):
+        return self.feeds[index % len(self.feeds)]
+
+class SyntheticFixtures:
+    """按序号惰性生成的合成feed（每个源的标题都不同，RSS和Atom交替）"""
+    
+    def __init__(self, items=60, body_size=500):
+        self.items = items
+        self.body_size = body_size
+        self._feeds = {}
+    
+    def __getitem__(self, index):
+        feed = self._feeds.get(index)
+        if feed is None:
+            kind = 'atom' if index % 3 == 2 else 'rss'
+            feed = self._feeds[index] = make_feed(kind, self.items, self.body_size, seed=index)
+        return feed
+
+class FixtureServer:
+    """本地替身HTTP服务器：/feed/<序号> 返回对应的 fixture
+    
+    可以注入延迟、HTTP 500错误和慢速响应体（分块缓慢发送）。每个源是否出错、
+    是否慢速由序号决定，多次运行的结果可以相互比较。
+    """
+    
+    def __init__(self, fixtures, latency=0.0, jitter=0.0, error_rate=0.0, slow_rate=0.0,
+                 slow_seconds=0.5, seed=3):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.seed = seed
+        self.httpd = None
+    
+    def plan(self, index):
+        """返回 (延迟秒数, 是否返回错误, 是否慢速发送)"""
+        rng = random.Random(self.seed * 1000003 + index)
+        delay = self.latency + rng.uniform(0, self.jitter)
+        return delay, rng.random() < self.error_rate, rng.random() < self.slow_rate
+    
+    def start(self):
+        server = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                try:
+                    index = int(self.path.rsplit('/', 1)[-1])
+                    body = server.fixtures[index]
+                except ValueError:
+                    self.send_error(404)
+                    return
+                delay, error, slow = server.plan(index)
+                time.sleep(delay)
+                if error:
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/xml; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    if slow:
+                        chunks = list(iter_chunks(body, 4096))
+                        for chunk in chunks:
+                            self.wfile.write(chunk)
+                            self.wfile.flush()
+                            time.sleep(server.slow_seconds / len(chunks))
+                    else:
+                        self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # 流式解析拿到足够的条目后会提前断开连接
+                    pass
+            
+            def log_message(self, format, *args):
+                pass
+        
+        class Server(http.server.ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 256
+            
+            def handle_error(self, request, client_address):
+                # 客户端提前断开属于正常情况，不打印异常
+                if not isinstance(sys.exc_info()[1], ConnectionError):
+                    super().handle_error(request, client_address)
+        
+        self.httpd = Server(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def url(self, index):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/feed/{index}"
+
+def make_sources(server, count):
+    """生成 count 个指向替身服务器的新闻源（名称沿用 ALL_RSS_SOURCES）"""
+    names = [source['name'] for source in NewsPaper.ALL_RSS_SOURCES]
+    sources = []
+    for i in range(count):
+        name = names[i % len(names)]
+        if i >= len(names):
+            name = f"{name}#{i // len(names)}"
+        sources.append({'name': name, 'url': server.url(i)})
+    return sources
+
+def run_hot_news(sources, target_date, args, output_dir):
+    """静默运行一次 get_yesterday_hot_news（不使用缓存和健康记录，不打开文件）
+    
+    所有源都在同一个本地替身服务器上，因此也不按主机限速；不设时间预算，测量完整的耗时；
+    不使用已处理条目索引，每次运行的工作量相同。
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        NewsPaper.get_yesterday_hot_news(use_async=args.use_async, use_cache=False, use_health=False,
+                                         sources=sources, target_date=target_date,
+                                         output_dir=output_dir, open_file=False,
+                                         parse_workers=args.parse_workers, host_limits=False, deadline=0,
+                                         use_seen=False)
+
+def stage_memory(sources, target_date, output_dir):
+    """分阶段测量内存：依次单独运行 get_news_from_rss（线程池）、categorize_news 和 save_to_markdown
+    
+    完整运行中各阶段交错进行，无法区分内存属于哪个阶段，因此这里把三个阶段分开运行
+    （两者之间的去重不计入测量）。
+    每个阶段开始前重置 tracemalloc 的峰值并取一次快照，结束后再取快照比较。
+    
+    Returns:
+        list: [(阶段名, 峰值增量字节数, 阶段结束后保留的字节数), ...]
+    """
+    results = []
+    # 排除 tracemalloc 自身（快照）占用的内存
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    
+    def stage(name, func, *args):
+        gc.collect()
+        before = tracemalloc.take_snapshot().filter_traces(ignore)
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = func(*args)
+        peak = tracemalloc.get_traced_memory()[1] - base
+        after = tracemalloc.take_snapshot().filter_traces(ignore)
+        retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+        results.append((name, peak, retained))
+        return result
+    
+    def fetch():
+        with ThreadPoolExecutor(NewsPaper.MAX_WORKERS) as executor:
+            news_lists = executor.map(
+                lambda source: NewsPaper.get_news_from_rss(source['url'], source['name'], target_date), sources)
+            return [news for news_list in news_lists for news in news_list]
+    
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            unique_news = NewsPaper.deduplicate_news(stage('get_news_from_rss', fetch))
+            news_by_category = stage('categorize_news', NewsPaper.group_news_by_category, unique_news)
+            stage('save_to_markdown', NewsPaper.save_to_markdown, news_by_category, unique_news,
+                  target_date.strftime('%Y-%m-%d'), output_dir)
+    finally:
+        tracemalloc.stop()
+    return results
+
+# suite 报告的阶段：(Profiler中的阶段名, 显示名称)
+SUITE_STAGES = [
+    ('fetch', 'get_news_from_rss'),
+    ('parse', '  解析'),
+    ('dedup', '去重'),
+    ('categorize_news', 'categorize_news'),
+    ('save_digest', 'save_digest'),
+]
+
+def bench_suite(args):
+    """端到端基准：本地替身服务器 + 不同数量的新闻源"""
+    if not args.synthetic:
+        fixtures, target_date = load_fixtures(args.fixtures)
+        fixture_desc = f"录制的 {len(fixtures)} 个feed（{args.fixtures}）"
+    else:
+        fixtures = SyntheticFixtures()
+        target_date = (datetime.datetime.now() - datetime.timedelta(days=1)).date()
+        fixture_desc = "合成feed"
+    server = FixtureServer(fixtures, args.latency / 1000, args.jitter / 1000, args.error_rate,
+                           args.slow_rate, args.slow_seconds).start()
+    mode = 'asyncio' if args.use_async else f"线程池（{NewsPaper.MAX_WORKERS}个线程）"
+    print(f"[*] 端到端基准: {fixture_desc}，{mode}")
+    print(f"    延迟 {args.latency:.0f}+{args.jitter:.0f}ms，错误率 {args.error_rate:.0%}，"
+          f"慢响应 {args.slow_rate:.0%}（{args.slow_seconds}s）")
+    try:
+        for count in args.sources:
+            sources = make_sources(server, count)
+            with tempfile.TemporaryDirectory() as output_dir:
+                profiler = NewsPaper.Profiler()
+                NewsPaper.set_profiler(profiler)
+                try:
+                    _, elapsed = timed(run_hot_news, sources, target_date, args, output_dir)
+                finally:
+                    NewsPaper.set_profiler(None)
+                peak = None
+                memory_stages = []
+                if not args.skip_memory:
+                    tracemalloc.start()
+                    run_hot_news(sources, target_date, args, output_dir)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    memory_stages = stage_memory(sources, target_date, output_dir)
+            
+            print()
+            memory = f"，内存峰值 {peak / 1024 / 1024:.1f}MB" if peak is not None else ''
+            print(f"  {count} 个源: 总耗时 {elapsed:.3f} s，{count / elapsed:,.0f} 源/秒{memory}")
+            items = {}
+            for name, _, _, _, attrs in profiler.spans:
+                items[name] = items.get(name, 0) + attrs.get('items', 0)
+            stages = {row[0]: row for row in profiler.stage_summary()}
+            print(f"    {'阶段':<20} {'次数':>6} {'总耗时':>9} {'p95':>9} {'条目':>8} {'吞吐':>14}")
+            for stage, label in SUITE_STAGES:
+                if stage not in stages:
+                    continue
+                _, calls, total, _, p95, _ = stages[stage]
+                if items.get(stage):
+                    rate = f"{items[stage] / total:,.0f} 条/秒" if total else '-'
+                else:
+                    rate = f"{calls / total:,.0f} 次/秒" if total else '-'
+                print(f"    {label:<20} {calls:>6} {total:>8.3f}s {p95 * 1000:>7.1f}ms "
+                      f"{items.get(stage, 0) or '-':>8} {rate:>14}")
+            if memory_stages:
+                print(f"    {'阶段（单独运行）':<20} {'内存峰值':>10} {'保留':>10}")
+                for label, stage_peak, retained in memory_stages:
+                    print(f"    {label:<20} {stage_peak / 1024 / 1024:>8.1f}MB {retained / 1024 / 1024:>8.1f}MB")
+    finally:
+        server.stop()
+    print()
+    print("  注：各阶段的总耗时是所有线程耗时之和；get_news_from_rss 的吞吐为单线程的处理速度")
+    print("      各阶段的内存在单独运行时测量（get_news_from_rss 使用线程池），峰值为相对阶段开始时的增量")
+
+def parse_counts(value):
+    try:
+        counts = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的源数量列表: {value}")
+    if not counts or min(counts) <= 0:
+        raise argparse.ArgumentTypeError(f"无效的源数量列表: {value}")
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="热点新闻获取器 - 性能基准测试")
+    subparsers = parser.add_subparsers(dest='bench')
+
+    p = subparsers.add_parser('categorize', help='关键词分类吞吐量')
+    p.add_argument('--titles', type=int, default=100000, help='合成标题数量')
+    p.add_argument('--extra-keywords', type=int, default=0, help='额外合成关键词数量')
+    p.set_defaults(func=bench_categorize)
+
+    p = subparsers.add_parser('classifier', help='关键词分类与统计分类器的吞吐量对比')
+    p.add_argument('--titles', type=int, default=100000, help='测试标题数量')
+    p.add_argument('--train', type=int, default=50000, help='训练标题数量')
+    p.set_defaults(func=bench_classifier)
+
+    p = subparsers.add_parser('cluster', help='跨来源聚类与热度排序的吞吐量')
+    p.add_argument('--titles', type=int, default=20000, help='新闻数量')
+    p.set_defaults(func=bench_cluster)
+
+    p = subparsers.add_parser('parse', help='feed解析耗时和内存峰值')
+    p.add_argument('--items', type=int, default=2000, help='大型feed的条目数量')
+    p.add_argument('--body-size', type=int, default=2000, help='每个条目正文的字节数')
+    p.set_defaults(func=bench_parse)
+
+    p = subparsers.add_parser('dates', help='日期解析和按日期过滤的吞吐量')
+    p.add_argument('--count', type=int, default=200000, help='日期字符串数量')
+    p.add_argument('--items', type=int, default=5000, help='按日期过滤时feed的条目数量')
+    p.set_defaults(func=bench_dates)
+
+    p = subparsers.add_parser('parse-pool', help='线程内解析与解析进程池的对比')
+    p.add_argument('--feeds', type=int, default=400, help='feed数量')
+    p.add_argument('--items', type=int, default=200, help='每个feed的条目数量')
+    p.add_argument('--body-size', type=int, default=1000, help='每个条目正文的字节数')
+    p.add_argument('--malformed-rate', type=float, default=0.5, help='需要回退到feedparser的feed比例')
+    p.add_argument('--workers', type=parse_counts, default=[1, 2, 4], help='逗号分隔的进程数')
+    p.add_argument('--batch-sizes', type=parse_counts, default=[1, NewsPaper.PARSE_BATCH_SIZE], help='逗号分隔的批次大小')
+    p.add_argument('--fixtures', help='record 录制的fixture目录（默认使用合成feed）')
+    p.set_defaults(func=bench_parse_pool)
+
+    p = subparsers.add_parser('items', help='每条新闻一个字典与 NewsItem 的内存对比')
+    p.add_argument('--count', type=int, default=300000, help='新闻数量')
+    p.set_defaults(func=bench_items)
+
+    p = subparsers.add_parser('suite', help='本地替身服务器上的端到端基准')
+    p.add_argument('--sources', type=parse_counts, default=[26, 500, 5000], help='逗号分隔的源数量')
+    p.add_argument('--fixtures', default=DEFAULT_FIXTURES, help='record 录制的fixture目录（默认使用仓库中的fixture）')
+    p.add_argument('--synthetic', action='store_true', help='使用合成feed代替fixture')
+    p.add_argument('--latency', type=float, default=20, help='每个请求的基础延迟（毫秒）')
+    p.add_argument('--jitter', type=float, default=20, help='额外的随机延迟上限（毫秒）')
+    p.add_argument('--error-rate', type=float, default=0.02, help='返回HTTP 500的源比例')
+    p.add_argument('--slow-rate', type=float, default=0.02, help='慢速发送响应体的源比例')
+    p.add_argument('--slow-seconds', type=float, default=0.5, help='慢速响应体的发送时长（秒）')
+    p.add_argument('--async', dest='use_async', action='store_true', help='使用asyncio获取')
+    p.add_argument('--parse-workers', type=int, default=0, help='解析进程数（0表示在下载线程中解析）')
+    p.add_argument('--skip-memory', action='store_true', help='不测量内存（内存测量需要再运行完整流程和各阶段各一次）')
+    p.set_defaults(func=bench_suite)
+
+    p = subparsers.add_parser('record', help='录制真实新闻源的响应作为fixture（需要网络）')
+    p.add_argument('--out', default='benchmark_fixtures', help='保存目录')
+    p.set_defaults(func=record_fixtures)
+
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,10 @@
 import sys
 import os
 import platform
+import argparse
 import subprocess
 import shutil
+import importlib.util
 
 # 设置控制台编码
 if sys.platform == 'win32':
@@ -83,8 +85,13 @@ def install_pyinstaller():
         print("[✗] PyInstaller 安装失败，请手动运行: pip install pyinstaller")
         return False
 
-def build_app():
-    """打包应用程序"""
+def build_app(onedir=False):
+    """打包应用程序
+    
+    Args:
+        onedir: 是否打包为文件夹。单文件模式每次启动都要先把整个程序解压到临时目录，
+                文件夹模式省去了这一步，启动明显更快
+    """
     current_platform = platform.system()
     print(f"[*] 检测到系统: {current_platform} {platform.machine()}")
     print()
@@ -112,7 +119,7 @@ def build_app():
     cmd = [
         "pyinstaller",
         f"--name={APP_NAME}",
-        "--onefile",
+        "--onedir" if onedir else "--onefile",
         windowed_flag,
         "--clean",
         "--noconfirm",
@@ -120,6 +127,9 @@ def build_app():
         "--hidden-import=requests",
         "--hidden-import=concurrent.futures",
     ]
+    # 可选依赖：NewsPaper.py 按需导入，PyInstaller 无法自动发现
+    if importlib.util.find_spec("aiohttp") is not None:
+        cmd.append("--hidden-import=aiohttp")
     
     if icon_path and os.path.exists(icon_path):
         cmd.append(f"--icon={icon_path}")
@@ -135,13 +145,14 @@ def build_app():
         print("[✓] 打包成功！")
         print()
         
-        # 确定输出文件路径
+        # 确定输出文件路径（文件夹模式的可执行文件在 dist/热点新闻/ 目录中）
+        dist_dir = os.path.join("dist", APP_NAME) if onedir else "dist"
         if current_platform == 'Windows':
-            app_path = os.path.join("dist", f"{APP_NAME}.exe")
+            app_path = os.path.join(dist_dir, f"{APP_NAME}.exe")
         elif current_platform == 'Darwin':
             app_path = os.path.join("dist", f"{APP_NAME}.app")
         else:
-            app_path = os.path.join("dist", APP_NAME)
+            app_path = os.path.join(dist_dir, APP_NAME)
         
         if os.path.exists(app_path):
             return app_path
@@ -274,8 +285,16 @@ Categories=Utility;News;
         print(f"[✗] 创建快捷方式失败: {e}")
         return False
 
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="热点新闻获取器 - 一键安装工具")
+    parser.add_argument('--onedir', action='store_true',
+                        help='打包为文件夹而不是单个文件（启动更快：不需要每次启动时解压到临时目录）')
+    return parser.parse_args()
+
 def main():
     """主函数"""
+    args = parse_args()
     print_header()
     
     # 检查主程序文件
@@ -286,7 +305,7 @@ def main():
         return
     
     # 打包应用
-    app_path = build_app()
+    app_path = build_app(onedir=args.onedir)
     if not app_path:
         print("\n[✗] 打包失败，请检查错误信息")
         input("\n按回车键退出...")
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""新闻源适配器的测试：用 tests/pages 中保存的页面测试解析、翻页和容错"""
+
+import os
+import sys
+import datetime
+import functools
+import threading
+import unittest
+import http.server
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NewsPaper
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+DAY = datetime.date(2026, 10, 16)  # 保存的页面中大部分新闻的日期
+
+JSON_SOURCE = {
+    'name': '新浪新闻', 'adapter': 'json', 'pages': 4, 'items': 'result.data',
+    'fields': {'title': 'title', 'link': 'url', 'guid': 'docid', 'date': 'ctime'},
+}
+HTML_SOURCE = {'name': '新浪滚动', 'adapter': 'html', 'url': 'https://news.example.com/roll/index.shtml',
+               'item': 'ul.list_009 li'}
+
+def read_page(name):
+    with open(os.path.join(PAGES, name), 'rb') as f:
+        return f.read()
+
+def fixed_today(year, month, day):
+    """把 HtmlListParser 看到的“今天”固定为某一天"""
+    class FixedDate(datetime.date):
+        @classmethod
+        def today(cls):
+            return cls(year, month, day)
+    return mock.patch.object(NewsPaper.datetime, 'date', FixedDate)
+
+class PageHandler(http.server.SimpleHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        PageHandler.requests.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+class JsonApiAdapterTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        handler = functools.partial(PageHandler, directory=PAGES)
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.source = dict(JSON_SOURCE, url=f'http://127.0.0.1:{cls.server.server_address[1]}/sina_roll_{{page}}.json')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        PageHandler.requests = []
+
+    def fetch(self, **kwargs):
+        return NewsPaper.SOURCE_ADAPTERS['json'].fetch(self.source, **kwargs)
+
+    def test_parse_saved_page(self):
+        entries = NewsPaper.SOURCE_ADAPTERS['json'].parse(read_page('sina_roll_1.json'), self.source)
+        self.assertEqual(len(entries), 6)
+        self.assertEqual(entries[2]['title'], '教育部：加强中小学生体育锻炼 & 睡眠管理')
+        self.assertEqual(entries[2]['guid'], 'comos:a2')
+        # 字符串时间戳、毫秒时间戳和RFC 822日期都转换为秒
+        timestamps = [entry['timestamp'] for entry in entries[2:]]
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+        self.assertTrue(all(NewsPaper.local_date(timestamp) == DAY for timestamp in timestamps))
+
+    def test_pagination_stops_after_target_date(self):
+        entries = self.fetch(accept=NewsPaper.DateWindow(DAY))
+        # 第3页全部是更早的新闻，不再请求第4页；第2页重复出现的条目只保留一次
+        self.assertEqual([path.rsplit('/', 1)[-1] for path in PageHandler.requests],
+                         ['sina_roll_1.json', 'sina_roll_2.json', 'sina_roll_3.json'])
+        self.assertEqual(len(entries), 14)
+        self.assertEqual(len({entry['guid'] for entry in entries}), 14)
+
+    def test_pagination_stops_at_max_items(self):
+        self.fetch(max_items=5, accept=NewsPaper.DateWindow(DAY))
+        self.assertEqual(len(PageHandler.requests), 2)
+
+    def test_missing_page_returns_earlier_pages(self):
+        entries = self.fetch()
+        self.assertEqual(len(PageHandler.requests), 4)  # 第4页不存在（404）
+        self.assertEqual(len(entries), 14)
+
+    def test_first_page_failure_raises(self):
+        source = dict(self.source, url=self.source['url'].replace('sina_roll_', 'missing_'))
+        with self.assertRaises(Exception):
+            NewsPaper.SOURCE_ADAPTERS['json'].fetch(source)
+
+    def test_malformed_json(self):
+        adapter = NewsPaper.SOURCE_ADAPTERS['json']
+        with self.assertRaises(ValueError):
+            adapter.parse(read_page('sina_roll_truncated.json'), self.source)
+        with self.assertRaises(ValueError):
+            adapter.parse(b'{"result": {"status": {"code": 1}}}', self.source)
+        with self.assertRaises(ValueError):
+            adapter.parse(b'{"result": "error"}', self.source)
+
+    def test_bad_items_and_dates(self):
+        adapter = NewsPaper.SOURCE_ADAPTERS['json']
+        page2 = adapter.parse(read_page('sina_roll_2.json'), self.source)
+        self.assertIsNone(page2[-1]['timestamp'])  # 无法解析的日期
+        page3 = adapter.parse(read_page('sina_roll_3.json'), self.source)
+        self.assertEqual(len(page3), 3)  # 不是对象的条目被跳过
+
+class HtmlListAdapterTest(unittest.TestCase):
+    def parse(self, name, max_items=None, accept=None):
+        return NewsPaper.SOURCE_ADAPTERS['html'].parse(read_page(name), HTML_SOURCE, max_items, accept)
+
+    def test_parse_saved_page(self):
+        with fixed_today(2026, 10, 18):
+            entries = self.parse('sina_list_gb2312.html')
+        # 编码从 <meta> 检测；导航和页脚中的链接不在条目选择器内
+        self.assertEqual([entry['title'] for entry in entries], [
+            '国务院常务会议部署稳就业新举措', '沪深两市成交额突破万亿元', '国产芯片企业发布新一代处理器',
+            '女排联赛揭幕 卫冕冠军开门红', '城市更新试点名单公布 二十个城市入选', '跨年夜多国举行庆祝活动 烟花点亮夜空',
+        ])
+        self.assertEqual(entries[0]['link'], 'https://news.example.com/c/2026-10-16/doc-h0.shtml')
+        self.assertEqual(entries[2]['link'], 'https://tech.example.com/doc-h2.shtml')
+        self.assertEqual(datetime.datetime.fromtimestamp(entries[0]['timestamp']), datetime.datetime(2026, 10, 16, 21, 30))
+        self.assertEqual(datetime.datetime.fromtimestamp(entries[3]['timestamp']), datetime.datetime(2026, 10, 15, 22, 0))
+        self.assertIsNone(entries[4]['timestamp'])
+
+    def test_year_less_dates_are_not_in_the_future(self):
+        with fixed_today(2026, 10, 18):
+            entries = self.parse('sina_list_gb2312.html')
+        self.assertEqual(NewsPaper.local_date(entries[0]['timestamp']), datetime.date(2026, 10, 16))
+        self.assertEqual(NewsPaper.local_date(entries[5]['timestamp']), datetime.date(2025, 12, 31))
+        # 1月1日看到的“12月31日”是前一天
+        with fixed_today(2027, 1, 1):
+            entries = self.parse('sina_list_gb2312.html')
+        self.assertEqual(NewsPaper.local_date(entries[5]['timestamp']), datetime.date(2026, 12, 31))
+        self.assertEqual(NewsPaper.local_date(entries[0]['timestamp']), datetime.date(2026, 10, 16))
+
+    def test_stops_at_max_items(self):
+        with fixed_today(2026, 10, 18):
+            entries = self.parse('sina_list_gb2312.html', max_items=2, accept=NewsPaper.DateWindow(DAY))
+        self.assertEqual(len(entries), 2)
+
+    def test_malformed_html(self):
+        with fixed_today(2026, 10, 18):
+            entries = self.parse('broken_list.html')
+        # 省略结束标签、多余的结束标签和被截断的页面都能解析；没有链接或标题的条目被跳过
+        self.assertEqual([entry['title'] for entry in entries], [
+            '未闭合的条目 标签缺失也能解析', '多余的结束标签之后的条目 仍然可以解析', '页面在这里被截断 没有结束标签',
+        ])
+        self.assertEqual(NewsPaper.local_date(entries[0]['timestamp']), DAY)
+        self.assertIsNone(entries[1]['timestamp'])  # 不存在的日期
+
+    def test_missing_item_selector(self):
+        source = dict(HTML_SOURCE)
+        del source['item']
+        with self.assertRaises(ValueError):
+            NewsPaper.SOURCE_ADAPTERS['html'].parse(read_page('broken_list.html'), source)
+
+class FeedAdapterTest(unittest.TestCase):
+    def test_html_entities_fall_back(self):
+        # XML中未定义的HTML实体：回退到容错解析
+        entries = NewsPaper.SOURCE_ADAPTERS['rss'].parse(read_page('feed_html_entities.xml'), {'url': ''})
+        self.assertEqual([entry['link'] for entry in entries],
+                         [f'https://example.com/rss/{i}' for i in range(3)])
+        self.assertTrue(entries[0]['title'].startswith('央行开展逆回购操作'))
+
+    def test_truncated_feed(self):
+        body = read_page('feed_html_entities.xml')
+        entries = NewsPaper.SOURCE_ADAPTERS['rss'].parse(body[:300], {'url': ''})
+        self.assertEqual(entries[0]['link'], 'https://example.com/rss/0')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""朴素贝叶斯分类器和分类器标识的测试"""
+
+import os
+import sys
+import datetime
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NewsPaper
+
+TRAINING = {
+    '金融': ['股市大涨 投资者信心回升', '央行发布金融数据 经济平稳', '基金规模创新高 债券收益率下行',
+             '股市震荡 基金经理调仓', '经济数据好于预期 投资升温'],
+    '体育': ['足球联赛 主队逆转取胜', '篮球比赛 加时险胜对手', '奥运选手备战 体育总局部署',
+             '足球国家队公布名单', '篮球联赛季后赛开打'],
+    '教育': ['高校扩招 大学生就业', '教育部发布学校减负通知', '教师节 学生献花致敬',
+             '大学开学 新生报到', '学校食堂 学生营养改善'],
+}
+
+def training_data():
+    titles, labels = [], []
+    for category, category_titles in TRAINING.items():
+        titles.extend(category_titles)
+        labels.extend([category] * len(category_titles))
+    return titles, labels
+
+class NaiveBayesClassifierTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        NewsPaper.set_classifier(None)
+
+    def test_train_save_load_classify(self):
+        titles, labels = training_data()
+        classifier = NewsPaper.NaiveBayesClassifier.train(titles, labels, hash_bits=12)
+        path = os.path.join(self.tmp.name, 'model.npz')
+        classifier.save(path)
+        loaded = NewsPaper.load_bayes_classifier(path)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded.identity, classifier.identity)
+        self.assertEqual(loaded.classify_many(['股市 基金 投资', '足球 篮球 比赛', '大学 学生 学校']),
+                         ['金融', '体育', '教育'])
+        self.assertEqual(loaded.classify('篮球联赛 比赛'), '体育')
+
+    def test_retraining_changes_identity(self):
+        titles, labels = training_data()
+        first = NewsPaper.NaiveBayesClassifier.train(titles, labels, hash_bits=12)
+        second = NewsPaper.NaiveBayesClassifier.train(titles[:-1], labels[:-1], hash_bits=12)
+        self.assertNotEqual(first.identity, second.identity)
+        self.assertNotEqual(first.identity, NewsPaper.get_keyword_classifier().identity)
+
+class SeenIndexClassifierTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'seen.bin')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        NewsPaper.set_classifier(None)
+
+    def test_classifier_change_clears_categories(self):
+        news = NewsPaper.NewsItem('股市大涨 投资者信心回升', 'http://example.com/1', 'test',
+                                  datetime.date(2026, 10, 17), published=1792197000)
+        news.category_id = NewsPaper.CATEGORY_IDS['金融']
+        index = NewsPaper.SeenIndex.load(self.path)
+        index.remember(1, news)
+        index.save()
+        self.assertEqual(NewsPaper.SeenIndex.load(self.path).lookup(1)[2], NewsPaper.CATEGORY_IDS['金融'])
+
+        titles, labels = training_data()
+        NewsPaper.set_classifier(NewsPaper.NaiveBayesClassifier.train(titles, labels, hash_bits=12))
+        index = NewsPaper.SeenIndex.load(self.path)
+        _, published, category = index.lookup(1)
+        self.assertEqual(published, 1792197000)
+        self.assertIsNone(category)
+        index.save()
+
+        # 恢复原来的分类器后，记录的类别已经被清除，只保留发布时间
+        NewsPaper.set_classifier(None)
+        _, published, category = NewsPaper.SeenIndex.load(self.path).lookup(1)
+        self.assertEqual(published, 1792197000)
+        self.assertIsNone(category)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""时间预算的测试：慢源在到期后被记录为未完成，日报用已返回的结果照常生成"""
+
+import io
+import os
+import sys
+import json
+import time
+import datetime
+import tempfile
+import threading
+import unittest
+import contextlib
+import email.utils
+import http.server
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NewsPaper
+
+DAY = datetime.date(2026, 10, 16)
+TITLES = ['央行宣布下调存款准备金率', '国家足球队公布世界杯预选赛名单', '多所高校发布研究生招生简章']
+SLOW_DELAY = 3  # 秒，远大于测试中的时间预算
+
+def make_feed():
+    noon = NewsPaper.local_midnight(DAY) + 12 * 3600
+    items = ''.join(f"<item><title>{title}</title><link>http://example.com/{i}</link>"
+                    f"<pubDate>{email.utils.formatdate(noon - i * 600, usegmt=True)}</pubDate></item>"
+                    for i, title in enumerate(TITLES))
+    return ('<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>t</title>'
+            + items + '</channel></rss>').encode('utf-8')
+
+class FeedHandler(http.server.BaseHTTPRequestHandler):
+    release = threading.Event()
+
+    def do_GET(self):
+        if self.path == '/slow.xml':
+            self.release.wait(SLOW_DELAY)
+        body = make_feed()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except ConnectionError:
+            pass  # 客户端在时间预算到期后已经放弃了这个请求
+
+    def log_message(self, format, *args):
+        pass
+
+class RunDeadlineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+        base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        cls.sources = [{'name': '快速源', 'url': f'{base}/fast.xml'}, {'name': '慢速源', 'url': f'{base}/slow.xml'}]
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        home = mock.patch.dict(os.environ, {'HOME': self.tmp.name})
+        home.start()
+        self.addCleanup(home.stop)
+        FeedHandler.release.clear()
+
+    def tearDown(self):
+        FeedHandler.release.set()  # 让慢源的请求结束
+        self.tmp.cleanup()
+
+    def run_digest(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            NewsPaper.get_yesterday_hot_news(use_cache=False, use_health=False, sources=self.sources,
+                                             target_date=DAY, output_dir=self.tmp.name, open_file=False,
+                                             use_store=False, formats=('md', 'json'), host_limits=False,
+                                             use_seen=False, rank=False, **kwargs)
+        with open(os.path.join(self.tmp.name, f'{DAY}.json'), encoding='utf-8') as f:
+            digest = json.load(f)
+        with open(os.path.join(self.tmp.name, f'{DAY}.md'), encoding='utf-8') as f:
+            return digest, f.read()
+
+    def test_slow_source_is_missing(self):
+        start = time.perf_counter()
+        digest, markdown = self.run_digest(deadline=0.5)
+        self.assertLess(time.perf_counter() - start, SLOW_DELAY)
+        self.assertEqual(digest['missing_sources'], ['慢速源'])
+        # 快速源的新闻照常出现在日报中，末尾列出未完成的源
+        self.assertEqual(digest['total'], len(TITLES))
+        self.assertIn('以下 1 个新闻源在时间预算内未完成', markdown)
+        self.assertIn('慢速源', markdown)
+        for title in TITLES:
+            self.assertIn(title, markdown)
+
+    def test_no_deadline_by_default(self):
+        FeedHandler.release.set()
+        digest, markdown = self.run_digest()
+        self.assertEqual(digest['missing_sources'], [])
+        self.assertNotIn('时间预算内未完成', markdown)
+
+    @unittest.skipUnless(NewsPaper.is_async_available(), '未安装aiohttp')
+    def test_slow_source_is_missing_async(self):
+        digest, markdown = self.run_digest(deadline=0.5, use_async=True)
+        self.assertEqual(digest['missing_sources'], ['慢速源'])
+        self.assertEqual(digest['total'], len(TITLES))
+
+if __name__ == '__main__':
+    unittest.main()
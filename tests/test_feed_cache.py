@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""条件GET缓存的回归测试：缓存的条目不能只包含某一天的新闻"""
+
+import os
+import sys
+import datetime
+import tempfile
+import threading
+import unittest
+import email.utils
+import http.server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NewsPaper
+
+DAY1 = datetime.date(2026, 10, 15)
+DAY2 = datetime.date(2026, 10, 16)
+ETAG = '"v1"'
+
+def make_feed():
+    """两天各5条新闻（本地时间中午前后），按时间倒序"""
+    items = []
+    for day in (DAY2, DAY1):
+        noon = NewsPaper.local_midnight(day) + 12 * 3600
+        for i in range(5):
+            published = email.utils.formatdate(noon - i * 600, usegmt=True)
+            items.append(f"<item><title>{day.isoformat()} 测试新闻 第{i}条</title>"
+                         f"<link>http://example.com/{day.isoformat()}/{i}</link>"
+                         f"<pubDate>{published}</pubDate></item>")
+    return ('<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>t</title>'
+            + ''.join(items) + '</channel></rss>').encode('utf-8')
+
+class FeedHandler(http.server.BaseHTTPRequestHandler):
+    body = make_feed()
+    requests = []
+
+    def do_GET(self):
+        FeedHandler.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FeedCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}/feed.xml'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = NewsPaper.FeedCache(os.path.join(self.tmp.name, 'cache.json'))
+        FeedHandler.requests = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fetch(self, target_date, max_items=NewsPaper.MAX_ITEMS_PER_SOURCE):
+        return NewsPaper.fetch_news_from_rss(self.url, 'test', target_date, max_items=max_items, cache=self.cache)
+
+    def test_cached_entries_serve_other_dates(self):
+        self.assertEqual(len(self.fetch(DAY2)), 5)
+        self.assertEqual(len(self.fetch(DAY1)), 5)
+        self.assertEqual(FeedHandler.requests, [None, ETAG])  # 第二次是304
+        entries = NewsPaper.fetch_feed_entries(self.url, cache=self.cache)
+        self.assertEqual(len(entries), 10)
+
+    def test_partial_entries_not_reused_for_older_date(self):
+        # 提前停止：只解析了较新的一部分，更早的日期需要重新下载
+        self.assertEqual(len(self.fetch(DAY2, max_items=3)), 3)
+        self.assertEqual(len(self.fetch(DAY1)), 5)
+        self.assertEqual(FeedHandler.requests, [None, None])
+        self.assertEqual(len(NewsPaper.fetch_feed_entries(self.url, cache=self.cache)), 10)
+
+    def test_partial_entries_reused_for_same_date(self):
+        self.assertEqual(len(self.fetch(DAY2, max_items=3)), 3)
+        self.assertEqual(len(self.fetch(DAY2, max_items=3)), 3)
+        self.assertEqual(FeedHandler.requests, [None, ETAG])
+
+if __name__ == '__main__':
+    unittest.main()
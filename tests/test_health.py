@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""新闻源健康记录的测试：百分位数和熔断的状态转换"""
+
+import os
+import sys
+import time
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NewsPaper
+
+SLOW = {'name': 'slow', 'url': 'http://slow.example.com/feed'}
+FLAKY = {'name': 'flaky', 'url': 'http://flaky.example.com/feed'}
+
+class PercentileTest(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 21))
+        # 20个样本的p95是第19个值（ceil(0.95 * 20) = 19），而不是最大值
+        self.assertEqual(NewsPaper._percentile(values, 95), 19)
+        self.assertEqual(NewsPaper._percentile(values, 50), 10)
+        self.assertEqual(NewsPaper._percentile(values, 100), 20)
+        self.assertEqual(NewsPaper._percentile(values, 0), 1)
+        self.assertEqual(NewsPaper._percentile(list(range(1, 11)), 95), 10)
+        self.assertEqual(NewsPaper._percentile([0.5], 95), 0.5)
+        self.assertIsNone(NewsPaper._percentile([], 95))
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = NewsPaper.SourceHealthStore(os.path.join(self.tmp.name, 'health.json'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def open_circuit(self):
+        # 连接错误：没有耗时样本，超时时间不受影响
+        for _ in range(NewsPaper.CIRCUIT_FAILURE_THRESHOLD):
+            self.store.record_failure(FLAKY['url'])
+
+    def probe_time(self):
+        return time.time() + NewsPaper.CIRCUIT_RETRY_INTERVAL + 1
+
+    def test_failures_open_circuit(self):
+        for _ in range(NewsPaper.CIRCUIT_FAILURE_THRESHOLD - 1):
+            self.store.record_failure(FLAKY['url'])
+        self.assertEqual(self.store.plan([FLAKY]), ([FLAKY], []))
+        self.store.record_failure(FLAKY['url'])
+        self.assertEqual(self.store.plan([SLOW, FLAKY]), ([SLOW], [FLAKY]))
+
+    def test_probe_success_closes_circuit(self):
+        self.open_circuit()
+        # 半开：到期后放行一次探测请求，排在最后并使用较短的超时
+        planned, skipped = self.store.plan([FLAKY, SLOW], now=self.probe_time())
+        self.assertEqual((planned, skipped), ([SLOW, FLAKY], []))
+        self.assertEqual(self.store.timeout_for(FLAKY['url'], 10), NewsPaper.CIRCUIT_PROBE_TIMEOUT)
+        self.store.record_success(FLAKY['url'], 0.5)
+        # 关闭：恢复正常的超时，之后的运行不再跳过
+        self.assertEqual(self.store.timeout_for(FLAKY['url'], 10), 10)
+        self.assertEqual(self.store.plan([FLAKY]), ([FLAKY], []))
+
+    def test_probe_failure_reopens_circuit(self):
+        self.open_circuit()
+        self.store.plan([FLAKY], now=self.probe_time())
+        # 探测失败一次就重新打开熔断（不需要再连续失败 CIRCUIT_FAILURE_THRESHOLD 次）
+        self.store.record_failure(FLAKY['url'])
+        self.assertEqual(self.store.plan([FLAKY]), ([], [FLAKY]))
+        self.assertEqual(self.store.timeout_for(FLAKY['url'], 10), 10)
+        # 重新打开后要再等一个间隔才会探测
+        self.assertEqual(self.store.plan([FLAKY], now=self.probe_time()), ([FLAKY], []))
+
+    def test_adaptive_timeout(self):
+        for latency in range(1, 21):
+            self.store.record_success(SLOW['url'], latency / 10)
+        # p95 = 1.9秒，超时 = p95 × HEALTH_TIMEOUT_FACTOR
+        expected = max(NewsPaper.HEALTH_MIN_TIMEOUT, 1.9 * NewsPaper.HEALTH_TIMEOUT_FACTOR)
+        self.assertAlmostEqual(self.store.timeout_for(SLOW['url'], 10), expected)
+
+if __name__ == '__main__':
+    unittest.main()
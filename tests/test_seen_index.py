@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""已处理条目索引的测试：同一天第二次运行时见过的条目不再分类"""
+
+import io
+import os
+import sys
+import datetime
+import tempfile
+import threading
+import unittest
+import contextlib
+import email.utils
+import http.server
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NewsPaper
+
+DAY = datetime.date(2026, 10, 16)
+TITLES = ['央行宣布下调存款准备金率', '国家足球队公布世界杯预选赛名单', '多所高校发布研究生招生简章',
+          '新款国产大飞机完成首次商业飞行', '城市地铁新线路今日开通运营', '电影节闭幕 最佳影片揭晓',
+          '沿海地区迎来今年首场寒潮', '人工智能大模型开源社区持续壮大']
+
+def make_feed(count):
+    """目标日期的 count 条新闻（本地时间中午前后），按时间倒序"""
+    noon = NewsPaper.local_midnight(DAY) + 12 * 3600
+    items = []
+    for i in range(count):
+        published = email.utils.formatdate(noon - i * 600, usegmt=True)
+        items.append(f"<item><title>{TITLES[i]}</title>"
+                     f"<link>http://example.com/{i}</link><guid>item-{i}</guid>"
+                     f"<pubDate>{published}</pubDate></item>")
+    return ('<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>t</title>'
+            + ''.join(items) + '</channel></rss>').encode('utf-8')
+
+class FeedHandler(http.server.BaseHTTPRequestHandler):
+    body = make_feed(6)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+class SeenIndexRunTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}/feed.xml'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        home = mock.patch.dict(os.environ, {'HOME': self.tmp.name})
+        home.start()
+        self.addCleanup(home.stop)
+        FeedHandler.body = make_feed(6)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_once(self):
+        """运行一次，返回 (送去分类的标题, 日报中的新闻数)"""
+        classified = []
+        original = NewsPaper.categorize_many
+
+        def counting(titles):
+            classified.extend(titles)
+            return original(titles)
+
+        captured = {}
+
+        def capture(news_by_category, unique_news, *args, **kwargs):
+            captured['total'] = len(unique_news)
+
+        with mock.patch.object(NewsPaper, 'categorize_many', counting), \
+                mock.patch.object(NewsPaper, 'report_digest', capture), \
+                contextlib.redirect_stdout(io.StringIO()):
+            NewsPaper.get_yesterday_hot_news(use_cache=False, use_health=False, target_date=DAY,
+                                             sources=[{'name': 'test', 'url': self.url}], use_store=False,
+                                             host_limits=False, deadline=0, rank=False, open_file=False,
+                                             output_dir=self.tmp.name)
+        return classified, captured['total']
+
+    def test_second_run_skips_classification(self):
+        classified, total = self.run_once()
+        self.assertEqual(len(classified), 6)
+        self.assertEqual(total, 6)
+
+        # 第二次运行：见过的条目复用记录的类别，仍然出现在日报中
+        classified, total = self.run_once()
+        self.assertEqual(classified, [])
+        self.assertEqual(total, 6)
+
+    def test_only_new_items_are_classified(self):
+        self.run_once()
+        FeedHandler.body = make_feed(8)
+        classified, total = self.run_once()
+        self.assertEqual(len(classified), 2)
+        self.assertEqual(total, 8)
+
+if __name__ == '__main__':
+    unittest.main()
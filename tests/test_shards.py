@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""分片获取的测试：N 个本地进程分片获取后 merge 的结果与单进程运行相同"""
+
+import io
+import os
+import sys
+import json
+import random
+import datetime
+import tempfile
+import threading
+import unittest
+import contextlib
+import subprocess
+import email.utils
+import http.server
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import NewsPaper
+
+FEEDS = 9
+ITEMS = 3
+CHARS = '经济科技教育体育文化医疗交通能源环境农业旅游金融外交军事航天气象海洋铁路电影音乐互联网芯片'
+
+def make_title(feed, item):
+    # 随机汉字组成的标题，彼此之间不会被当作近似重复
+    rng = random.Random(feed * 100 + item)
+    return ''.join(rng.choice(CHARS) for _ in range(14))
+
+def make_feed(feed, target_date):
+    noon = NewsPaper.local_midnight(target_date) + 12 * 3600
+    items = []
+    for i in range(ITEMS):
+        published = email.utils.formatdate(noon - i * 600, usegmt=True)
+        items.append(f"<item><title>{make_title(feed, i)}</title><link>http://example.com/{feed}/{i}</link>"
+                     f"<pubDate>{published}</pubDate></item>")
+    return ('<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>t</title>'
+            + ''.join(items) + '</channel></rss>').encode('utf-8')
+
+class FeedHandler(http.server.BaseHTTPRequestHandler):
+    target_date = None
+
+    def do_GET(self):
+        try:
+            body = make_feed(int(self.path.rsplit('/', 1)[-1]), self.target_date)
+        except ValueError:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def digest_content(news_by_category):
+    """日报内容（与顺序无关）：类别 -> {(标题, 链接, 来源)}"""
+    return {category: {(news.title, news.url, tuple(sorted(news.sources))) for news in news_list}
+            for category, news_list in news_by_category.items()}
+
+class ShardOfTest(unittest.TestCase):
+    def test_every_source_in_exactly_one_shard(self):
+        sources = [{'name': f's{i}', 'url': f'http://host{i % 7}.example.com/feed/{i}'} for i in range(300)]
+        for by_host in (False, True):
+            for count in (1, 2, 3, 5):
+                shards = [NewsPaper.select_shard(sources, (index, count), by_host) for index in range(1, count + 1)]
+                names = [source['name'] for shard in shards for source in shard]
+                self.assertEqual(sorted(names), sorted(source['name'] for source in sources))
+
+    def test_sources_on_one_host_spread_across_shards(self):
+        sources = [{'name': f's{i}', 'url': f'http://feeds.example.com/{i}.xml'} for i in range(1000)]
+        sizes = [len(NewsPaper.select_shard(sources, (index, 4))) for index in range(1, 5)]
+        self.assertTrue(all(size > 150 for size in sizes), sizes)
+        by_host = [len(NewsPaper.select_shard(sources, (index, 4), by_host=True)) for index in range(1, 5)]
+        self.assertEqual(sorted(by_host), [0, 0, 0, 1000])
+
+class ShardProcessTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # 分片进程命令行模式获取昨天的新闻
+        self.target_date = (datetime.datetime.now() - datetime.timedelta(days=1)).date()
+        FeedHandler.target_date = self.target_date
+        port = self.server.server_address[1]
+        self.sources = [{'name': f'源{i}', 'url': f'http://{"localhost" if i % 2 else "127.0.0.1"}:{port}/feed/{i}'}
+                        for i in range(FEEDS)]
+        self.sources_file = os.path.join(self.tmp.name, 'sources.json')
+        with open(self.sources_file, 'w', encoding='utf-8') as f:
+            json.dump({'sources': self.sources}, f, ensure_ascii=False)
+        home = mock.patch.dict(os.environ, {'HOME': self.tmp.name})
+        home.start()
+        self.addCleanup(home.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_digest(self, func, *args, **kwargs):
+        captured = {}
+
+        def capture(news_by_category, unique_news, date_str, *rest, **options):
+            captured['content'] = digest_content(news_by_category)
+            captured['total'] = len(unique_news)
+
+        with mock.patch.object(NewsPaper, 'report_digest', capture), contextlib.redirect_stdout(io.StringIO()):
+            func(*args, **kwargs)
+        return captured
+
+    def test_merge_equals_single_process(self):
+        shard_dir = os.path.join(self.tmp.name, 'shards')
+        count = 3
+        env = dict(os.environ, HOME=self.tmp.name, PYTHONIOENCODING='utf-8')
+        processes = [
+            subprocess.Popen([sys.executable, os.path.join(ROOT, 'NewsPaper.py'), '--sources', self.sources_file,
+                              '--shard', f'{index}/{count}', '--shard-dir', shard_dir, '--no-cache', '--no-health',
+                              '--no-host-limits', '--deadline', '0'],
+                             env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            for index in range(1, count + 1)
+        ]
+        for process in processes:
+            _, stderr = process.communicate(timeout=60)
+            self.assertEqual(process.returncode, 0, stderr.decode('utf-8', 'replace'))
+        self.assertEqual(len(os.listdir(shard_dir)), count)
+
+        merged = self.run_digest(NewsPaper.merge_shards, target_date=self.target_date, shard_dir=shard_dir,
+                                 use_store=False, open_file=False, rank=False)
+        single = self.run_digest(NewsPaper.get_yesterday_hot_news, use_cache=False, use_health=False,
+                                 sources=self.sources, target_date=self.target_date, use_store=False,
+                                 host_limits=False, deadline=0, use_seen=False, rank=False, open_file=False)
+        self.assertEqual(single['total'], FEEDS * ITEMS)
+        self.assertEqual(merged, single)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""文章下载和摘要的测试：本地替身服务器提供文章页面"""
+
+import io
+import os
+import sys
+import time
+import datetime
+import tempfile
+import threading
+import unittest
+import contextlib
+import http.server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import NewsPaper
+
+ARTICLES = [
+    ['国家统计局今天发布了三季度国民经济运行数据。', '前三季度国内生产总值同比增长百分之五点一，经济运行总体平稳。',
+     '其中第三季度增速比上季度略有回升，消费对经济增长的贡献继续扩大。', '工业生产稳中有升，高技术制造业增加值增长较快。',
+     '统计局新闻发言人表示，经济回升向好的基础还需要进一步巩固。', '下阶段将继续加大宏观政策调节力度，推动经济持续回升。'],
+    ['中国女排在世界联赛总决赛中以三比一战胜对手。', '首局比赛双方比分交替上升，中国女排在关键分上把握住了机会。',
+     '第二局对手加强发球冲击，扳回一局，比赛进入僵持阶段。', '随后两局中国女排调整一传，依靠快攻和拦网连下两城。',
+     '主教练赛后表示，年轻队员在大赛中的表现令人满意。', '中国女排将在半决赛中迎战上届冠军。'],
+    ['教育部近日印发通知，要求各地进一步加强中小学生体育锻炼。', '通知提出，要保障学生每天校内外各一小时体育活动时间。',
+     '各地要配齐配强体育教师，开齐开足体育课程。', '学校要因地制宜开展课间活动，不得随意压缩课间时间。',
+     '教育部将把体育锻炼落实情况纳入对地方政府的教育督导评估。', '专家认为，这一举措有助于提升学生体质健康水平。'],
+]
+
+def article_page(sentences):
+    paragraphs = ''.join(f'<p>{sentence}</p>\n' for sentence in sentences)
+    return ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>文章</title>'
+            '<script>var tracking = "这是脚本中的文字，不应该出现在正文中。";</script></head><body>'
+            '<nav><a href="/">首页</a> <a href="/news">这是导航栏中的文字，不属于正文内容</a></nav>'
+            f'<article><h1>标题</h1>\n{paragraphs}</article>'
+            '<footer>版权所有 这是页脚中的文字，不属于正文内容。</footer></body></html>').encode('utf-8')
+
+class ArticleHandler(http.server.BaseHTTPRequestHandler):
+    delay = 0.2
+    lock = threading.Lock()
+    requests = []
+    active = {}
+    max_active = {}
+
+    def do_GET(self):
+        host = self.headers.get('Host', '').split(':')[0]
+        cls = ArticleHandler
+        with cls.lock:
+            cls.requests.append(self.path)
+            cls.active[host] = cls.active.get(host, 0) + 1
+            cls.max_active[host] = max(cls.max_active.get(host, 0), cls.active[host])
+        try:
+            time.sleep(self.delay)  # 让同一主机的请求有机会重叠
+            try:
+                body = article_page(ARTICLES[int(self.path.rsplit('/', 1)[-1])])
+            except (ValueError, IndexError):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active[host] -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+class SummarizeNewsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ArticleHandler)
+        cls.port = cls.server.server_address[1]
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = NewsPaper.ArticleCache(os.path.join(self.tmp.name, 'articles'))
+        ArticleHandler.requests = []
+        ArticleHandler.active = {}
+        ArticleHandler.max_active = {}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def url(self, index, host='127.0.0.1'):
+        return f'http://{host}:{self.port}/article/{index}'
+
+    def make_news(self):
+        day = datetime.date(2026, 10, 16)
+        # 前两篇在同一主机上，第三篇在另一个主机名上
+        urls = [self.url(0), self.url(1), self.url(2, 'localhost')]
+        return {
+            '金融': [NewsPaper.NewsItem('三季度经济数据发布', urls[0], 'test', day)],
+            '体育': [NewsPaper.NewsItem('中国女排战胜对手', urls[1], 'test', day)],
+            '教育': [NewsPaper.NewsItem('教育部加强学生体育锻炼', urls[2], 'test', day)],
+        }
+
+    def summarize(self, news_by_category):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return NewsPaper.summarize_news(news_by_category, cache=self.cache)
+
+    def test_extracts_article_text(self):
+        text = NewsPaper.fetch_article_text(self.url(0))
+        for sentence in ARTICLES[0]:
+            self.assertIn(sentence, text)
+        self.assertNotIn('脚本', text)
+        self.assertNotIn('导航栏', text)
+        self.assertNotIn('页脚', text)
+
+    def test_summaries_are_two_or_three_sentences(self):
+        news_by_category = self.make_news()
+        self.assertEqual(self.summarize(news_by_category), 3)
+        for (news,), sentences in zip(news_by_category.values(), ARTICLES):
+            chosen = [sentence for sentence in sentences if sentence in news.summary]
+            self.assertIn(len(chosen), (2, 3), news.summary)
+            self.assertLessEqual(len(news.summary), NewsPaper.SUMMARY_MAX_CHARS + 2)
+            # 摘要中的句子按原文顺序排列
+            self.assertEqual(news.summary, ' '.join(chosen))
+
+    def test_cache_prevents_refetch(self):
+        first = self.make_news()
+        self.summarize(first)
+        self.assertEqual(len(ArticleHandler.requests), 3)
+        second = self.make_news()
+        self.summarize(second)
+        self.assertEqual(len(ArticleHandler.requests), 3)
+        self.assertEqual([news.summary for (news,) in second.values()],
+                         [news.summary for (news,) in first.values()])
+
+    def test_per_host_concurrency(self):
+        self.summarize(self.make_news())
+        # 同一主机的两篇文章没有同时下载（每个主机最多 ARTICLE_MAX_PER_HOST 个）
+        self.assertEqual(ArticleHandler.max_active, {'127.0.0.1': min(2, NewsPaper.ARTICLE_MAX_PER_HOST),
+                                                     'localhost': 1})
+
+class ArticleCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_evicts_least_recently_used(self):
+        cache = NewsPaper.ArticleCache(self.tmp.name, max_entries=2)
+        now = time.time()
+        for i, url in enumerate(['http://a/1', 'http://a/2', 'http://a/3']):
+            cache.put(url, f'正文{i}')
+            os.utime(cache._path(url), (now - 30 + i * 10, now - 30 + i * 10))
+        self.assertEqual(cache.get('http://a/1'), '正文0')  # 命中后变为最近使用
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.get('http://a/2'))
+        self.assertEqual(cache.get('http://a/1'), '正文0')
+        self.assertEqual(cache.get('http://a/3'), '正文2')
+
+if __name__ == '__main__':
+    unittest.main()